@@ -1,14 +1,73 @@
-from fastapi import APIRouter
-from .schemas import AnalysisRequest, AnalysisResponse
-from .processor import classifier
+import os
+from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from typing import List, Optional
+from .schemas import AnalysisRequest, AnalysisResponse, BatchAnalysisRequest
+from .processor import AspectClassifier, fallback_classify, loader, result_cache
+from .batching import create_batcher
+
+# Qué hacer con las peticiones que llegan antes de que el modelo termine de cargar:
+# - "wait": esperar hasta AI_READY_TIMEOUT segundos y responder 503 si sigue sin estar listo.
+# - "fallback": responder de inmediato con una clasificación por palabras clave (confianza 0).
+NOT_READY_POLICY = os.getenv("AI_NOT_READY_POLICY", "wait")
+READY_TIMEOUT = float(os.getenv("AI_READY_TIMEOUT", "30"))
 
 router = APIRouter()
 
+# Planificador de micro-lotes compartido por todas las peticiones
+batcher = create_batcher(lambda texts: loader.classifier.classify_batch(texts))
+
+async def _ready_classifier() -> Optional[AspectClassifier]:
+    """Devuelve el clasificador si está listo (o llega a estarlo a tiempo), o None para usar el respaldo."""
+    if loader.ready:
+        return loader.classifier
+    if NOT_READY_POLICY != "fallback":
+        classifier = await run_in_threadpool(loader.wait, READY_TIMEOUT)
+        if classifier is None:
+            raise HTTPException(
+                status_code=503,
+                detail=f"El modelo de IA aún no está disponible (estado: {loader.state}).",
+                headers={"Retry-After": "10"},
+            )
+        return classifier
+    return None
+
 @router.post("/analyze/aspect_type", response_model=AnalysisResponse, tags=["Análisis de Aspectos"])
-def analyze_aspect_type(request: AnalysisRequest):
+async def analyze_aspect_type(request: AnalysisRequest):
     """
     Recibe una descripción textual de un aspecto ambiental y devuelve
     una sugerencia de su tipo (Emisión, Consumo, etc.) y un puntaje de confianza.
     """
-    result = classifier.classify(request.text)
-    return AnalysisResponse(**result)
\ No newline at end of file
+    classifier = await _ready_classifier()
+    if classifier is None:
+        return AnalysisResponse(**fallback_classify(request.text))
+
+    # Las descripciones repetidas se responden desde la caché sin esperar un lote;
+    # el resto de peticiones concurrentes se agrupan en un solo lote del modelo
+    result = classifier.cached_result(request.text)
+    if result is None:
+        result = await batcher.submit(request.text)
+    return AnalysisResponse(**result)
+
+@router.post("/analyze/aspect_type/batch", response_model=List[AnalysisResponse], tags=["Análisis de Aspectos"])
+async def analyze_aspect_type_batch(request: BatchAnalysisRequest):
+    """
+    Clasifica una lista de descripciones en una sola llamada (p. ej. al importar
+    un registro de aspectos). Los resultados se devuelven en el mismo orden.
+    """
+    classifier = await _ready_classifier()
+    if classifier is None:
+        return [AnalysisResponse(**fallback_classify(text)) for text in request.texts]
+
+    results = await run_in_threadpool(classifier.classify_many, request.texts)
+    return [AnalysisResponse(**result) for result in results]
+
+@router.get("/metrics/batching", tags=["Métricas"])
+def read_batching_metrics():
+    """Profundidad de la cola e histograma de tamaños de lote del planificador."""
+    return batcher.metrics()
+
+@router.get("/metrics/cache", tags=["Métricas"])
+def read_cache_metrics():
+    """Aciertos, fallos y desalojos de la caché de resultados de clasificación."""
+    return result_cache.stats()
@@ -0,0 +1,53 @@
+import os
+from typing import Optional, Tuple
+from transformers import pipeline
+
+# Backends de inferencia para el pipeline zero-shot:
+# - "pipeline": modelo de precisión completa vía transformers.pipeline (comportamiento original).
+# - "quantized": mismo modelo con cuantización dinámica int8 de las capas lineales (PyTorch).
+# - "onnx": modelo exportado a ONNX y ejecutado con ONNX Runtime (requiere optimum[onnxruntime]).
+BACKENDS = ("pipeline", "quantized", "onnx")
+BACKEND = os.getenv("AI_BACKEND", "pipeline")
+# Ruta local al modelo (fp32 para "quantized", exportado con scripts/export_model.py para "onnx")
+MODEL_PATH = os.getenv("AI_MODEL_PATH") or None
+
+def load_zero_shot(model_name: str, backend: str = BACKEND, model_path: Optional[str] = MODEL_PATH) -> Tuple[object, str]:
+    """
+    Carga el pipeline zero-shot con el backend pedido. Si el backend no puede cargarse
+    se usa el pipeline estándar. Devuelve (pipeline, backend_efectivo).
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de inferencia desconocido: '{backend}'. Opciones: {BACKENDS}")
+
+    source = model_path or model_name
+    if backend == "pipeline":
+        return pipeline("zero-shot-classification", model=source), "pipeline"
+
+    try:
+        loader = _load_quantized if backend == "quantized" else _load_onnx
+        return loader(source), backend
+    except Exception as e:
+        print(f"Advertencia: No se pudo cargar el backend '{backend}' desde '{source}'. Se usará el pipeline estándar. Error: {e}")
+    # Respaldo: el pipeline original con el modelo de referencia
+    return pipeline("zero-shot-classification", model=model_name), "pipeline"
+
+def quantize(model):
+    """Cuantización dinámica int8 de las capas lineales, para inferencia en CPU."""
+    import torch
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+def _load_quantized(source: str):
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    model = AutoModelForSequenceClassification.from_pretrained(source)
+    model.eval()
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    return pipeline("zero-shot-classification", model=quantize(model), tokenizer=tokenizer)
+
+def _load_onnx(source: str):
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+    from transformers import AutoTokenizer
+
+    model = ORTModelForSequenceClassification.from_pretrained(source)
+    tokenizer = AutoTokenizer.from_pretrained(source)
+    return pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
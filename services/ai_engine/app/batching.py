@@ -0,0 +1,110 @@
+import asyncio
+import os
+from typing import Callable, List, Optional
+
+class MicroBatcher:
+    """
+    Agrupa las peticiones de clasificación que llegan en una ventana de pocos
+    milisegundos y las ejecuta juntas en una sola llamada al modelo.
+
+    Cada petición espera su propio resultado (un Future); el lote se ejecuta en un
+    hilo aparte para no bloquear el event loop mientras el modelo trabaja.
+    """
+    def __init__(self, classify_batch: Callable[[List[str]], List[dict]], max_batch_size: int = 16, max_wait_ms: float = 10):
+        self.classify_batch = classify_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.items = 0
+        self.errors = 0
+        # Histograma de tamaños de lote: límite superior del bucket -> cantidad de lotes
+        self._histogram_bounds = self._bounds(max_batch_size)
+        self.batch_size_histogram = {bound: 0 for bound in self._histogram_bounds}
+
+    @staticmethod
+    def _bounds(max_batch_size: int) -> List[int]:
+        bounds, bound = [], 1
+        while bound < max_batch_size:
+            bounds.append(bound)
+            bound *= 2
+        bounds.append(max_batch_size)
+        return bounds
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, text: str) -> dict:
+        """Encola un texto y espera el resultado de su lote."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((text, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Las peticiones canceladas (cliente desconectado) no se procesan
+            batch = [(text, future) for text, future in batch if not future.done()]
+            if not batch:
+                continue
+            self._record(len(batch))
+            try:
+                results = await loop.run_in_executor(None, self.classify_batch, [text for text, _ in batch])
+            except Exception as e:
+                self.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _record(self, size: int) -> None:
+        self.batches += 1
+        self.items += size
+        for bound in self._histogram_bounds:
+            if size <= bound:
+                self.batch_size_histogram[bound] += 1
+                break
+
+    def metrics(self) -> dict:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "items": self.items,
+            "errors": self.errors,
+            "mean_batch_size": (self.items / self.batches) if self.batches else 0.0,
+            "batch_size_histogram": {f"le_{bound}": count for bound, count in self.batch_size_histogram.items()},
+        }
+
+def create_batcher(classify_batch: Callable[[List[str]], List[dict]]) -> MicroBatcher:
+    return MicroBatcher(
+        classify_batch,
+        max_batch_size=int(os.getenv("AI_MAX_BATCH_SIZE", "16")),
+        max_wait_ms=float(os.getenv("AI_MAX_WAIT_MS", "10")),
+    )
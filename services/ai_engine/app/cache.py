@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+def normalize_text(text: str) -> str:
+    """Normaliza un texto para que variantes triviales compartan la misma entrada."""
+    return " ".join(unicodedata.normalize("NFKC", text).lower().split())
+
+class ResultCache:
+    """
+    Caché de resultados de clasificación direccionada por contenido.
+
+    La clave es un hash del texto normalizado, el identificador del modelo y el
+    conjunto de etiquetas, de modo que cambiar de modelo o de etiquetas no devuelve
+    resultados de otra configuración.
+
+    - Nivel en memoria: LRU acotada a 'max_entries'.
+    - Nivel en disco (opcional): SQLite en 'disk_path', sobrevive a reinicios y se
+      recorta a 'disk_max_entries' eliminando las entradas más antiguas.
+    """
+    def __init__(self, max_entries: int = 10000, disk_path: Optional[str] = None, disk_max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = None
+        self._disk_writes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.memory_evictions = 0
+        self.disk_evictions = 0
+        if disk_path:
+            self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+            self._disk.execute("PRAGMA journal_mode=WAL")
+            self._disk.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._disk.execute("CREATE INDEX IF NOT EXISTS ix_results_created_at ON results (created_at)")
+            self._disk.commit()
+
+    @staticmethod
+    def make_key(text: str, model_id: str, labels: Iterable[str]) -> str:
+        payload = "\x1f".join([normalize_text(text), model_id, "|".join(labels)])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str, count_miss: bool = True) -> Optional[dict]:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return value
+            if self._disk is not None:
+                row = self._disk.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._remember(key, value)
+                    self.disk_hits += 1
+                    return value
+            if count_miss:
+                self.misses += 1
+            return None
+
+    def put(self, key: str, value: dict) -> None:
+        with self._lock:
+            self._remember(key, value)
+            if self._disk is not None:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO results (key, value, created_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), time.time()),
+                )
+                self._disk.commit()
+                self._disk_writes += 1
+                # El recorte del nivel en disco se hace cada cierto número de escrituras
+                if self._disk_writes % 1000 == 0:
+                    self._trim_disk()
+
+    def _remember(self, key: str, value: dict) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.memory_evictions += 1
+
+    def _trim_disk(self) -> None:
+        (count,) = self._disk.execute("SELECT COUNT(*) FROM results").fetchone()
+        excess = count - self.disk_max_entries
+        if excess > 0:
+            self._disk.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY created_at LIMIT ?)", (excess,)
+            )
+            self._disk.commit()
+            self.disk_evictions += excess
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "memory_max_entries": self.max_entries,
+                "disk_enabled": self._disk is not None,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": ((self.memory_hits + self.disk_hits) / lookups) if lookups else 0.0,
+                "memory_evictions": self.memory_evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+def create_result_cache() -> ResultCache:
+    return ResultCache(
+        max_entries=int(os.getenv("AI_RESULT_CACHE_SIZE", "10000")),
+        disk_path=os.getenv("AI_RESULT_CACHE_PATH") or None,
+        disk_max_entries=int(os.getenv("AI_RESULT_CACHE_DISK_MAX", "1000000")),
+    )
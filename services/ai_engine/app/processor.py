@@ -1,21 +1,94 @@
-from transformers import pipeline
+import os
+import threading
+import time
+from typing import Callable, List, Optional
 from shared_models.models.environmental_entities import AspectType
+from .backends import BACKEND, MODEL_PATH, load_zero_shot, quantize
+from .cache import ResultCache, create_result_cache
+
+MODEL_NAME = os.getenv("AI_MODEL_NAME", "facebook/bart-large-mnli")
+
+# Textos por lote en las clasificaciones masivas: lotes pequeños mantienen acotada
+# la memoria de activaciones y aprovechan mejor la caché de la CPU
+BATCH_CHUNK_SIZE = int(os.getenv("AI_BATCH_CHUNK_SIZE", "32"))
+
+# Modos de clasificación:
+# - "pipeline": zero-shot NLI completo (una pasada del modelo por cada etiqueta).
+# - "embedding": las hipótesis de las etiquetas se codifican una sola vez al iniciar;
+#   cada texto requiere una única pasada del encoder más una similitud coseno.
+CLASSIFIER_MODES = ("pipeline", "embedding")
+CLASSIFIER_MODE = os.getenv("AI_CLASSIFIER_MODE", "pipeline")
+
+EMBEDDING_HYPOTHESIS_TEMPLATE = "Este aspecto ambiental es de tipo {}."
+# Temperatura del softmax sobre las similitudes coseno (más baja = más contraste)
+EMBEDDING_TEMPERATURE = float(os.getenv("AI_EMBEDDING_TEMPERATURE", "0.05"))
 
 class AspectClassifier:
     """
     Esta clase carga un modelo de NLP y lo utiliza para clasificar
     descripciones de aspectos ambientales.
     """
-    def __init__(self):
-        # Cargamos el pipeline de "zero-shot-classification".
-        # Esto descarga un modelo pre-entrenado la primera vez que se ejecuta.
+    def __init__(
+        self,
+        mode: str = CLASSIFIER_MODE,
+        model_name: str = MODEL_NAME,
+        cache: Optional[ResultCache] = None,
+        backend: str = BACKEND,
+        model_path: Optional[str] = MODEL_PATH,
+    ):
+        if mode not in CLASSIFIER_MODES:
+            raise ValueError(f"Modo de clasificación desconocido: '{mode}'. Opciones: {CLASSIFIER_MODES}")
+        self.mode = mode
+        self.model_name = model_name
+        self.model_path = model_path
+        self.backend = backend
+        self.cache = cache
+
+        # Obtenemos las posibles etiquetas de nuestro modelo compartido (una sola vez)
+        self.candidate_labels = [e.value for e in AspectType]
+
         # El modelo solo se carga una vez al iniciar el servicio, lo que es muy eficiente.
-        print("Cargando el modelo de IA. Esto puede tardar un momento...")
-        self.classifier = pipeline(
-            "zero-shot-classification", 
-            model="facebook/bart-large-mnli"
-        )
-        print("Modelo de IA cargado exitosamente.")
+        print(f"Cargando el modelo de IA (modo '{mode}', backend '{backend}'). Esto puede tardar un momento...")
+        if mode == "pipeline":
+            # Cargamos el pipeline de "zero-shot-classification" con el backend configurado.
+            # Esto descarga un modelo pre-entrenado la primera vez que se ejecuta.
+            self.classifier, self.backend = load_zero_shot(model_name, backend=backend, model_path=model_path)
+        else:
+            self._load_embedding_model()
+        # Identificador del modelo para la caché de resultados
+        self.model_id = f"{model_name}:{mode}:{self.backend}"
+        print(f"Modelo de IA cargado exitosamente (backend '{self.backend}').")
+
+    def _load_embedding_model(self):
+        import torch
+        from transformers import AutoModel, AutoTokenizer
+
+        self._torch = torch
+        source = self.model_path or self.model_name
+        self.tokenizer = AutoTokenizer.from_pretrained(source)
+        model = AutoModel.from_pretrained(source)
+        model.eval()
+        # Este modo solo admite la cuantización int8 de PyTorch; ONNX usa precisión completa
+        if self.backend == "quantized":
+            model = quantize(model)
+        else:
+            self.backend = "pipeline"
+        # En modelos encoder-decoder (BART) solo necesitamos el encoder
+        self.encoder = model.get_encoder() if hasattr(model, "get_encoder") else model
+
+        # Las hipótesis de cada etiqueta se codifican una única vez y quedan en caché
+        hypotheses = [EMBEDDING_HYPOTHESIS_TEMPLATE.format(label) for label in self.candidate_labels]
+        self.label_embeddings = self._encode(hypotheses)
+
+    def _encode(self, texts: List[str]):
+        """Embeddings normalizados (media de los estados ocultos del encoder)."""
+        torch = self._torch
+        inputs = self.tokenizer(texts, padding=True, truncation=True, return_tensors="pt")
+        with torch.inference_mode():
+            hidden = self.encoder(input_ids=inputs["input_ids"], attention_mask=inputs["attention_mask"]).last_hidden_state
+        mask = inputs["attention_mask"].unsqueeze(-1).to(hidden.dtype)
+        pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+        return torch.nn.functional.normalize(pooled, dim=-1)
 
     def classify(self, text_to_analyze: str) -> dict:
         """
@@ -24,16 +97,151 @@ class AspectClassifier:
         Zero-shot significa que podemos darle las etiquetas de clasificación
         en el momento, sin necesidad de re-entrenar el modelo.
         """
-        # Obtenemos las posibles etiquetas de nuestro modelo compartido
-        candidate_labels = [e.value for e in AspectType]
-        
+        return self.classify_batch([text_to_analyze])[0]
+
+    def classify_batch(self, texts: List[str]) -> List[dict]:
+        """
+        Clasifica varios textos en una sola llamada al modelo, que los procesa
+        en lotes y amortiza el costo fijo de cada invocación. Los textos ya
+        clasificados se resuelven desde la caché sin ejecutar el modelo.
+        """
+        if not texts:
+            return []
+        if self.cache is None:
+            return self._run_model(texts)
+
+        keys = [self._cache_key(text) for text in texts]
+        results = [self.cache.get(key) for key in keys]
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            computed = self._run_model([texts[i] for i in pending])
+            for i, result in zip(pending, computed):
+                self.cache.put(keys[i], result)
+                results[i] = result
+        return results
+
+    def cached_result(self, text: str) -> Optional[dict]:
+        """Devuelve el resultado en caché de un texto, o None si hay que ejecutar el modelo."""
+        if self.cache is None:
+            return None
+        # El fallo no se contabiliza aquí: se contará al clasificar el texto
+        return self.cache.get(self._cache_key(text), count_miss=False)
+
+    def _cache_key(self, text: str) -> str:
+        return ResultCache.make_key(text, self.model_id, self.candidate_labels)
+
+    def _run_model(self, texts: List[str]) -> List[dict]:
+        if self.mode == "embedding":
+            return self._classify_embedding(texts)
+        return self._classify_pipeline(texts)
+
+    def _classify_pipeline(self, texts: List[str]) -> List[dict]:
         # El modelo devuelve las etiquetas ordenadas por probabilidad
-        result = self.classifier(text_to_analyze, candidate_labels)
+        results = self.classifier(texts, self.candidate_labels, batch_size=len(texts))
+        if isinstance(results, dict):
+            results = [results]
         
+        return [
+            {
+                "suggested_category": result['labels'][0],
+                "confidence_score": result['scores'][0]
+            }
+            for result in results
+        ]
+
+    def _classify_embedding(self, texts: List[str]) -> List[dict]:
+        # Una pasada del encoder por texto y similitud contra las hipótesis en caché
+        similarities = self._encode(texts) @ self.label_embeddings.T
+        scores = self._torch.softmax(similarities / EMBEDDING_TEMPERATURE, dim=-1)
+        best_scores, best_labels = scores.max(dim=-1)
+        return [
+            {
+                "suggested_category": self.candidate_labels[label_index],
+                "confidence_score": float(score)
+            }
+            for score, label_index in zip(best_scores.tolist(), best_labels.tolist())
+        ]
+
+    def classify_many(self, texts: List[str], chunk_size: int = BATCH_CHUNK_SIZE) -> List[dict]:
+        """Clasifica una lista arbitrariamente larga de textos en lotes de 'chunk_size'."""
+        results = []
+        for start in range(0, len(texts), chunk_size):
+            results.extend(self.classify_batch(texts[start:start + chunk_size]))
+        return results
+
+class ClassifierLoader:
+    """
+    Carga el clasificador en un hilo en segundo plano para que el servicio arranque
+    de inmediato. Expone el estado de la carga (pending, loading, ready, failed)
+    y permite esperar a que el modelo esté listo con un tiempo máximo.
+    """
+    def __init__(self, factory: Callable[[], AspectClassifier]):
+        self._factory = factory
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.classifier: Optional[AspectClassifier] = None
+        self.state = "pending"
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._load, name="model-loader", daemon=True)
+            self._thread.start()
+
+    def _load(self) -> None:
+        self.state = "loading"
+        self.started_at = time.monotonic()
+        try:
+            self.classifier = self._factory()
+            self.state = "ready"
+        except Exception as e:
+            self.error = str(e)
+            self.state = "failed"
+            print(f"Error: No se pudo cargar el modelo de IA: {e}")
+        finally:
+            self.finished_at = time.monotonic()
+            self._ready.set()
+
+    def wait(self, timeout: float) -> Optional[AspectClassifier]:
+        """Espera hasta 'timeout' segundos a que el modelo cargue; None si no está listo."""
+        self._ready.wait(timeout)
+        return self.classifier if self.ready else None
+
+    def status(self) -> dict:
+        end = self.finished_at or time.monotonic()
         return {
-            "suggested_category": result['labels'][0],
-            "confidence_score": result['scores'][0]
+            "state": self.state,
+            "elapsed_seconds": round(end - self.started_at, 1) if self.started_at else 0.0,
+            "mode": CLASSIFIER_MODE,
+            "backend": self.classifier.backend if self.classifier else BACKEND,
+            "error": self.error,
         }
 
-# Creamos una única instancia global del clasificador para toda la aplicación
-classifier = AspectClassifier()
\ No newline at end of file
+# Respuesta inmediata mientras el modelo no está listo: reglas por palabras clave,
+# con confianza 0 para que los clientes puedan distinguirla de una predicción real
+FALLBACK_KEYWORDS = [
+    (AspectType.EMISSION, ("emisi", "gases", "humo", "escape", "fuga", "vapor", "ruido", "particulado")),
+    (AspectType.WASTE_GENERATION, ("residuo", "desecho", "basura", "chatarra", "lodo", "escombro")),
+    (AspectType.RESOURCE_USE, ("agua", "suelo", "madera", "bosque", "extracci", "captaci", "árido")),
+    (AspectType.CONSUMPTION, ("consumo", "energ", "combustible", "electric", "gas natural", "papel")),
+]
+
+def fallback_classify(text: str) -> dict:
+    lowered = text.lower()
+    for aspect_type, keywords in FALLBACK_KEYWORDS:
+        if any(keyword in lowered for keyword in keywords):
+            return {"suggested_category": aspect_type.value, "confidence_score": 0.0}
+    return {"suggested_category": AspectType.CONSUMPTION.value, "confidence_score": 0.0}
+
+# Caché de resultados compartida, disponible aunque el modelo aún no haya cargado
+result_cache = create_result_cache()
+
+# Cargador único del clasificador para toda la aplicación; la carga comienza al
+# iniciar la aplicación (ver main.py), no al importar este módulo
+loader = ClassifierLoader(lambda: AspectClassifier(cache=result_cache))
@@ -1,10 +1,14 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 class AnalysisRequest(BaseModel):
     """El texto que queremos analizar."""
     text: str
 
+class BatchAnalysisRequest(BaseModel):
+    """Varios textos a analizar en una sola llamada."""
+    texts: List[str] = Field(..., max_length=10000)
+
 class AnalysisResponse(BaseModel):
     """La respuesta del modelo de IA."""
     suggested_category: str
@@ -0,0 +1,86 @@
+"""
+Compara los backends de inferencia del pipeline zero-shot ('pipeline', 'quantized',
+'onnx') sobre el corpus de descripciones etiquetadas: tiempo de carga, latencia
+p50/p99, memoria residente (RSS) y tasa de concordancia con el backend de referencia.
+
+Cada backend se carga en un proceso separado para que la medición de RSS no se
+contamine con los modelos cargados antes.
+
+Uso (desde services/ai_engine, con shared_models en el PYTHONPATH):
+    python -m benchmarks.benchmark_backends [--backends pipeline,quantized,onnx] \\
+        [--model-path /models/bart-large-mnli] [--onnx-path /models/bart-large-mnli-onnx]
+"""
+import argparse
+import json
+import multiprocessing
+import time
+from pathlib import Path
+
+from .benchmark_modes import CORPUS_PATH, percentile
+
+def rss_mb() -> float:
+    """Memoria residente actual del proceso (Linux)."""
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+def run_backend(backend, model_path, corpus, repeat, queue):
+    from app.processor import AspectClassifier
+
+    baseline_rss = rss_mb()
+    started = time.perf_counter()
+    classifier = AspectClassifier(mode="pipeline", backend=backend, model_path=model_path)
+    load_seconds = time.perf_counter() - started
+
+    latencies, predictions = [], []
+    for _ in range(repeat):
+        predictions = []
+        for item in corpus:
+            t0 = time.perf_counter()
+            result = classifier.classify(item["text"])
+            latencies.append((time.perf_counter() - t0) * 1000)
+            predictions.append(result["suggested_category"])
+
+    queue.put({
+        "backend": backend,
+        "effective_backend": classifier.backend,
+        "load_s": load_seconds,
+        "rss_mb": rss_mb() - baseline_rss,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "accuracy": sum(p == item["label"] for p, item in zip(predictions, corpus)) / len(corpus),
+        "predictions": predictions,
+    })
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", default="pipeline,quantized,onnx")
+    parser.add_argument("--model-path", default=None, help="Modelo fp32 local (pipeline y quantized)")
+    parser.add_argument("--onnx-path", default=None, help="Modelo exportado a ONNX (onnx)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    corpus = json.loads(args.corpus.read_text(encoding="utf-8"))
+    context = multiprocessing.get_context("spawn")
+    results = []
+    for backend in args.backends.split(","):
+        model_path = args.onnx_path if backend == "onnx" else args.model_path
+        queue = context.Queue()
+        process = context.Process(target=run_backend, args=(backend, model_path, corpus, args.repeat, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    baseline = results[0]
+    print(f"\nCorpus: {len(corpus)} descripciones, {args.repeat} repeticiones; referencia: {baseline['backend']}\n")
+    print(f"{'backend':<10} {'efectivo':<10} {'carga (s)':>10} {'RSS (MB)':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'precisión':>10} {'concordancia':>13}")
+    for r in results:
+        agreement = sum(a == b for a, b in zip(baseline["predictions"], r["predictions"])) / len(corpus)
+        print(f"{r['backend']:<10} {r['effective_backend']:<10} {r['load_s']:>10.1f} {r['rss_mb']:>10.0f} "
+              f"{r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f} {r['accuracy']:>10.2%} {agreement:>13.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compara la precisión y la latencia de los modos de clasificación de AspectClassifier
+('pipeline' zero-shot NLI vs. 'embedding' con hipótesis precalculadas) sobre un
+corpus de descripciones etiquetadas.
+
+Uso (desde services/ai_engine, con shared_models en el PYTHONPATH):
+    python -m benchmarks.benchmark_modes [--modes pipeline,embedding] [--repeat 3]
+"""
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.processor import AspectClassifier, CLASSIFIER_MODES
+
+CORPUS_PATH = Path(__file__).parent / "aspect_corpus.json"
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+def run_mode(mode, corpus, repeat):
+    started = time.perf_counter()
+    classifier = AspectClassifier(mode=mode)
+    load_seconds = time.perf_counter() - started
+
+    latencies, predictions = [], []
+    for _ in range(repeat):
+        predictions = []
+        for item in corpus:
+            t0 = time.perf_counter()
+            result = classifier.classify(item["text"])
+            latencies.append((time.perf_counter() - t0) * 1000)
+            predictions.append(result["suggested_category"])
+
+    t0 = time.perf_counter()
+    classifier.classify_many([item["text"] for item in corpus])
+    batch_ms = (time.perf_counter() - t0) * 1000
+
+    correct = sum(pred == item["label"] for pred, item in zip(predictions, corpus))
+    return {
+        "mode": mode,
+        "load_s": load_seconds,
+        "accuracy": correct / len(corpus),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 99),
+        "batch_ms_per_text": batch_ms / len(corpus),
+        "predictions": predictions,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", default=",".join(CLASSIFIER_MODES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--corpus", type=Path, default=CORPUS_PATH)
+    args = parser.parse_args()
+
+    corpus = json.loads(args.corpus.read_text(encoding="utf-8"))
+    results = [run_mode(mode, corpus, args.repeat) for mode in args.modes.split(",")]
+
+    print(f"\nCorpus: {len(corpus)} descripciones, {args.repeat} repeticiones\n")
+    print(f"{'modo':<10} {'carga (s)':>10} {'precisión':>10} {'p50 (ms)':>10} {'p99 (ms)':>10} {'lote (ms/texto)':>16}")
+    for r in results:
+        print(f"{r['mode']:<10} {r['load_s']:>10.1f} {r['accuracy']:>10.2%} {r['p50_ms']:>10.1f} {r['p99_ms']:>10.1f} {r['batch_ms_per_text']:>16.1f}")
+
+    # Concordancia de cada modo con el primero (normalmente 'pipeline')
+    baseline = results[0]
+    for r in results[1:]:
+        agreement = sum(a == b for a, b in zip(baseline["predictions"], r["predictions"])) / len(corpus)
+        print(f"\nConcordancia {r['mode']} vs {baseline['mode']}: {agreement:.2%}")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,25 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+
+from app.api import router as api_router, batcher
+from app.processor import loader
 
-from app.api import router as api_router
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El modelo se carga en segundo plano: la aplicación acepta peticiones de inmediato
+    loader.start()
+    # El planificador de micro-lotes vive mientras la aplicación esté activa
+    await batcher.start()
+    yield
+    await batcher.stop()
 
 app = FastAPI(
     title="Motor de IA del SGA - ISO 14001:2026",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = ["http://localhost:5173", "http://localhost:5174"]
@@ -23,3 +37,9 @@ app.include_router(api_router, prefix="/api/v1")
 @app.get("/", tags=["Health Check"])
 def read_root():
     return {"status": "ok", "service": "AI Engine"}
+
+@app.get("/ready", tags=["Health Check"])
+def read_readiness():
+    """Readiness: 200 cuando el modelo está cargado, 503 con el progreso de la carga si no."""
+    status = loader.status()
+    return JSONResponse(status_code=200 if loader.ready else 503, content=status)
@@ -0,0 +1,41 @@
+"""
+Exporta el modelo de clasificación a ONNX (opcionalmente cuantizado a int8) para
+usarlo con AI_BACKEND=onnx y AI_MODEL_PATH=<directorio de salida>.
+
+Requiere: pip install "optimum[onnxruntime]"
+
+Uso:
+    python scripts/export_model.py --output /models/bart-large-mnli-onnx [--quantize]
+"""
+import argparse
+import os
+
+from transformers import AutoTokenizer
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=os.getenv("AI_MODEL_NAME", "facebook/bart-large-mnli"))
+    parser.add_argument("--output", required=True)
+    parser.add_argument("--quantize", action="store_true", help="Cuantización dinámica int8 del grafo ONNX")
+    args = parser.parse_args()
+
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    print(f"Exportando '{args.model}' a ONNX en '{args.output}'...")
+    model = ORTModelForSequenceClassification.from_pretrained(args.model, export=True)
+    model.save_pretrained(args.output)
+    AutoTokenizer.from_pretrained(args.model).save_pretrained(args.output)
+
+    if args.quantize:
+        from optimum.onnxruntime import ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+
+        print("Cuantizando el modelo ONNX a int8...")
+        quantizer = ORTQuantizer.from_pretrained(args.output)
+        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=args.output, quantization_config=qconfig)
+
+    print("Exportación completada.")
+
+if __name__ == "__main__":
+    main()
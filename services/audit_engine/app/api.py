@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from shared_models.models.projection import ProjectionError, parse_projection
 from . import crud
-from .db import get_db
+from .db import engine, get_db
 
 router = APIRouter()
 
@@ -13,8 +16,20 @@ def create_audit(audit: schemas.AuditCreate, db: Session = Depends(get_db)):
     return crud.create_audit(db=db, audit=audit)
 
 @router.get("/audits/", response_model=List[schemas.Audit], tags=["Auditorías"])
-def read_audits(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    audits = crud.get_audits(db, skip=skip, limit=limit)
+def read_audits(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (id siempre se incluye)"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir (findings); vacío para ninguna"),
+    db: Session = Depends(get_db)
+):
+    try:
+        projection = parse_projection(schemas.Audit, fields=fields, expand=expand)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    audits = crud.get_audits(db, skip=skip, limit=limit, expand=projection.expand)
+    if not projection.is_full:
+        return JSONResponse([projection.dump(audit) for audit in audits])
     return audits
 
 @router.post("/audits/{audit_id}/findings/", response_model=schemas.AuditFinding, tags=["Auditorías"])
@@ -22,4 +37,9 @@ def create_finding_for_audit(audit_id: int, finding: schemas.AuditFindingCreate,
     db_audit = crud.get_audit(db, audit_id=audit_id)
     if db_audit is None:
         raise HTTPException(status_code=404, detail="Auditoría no encontrada")
-    return crud.create_finding_for_audit(db=db, finding=finding, audit_id=audit_id)
\ No newline at end of file
+    return crud.create_finding_for_audit(db=db, finding=finding, audit_id=audit_id)
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from shared_models.models.projection import ProjectionError, parse_projection
+from . import crud_async
+from .db import async_engine, get_async_db
+
+# Mismos endpoints que api.py, con AsyncSession (se usa cuando DB_ASYNC=true)
+router = APIRouter()
+
+@router.post("/audits/", response_model=schemas.Audit, tags=["Auditorías"])
+async def create_audit(audit: schemas.AuditCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_audit(db=db, audit=audit)
+
+@router.get("/audits/", response_model=List[schemas.Audit], tags=["Auditorías"])
+async def read_audits(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (id siempre se incluye)"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir (findings); vacío para ninguna"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        projection = parse_projection(schemas.Audit, fields=fields, expand=expand)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    audits = await crud_async.get_audits(db, skip=skip, limit=limit, expand=projection.expand)
+    if not projection.is_full:
+        return JSONResponse([projection.dump(audit) for audit in audits])
+    return audits
+
+@router.post("/audits/{audit_id}/findings/", response_model=schemas.AuditFinding, tags=["Auditorías"])
+async def create_finding_for_audit(audit_id: int, finding: schemas.AuditFindingCreate, db: AsyncSession = Depends(get_async_db)):
+    db_audit = await crud_async.get_audit(db, audit_id=audit_id)
+    if db_audit is None:
+        raise HTTPException(status_code=404, detail="Auditoría no encontrada")
+    return await crud_async.create_finding_for_audit(db=db, finding=finding, audit_id=audit_id)
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones asíncrono y tiempos de espera de checkout."""
+    return pool_metrics(async_engine)
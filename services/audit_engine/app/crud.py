@@ -1,13 +1,20 @@
-from sqlalchemy.orm import Session, joinedload
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session, selectinload
 from . import models
 from shared_models.models import environmental_entities as schemas
 
+def audit_load_options(expand: Optional[Iterable[str]] = None) -> list:
+    # selectinload: los hallazgos de toda la página en una consulta IN, sin que el
+    # LIMIT/OFFSET se aplique sobre filas duplicadas por el join
+    names = ("findings",) if expand is None else expand
+    return [selectinload(getattr(models.Audit, name)) for name in names]
+
 def get_audit(db: Session, audit_id: int):
-    # Usamos joinedload para cargar siempre los hallazgos junto con la auditoría
-    return db.query(models.Audit).options(joinedload(models.Audit.findings)).filter(models.Audit.id == audit_id).first()
+    return db.query(models.Audit).options(*audit_load_options()).filter(models.Audit.id == audit_id).first()
 
-def get_audits(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Audit).options(joinedload(models.Audit.findings)).offset(skip).limit(limit).all()
+def get_audits(db: Session, skip: int = 0, limit: int = 100, expand: Optional[Iterable[str]] = None):
+    return db.query(models.Audit).options(*audit_load_options(expand)).order_by(models.Audit.id).offset(skip).limit(limit).all()
 
 def create_audit(db: Session, audit: schemas.AuditCreate):
     db_audit = models.Audit(**audit.dict())
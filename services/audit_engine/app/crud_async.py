@@ -0,0 +1,42 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import models
+from shared_models.models import environmental_entities as schemas
+
+# Versión asíncrona de crud.py (modo DB_ASYNC). En una AsyncSession no hay carga
+# perezosa implícita: todo lo que serializa la respuesta se carga por adelantado.
+
+def _audit_options(expand: Optional[Iterable[str]] = None) -> list:
+    names = ("findings",) if expand is None else expand
+    # La relación inversa (AuditFinding.audit) también se serializa: se carga en la misma pasada
+    return [selectinload(getattr(models.Audit, name)).selectinload(models.AuditFinding.audit) for name in names]
+
+async def get_audit(db: AsyncSession, audit_id: int):
+    result = await db.execute(
+        select(models.Audit).options(*_audit_options()).where(models.Audit.id == audit_id)
+    )
+    return result.scalars().first()
+
+async def get_audits(db: AsyncSession, skip: int = 0, limit: int = 100, expand: Optional[Iterable[str]] = None):
+    result = await db.execute(
+        select(models.Audit).options(*_audit_options(expand)).order_by(models.Audit.id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_audit(db: AsyncSession, audit: schemas.AuditCreate):
+    db_audit = models.Audit(**audit.dict())
+    db.add(db_audit)
+    await db.commit()
+    return await get_audit(db, db_audit.id)
+
+async def create_finding_for_audit(db: AsyncSession, finding: schemas.AuditFindingCreate, audit_id: int):
+    db_finding = models.AuditFinding(**finding.dict(), audit_id=audit_id)
+    db.add(db_finding)
+    await db.commit()
+    result = await db.execute(
+        select(models.AuditFinding).options(selectinload(models.AuditFinding.audit)).where(models.AuditFinding.id == db_finding.id)
+    )
+    return result.scalars().one()
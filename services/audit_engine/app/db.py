@@ -1,15 +1,33 @@
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from shared_models.models.database import async_mode_enabled, create_async_db_engine, create_db_engine, split_pool_budget
 
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_DB = async_mode_enabled()
+# En modo asíncrono los dos motores se reparten el presupuesto de conexiones del
+# proceso; el síncrono solo atiende tareas en segundo plano y el esquema
+sync_pool, async_pool = split_pool_budget(SQLALCHEMY_DATABASE_URL, sync_share=0.2) if ASYNC_DB else ({}, {})
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, application_name="audit_engine", **sync_pool)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Modo asíncrono (DB_ASYNC=true): AsyncSession sobre asyncpg (o aiosqlite en pruebas).
+# El motor síncrono se mantiene para las tareas en segundo plano y el esquema.
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL, application_name="audit_engine", **async_pool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Equivalente asíncrono de get_db: una AsyncSession por petición."""
+    async with AsyncSessionLocal() as db:
+        yield db
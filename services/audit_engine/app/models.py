@@ -19,5 +19,5 @@ class AuditFinding(Base):
     evidence = Column(String)
     clause = Column(String)
     finding_type = Column(SQLAlchemyEnum(FindingType))
-    audit_id = Column(Integer, ForeignKey("audits.id"))
+    audit_id = Column(Integer, ForeignKey("audits.id"), index=True)
     audit = relationship("Audit", back_populates="findings")
\ No newline at end of file
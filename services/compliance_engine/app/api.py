@@ -3,8 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
 from . import crud
-from .db import get_db
+from .db import engine, get_db
 
 router = APIRouter()
 
@@ -25,4 +26,9 @@ def link_obligation_to_aspect(aspect_id: int, obligation_id: int, db: Session =
     linked_obligation = crud.link_obligation_to_aspect(db=db, aspect_id=aspect_id, obligation_id=obligation_id)
     if linked_obligation is None:
         raise HTTPException(status_code=404, detail="Aspecto u Obligación no encontrados")
-    return linked_obligation
\ No newline at end of file
+    return linked_obligation
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
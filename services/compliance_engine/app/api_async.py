@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from . import crud_async
+from .db import async_engine, get_async_db
+
+# Mismos endpoints que api.py, con AsyncSession (se usa cuando DB_ASYNC=true)
+router = APIRouter()
+
+@router.post("/obligations/", response_model=schemas.ComplianceObligation, tags=["Obligaciones de Cumplimiento"])
+async def create_compliance_obligation(obligation: schemas.ComplianceObligationCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_obligation(db=db, obligation=obligation)
+
+@router.get("/obligations/", response_model=List[schemas.ComplianceObligation], tags=["Obligaciones de Cumplimiento"])
+async def read_compliance_obligations(skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.get_obligations(db, skip=skip, limit=limit)
+
+@router.post("/aspects/{aspect_id}/obligations/{obligation_id}", response_model=schemas.ComplianceObligation, tags=["Obligaciones de Cumplimiento"])
+async def link_obligation_to_aspect(aspect_id: int, obligation_id: int, db: AsyncSession = Depends(get_async_db)):
+    linked_obligation = await crud_async.link_obligation_to_aspect(db=db, aspect_id=aspect_id, obligation_id=obligation_id)
+    if linked_obligation is None:
+        raise HTTPException(status_code=404, detail="Aspecto u Obligación no encontrados")
+    return linked_obligation
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones asíncrono y tiempos de espera de checkout."""
+    return pool_metrics(async_engine)
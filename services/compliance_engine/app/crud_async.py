@@ -0,0 +1,69 @@
+import sys
+import traceback
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlalchemy.sql import text
+from . import models
+from shared_models.models import environmental_entities as schemas
+
+# Versión asíncrona de crud.py (modo DB_ASYNC). Los aspectos vinculados se cargan
+# por adelantado porque una AsyncSession no admite carga perezosa implícita.
+
+async def get_obligation(db: AsyncSession, obligation_id: int):
+    """
+    Obtiene una obligación de cumplimiento por su ID.
+    """
+    result = await db.execute(
+        select(models.ComplianceObligation)
+        .options(selectinload(models.ComplianceObligation.aspects))
+        .where(models.ComplianceObligation.id == obligation_id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().first()
+
+async def get_obligations(db: AsyncSession, skip: int = 0, limit: int = 100):
+    """
+    Obtiene una lista de obligaciones de cumplimiento.
+    """
+    result = await db.execute(
+        select(models.ComplianceObligation)
+        .options(selectinload(models.ComplianceObligation.aspects))
+        .order_by(models.ComplianceObligation.id)
+        .offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_obligation(db: AsyncSession, obligation: schemas.ComplianceObligationCreate):
+    """
+    Crea una nueva obligación de cumplimiento en la base de datos.
+    """
+    db_obligation = models.ComplianceObligation(**obligation.dict())
+    db.add(db_obligation)
+    await db.commit()
+    return await get_obligation(db, db_obligation.id)
+
+async def link_obligation_to_aspect(db: AsyncSession, aspect_id: int, obligation_id: int):
+    """
+    Vincula un aspecto ambiental existente a una obligación de cumplimiento existente.
+    """
+    try:
+        obligation = await db.get(models.ComplianceObligation, obligation_id)
+        if not obligation:
+            print("Obligation not found, returning None", file=sys.stderr)
+            return None
+
+        insert_stmt = text(
+            "INSERT INTO aspect_obligation_link (aspect_id, obligation_id) VALUES (:aspect_id, :obligation_id)"
+        )
+        await db.execute(insert_stmt, {"aspect_id": aspect_id, "obligation_id": obligation_id})
+        await db.commit()
+
+        # Se vuelve a leer la obligación para incluir el nuevo vínculo
+        return await get_obligation(db, obligation_id)
+    except Exception as e:
+        await db.rollback()
+        print(f"CRITICAL ERROR in link_obligation_to_aspect: {e}", file=sys.stderr)
+        traceback.print_exc(file=sys.stderr)
+        raise
@@ -1,12 +1,29 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status, Depends
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from shared_models.models.projection import ProjectionError, parse_projection
 from . import crud, models
-from .db import get_db
+from .db import engine, get_db
+from .http_client import ai_client
 
 router = APIRouter()
 
+@router.get("/version", tags=["Métricas"])
+def read_data_version(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Versión actual de los datos del SGA. Responde 304 si coincide con If-None-Match,
+    lo que permite a otros servicios validar sus cachés con una consulta mínima.
+    """
+    etag = f'"{crud.get_data_version(db)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"version": etag.strip('"')}
+
 @router.get("/policy", response_model=Optional[schemas.EnvironmentalPolicy], tags=["Política Ambiental"])
 def read_environmental_policy(db: Session = Depends(get_db)):
     # ... (código sin cambios)
@@ -26,9 +43,37 @@ def create_environmental_aspect(aspect: schemas.EnvironmentalAspectCreate, db: S
     return crud.create_aspect(db=db, aspect=aspect)
 
 @router.get("/aspects", response_model=List[schemas.EnvironmentalAspect], tags=["Aspectos Ambientales"])
-def read_environmental_aspects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    # ... (código sin cambios)
-    aspects = crud.get_aspects(db, skip=skip, limit=limit)
+def read_environmental_aspects(
+    response: Response,
+    skip: int = 0,
+    limit: int = Query(100, ge=1, le=1000),
+    is_significant: Optional[bool] = None,
+    aspect_type: Optional[schemas.AspectType] = None,
+    lifecycle_stage: Optional[schemas.LifecycleStage] = None,
+    updated_since: Optional[datetime] = None,
+    after_id: Optional[int] = Query(None, description="Cursor: devuelve aspectos con id mayor a este valor"),
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (id siempre se incluye)"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir (risks, obligations); vacío para ninguna"),
+    db: Session = Depends(get_db)
+):
+    """
+    Lista aspectos filtrados en el servidor. Si la página está llena, la cabecera
+    X-Next-Cursor trae el valor de `after_id` para pedir la siguiente. Con
+    `fields`/`expand` la respuesta se recorta y las relaciones no pedidas no se consultan.
+    """
+    try:
+        projection = parse_projection(schemas.EnvironmentalAspect, fields=fields, expand=expand)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    aspects = crud.get_aspects(
+        db, skip=skip, limit=limit, is_significant=is_significant, aspect_type=aspect_type,
+        lifecycle_stage=lifecycle_stage, updated_since=updated_since, after_id=after_id,
+        expand=projection.expand
+    )
+    headers = {"X-Next-Cursor": str(aspects[-1].id)} if len(aspects) == limit else {}
+    if not projection.is_full:
+        return JSONResponse([projection.dump(aspect) for aspect in aspects], headers=headers)
+    response.headers.update(headers)
     return aspects
 
 @router.get("/aspects/{aspect_id}", response_model=schemas.EnvironmentalAspect, tags=["Aspectos Ambientales"])
@@ -37,4 +82,26 @@ def read_environmental_aspect(aspect_id: int, db: Session = Depends(get_db)):
     db_aspect = crud.get_aspect(db, aspect_id=aspect_id)
     if db_aspect is None:
         raise HTTPException(status_code=404, detail="Aspecto ambiental no encontrado")
-    return db_aspect
\ No newline at end of file
+    return db_aspect
+
+@router.get("/aspects/{aspect_id}/classification", response_model=schemas.AspectClassification, tags=["Aspectos Ambientales"])
+def read_aspect_classification(aspect_id: int, db: Session = Depends(get_db)):
+    """Estado de la clasificación asíncrona del aspecto, para consultar periódicamente."""
+    db_aspect = crud.get_aspect(db, aspect_id=aspect_id)
+    if db_aspect is None:
+        raise HTTPException(status_code=404, detail="Aspecto ambiental no encontrado")
+    return schemas.AspectClassification(
+        aspect_id=db_aspect.id,
+        aspect_type=db_aspect.aspect_type,
+        classification_status=db_aspect.classification_status,
+    )
+
+@router.get("/metrics/http", tags=["Métricas"])
+def read_http_metrics():
+    """Estado del disyuntor y latencias de las llamadas al Motor de IA."""
+    return ai_client.metrics()
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
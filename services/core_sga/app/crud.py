@@ -1,8 +1,26 @@
-import requests
-from sqlalchemy.orm import Session
-from . import models
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session, selectinload
+from . import enrichment, models
 from shared_models.models import environmental_entities as schemas
-from shared_models.models.environmental_entities import AspectType
+from shared_models.models.data_version import read_data_version
+from shared_models.models.environmental_entities import AspectType, LifecycleStage
+
+# --- Versión de los datos (para ETag) ---
+# Tablas del registro del SGA que consume el reporte (sus versiones viven en data_versions y data_changes)
+DATA_VERSION_TABLES = (
+    "environmental_policies", "environmental_aspects", "aspect_obligation_link",
+    "risks", "objectives", "indicators",
+)
+
+def get_data_version(db: Session) -> str:
+    """
+    Versión del registro del SGA a partir de las versiones por tabla de las
+    tablas que consume el reporte (todas viven en la misma base, así que riesgos y
+    objetivos también quedan cubiertos). Cambia en cuanto se escribe cualquiera de ellas.
+    """
+    return read_data_version(db, DATA_VERSION_TABLES)
 
 # --- CRUD para Política Ambiental ---
 def get_policy(db: Session) -> models.EnvironmentalPolicy | None:
@@ -21,37 +39,57 @@ def update_policy(db: Session, policy_data: schemas.EnvironmentalPolicyCreate) -
     return db_policy
 
 # --- CRUD para Aspectos Ambientales (CON INTEGRACIÓN DE IA) ---
-from sqlalchemy.orm import Session, joinedload
-# ... (otras importaciones)
+ASPECT_RELATIONS = ("risks", "obligations")
+
+def aspect_load_options(expand: Optional[Iterable[str]] = None) -> list:
+    """
+    selectinload de las relaciones pedidas (todas por defecto): una consulta IN por
+    relación y página, en lugar del producto cartesiano de dos joinedload de colecciones.
+    """
+    names = ASPECT_RELATIONS if expand is None else expand
+    return [selectinload(getattr(models.EnvironmentalAspect, name)) for name in names]
 
 def get_aspect(db: Session, aspect_id: int):
-    # CAMBIO: Añadimos joinedload para cargar riesgos y obligaciones
     return db.query(models.EnvironmentalAspect).options(
-        joinedload(models.EnvironmentalAspect.risks),
-        joinedload(models.EnvironmentalAspect.obligations)
+        *aspect_load_options()
     ).filter(models.EnvironmentalAspect.id == aspect_id).first()
 
-def get_aspects(db: Session, skip: int = 0, limit: int = 100):
-    # CAMBIO: Añadimos joinedload aquí también
-    return db.query(models.EnvironmentalAspect).options(
-        joinedload(models.EnvironmentalAspect.risks),
-        joinedload(models.EnvironmentalAspect.obligations)
-    ).offset(skip).limit(limit).all()
+def get_aspects(db: Session, skip: int = 0, limit: int = 100, is_significant: Optional[bool] = None,
+                aspect_type: Optional[AspectType] = None, lifecycle_stage: Optional[LifecycleStage] = None,
+                updated_since: Optional[datetime] = None, after_id: Optional[int] = None,
+                expand: Optional[Iterable[str]] = None):
+    """
+    Lista aspectos con filtros opcionales. Con `after_id` se pagina por cursor
+    (id > after_id en orden de id), que cuesta lo mismo en cualquier página;
+    `skip` se mantiene por compatibilidad. `expand` limita las relaciones que se cargan.
+    """
+    query = db.query(models.EnvironmentalAspect).options(*aspect_load_options(expand))
+    if is_significant is not None:
+        query = query.filter(models.EnvironmentalAspect.is_significant == is_significant)
+    if aspect_type is not None:
+        query = query.filter(models.EnvironmentalAspect.aspect_type == aspect_type)
+    if lifecycle_stage is not None:
+        query = query.filter(models.EnvironmentalAspect.lifecycle_stage == lifecycle_stage)
+    if updated_since is not None:
+        query = query.filter(models.EnvironmentalAspect.updated_at >= updated_since)
+    query = query.order_by(models.EnvironmentalAspect.id)
+    if after_id is not None:
+        query = query.filter(models.EnvironmentalAspect.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 def create_aspect(db: Session, aspect: schemas.EnvironmentalAspectCreate) -> models.EnvironmentalAspect:
-    AI_SERVICE_URL = "http://ai-engine-api:8001/api/v1/analyze/aspect_type"
-    try:
-        response = requests.post(AI_SERVICE_URL, json={"text": aspect.description}, timeout=5)
-        if response.status_code == 200:
-            ai_data = response.json()
-            suggested_type_str = ai_data.get("suggested_category")
-            if suggested_type_str in [item.value for item in schemas.AspectType]:
-                aspect.aspect_type = schemas.AspectType(suggested_type_str)
-    except requests.exceptions.RequestException as e:
-        print(f"Advertencia: No se pudo conectar con el servicio de IA. Se usará el valor original. Error: {e}")
-
-    db_aspect = models.EnvironmentalAspect(**aspect.dict())
+    # El aspecto se guarda de inmediato; la sugerencia del Motor de IA se aplica
+    # en segundo plano y su avance se refleja en classification_status
+    db_aspect = models.EnvironmentalAspect(**aspect.dict(), classification_status=schemas.ClassificationStatus.PENDING)
     db.add(db_aspect)
+    if enrichment.worker.outbox_enabled:
+        db.flush()
+        # El primer intento es el de la cola en memoria; el reintento periódico solo la toma si falla
+        db.add(models.AspectClassificationOutbox(aspect_id=db_aspect.id, text=aspect.description,
+                                                 next_attempt_at=enrichment.next_attempt_at(0)))
     db.commit()
     db.refresh(db_aspect)
-    return db_aspect
\ No newline at end of file
+    enrichment.worker.enqueue(db_aspect.id, aspect.description)
+    return db_aspect
@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import crud, enrichment, models
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.environmental_entities import AspectType, LifecycleStage
+
+# Versión asíncrona de crud.py (modo DB_ASYNC). En una AsyncSession no hay carga
+# perezosa implícita: las relaciones se cargan por adelantado con selectinload
+# (ver crud.aspect_load_options).
+
+async def get_data_version(db: AsyncSession) -> str:
+    # Son varias consultas de agregados seguidas: se reutiliza la versión síncrona
+    return await db.run_sync(crud.get_data_version)
+
+# --- CRUD para Política Ambiental ---
+async def get_policy(db: AsyncSession) -> models.EnvironmentalPolicy | None:
+    result = await db.execute(select(models.EnvironmentalPolicy).limit(1))
+    return result.scalars().first()
+
+async def update_policy(db: AsyncSession, policy_data: schemas.EnvironmentalPolicyCreate) -> models.EnvironmentalPolicy:
+    db_policy = await get_policy(db)
+    if not db_policy:
+        db_policy = models.EnvironmentalPolicy(**policy_data.dict())
+        db.add(db_policy)
+    else:
+        for key, value in policy_data.dict().items():
+            setattr(db_policy, key, value)
+    await db.commit()
+    await db.refresh(db_policy)
+    return db_policy
+
+# --- CRUD para Aspectos Ambientales ---
+async def get_aspect(db: AsyncSession, aspect_id: int):
+    result = await db.execute(
+        select(models.EnvironmentalAspect).options(*crud.aspect_load_options()).where(models.EnvironmentalAspect.id == aspect_id)
+    )
+    return result.scalars().first()
+
+async def get_aspects(db: AsyncSession, skip: int = 0, limit: int = 100, is_significant: Optional[bool] = None,
+                      aspect_type: Optional[AspectType] = None, lifecycle_stage: Optional[LifecycleStage] = None,
+                      updated_since: Optional[datetime] = None, after_id: Optional[int] = None,
+                      expand: Optional[Iterable[str]] = None):
+    """Mismos filtros, paginación por cursor y `expand` que `crud.get_aspects`."""
+    query = select(models.EnvironmentalAspect).options(*crud.aspect_load_options(expand))
+    if is_significant is not None:
+        query = query.where(models.EnvironmentalAspect.is_significant == is_significant)
+    if aspect_type is not None:
+        query = query.where(models.EnvironmentalAspect.aspect_type == aspect_type)
+    if lifecycle_stage is not None:
+        query = query.where(models.EnvironmentalAspect.lifecycle_stage == lifecycle_stage)
+    if updated_since is not None:
+        query = query.where(models.EnvironmentalAspect.updated_at >= updated_since)
+    query = query.order_by(models.EnvironmentalAspect.id)
+    if after_id is not None:
+        query = query.where(models.EnvironmentalAspect.id > after_id)
+    elif skip:
+        query = query.offset(skip)
+    result = await db.execute(query.limit(limit))
+    return result.scalars().all()
+
+async def create_aspect(db: AsyncSession, aspect: schemas.EnvironmentalAspectCreate) -> models.EnvironmentalAspect:
+    # Igual que en crud.create_aspect: se guarda como PENDING y se encola la clasificación
+    db_aspect = models.EnvironmentalAspect(**aspect.dict(), classification_status=schemas.ClassificationStatus.PENDING)
+    db.add(db_aspect)
+    if enrichment.worker.outbox_enabled:
+        await db.flush()
+        # El primer intento es el de la cola en memoria; el reintento periódico solo la toma si falla
+        db.add(models.AspectClassificationOutbox(aspect_id=db_aspect.id, text=aspect.description,
+                                                 next_attempt_at=enrichment.next_attempt_at(0)))
+    await db.commit()
+    enrichment.worker.enqueue(db_aspect.id, aspect.description)
+    return await get_aspect(db, db_aspect.id)
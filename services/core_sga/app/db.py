@@ -1,17 +1,32 @@
 import os
-from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from shared_models.models.database import async_mode_enabled, create_async_db_engine, create_db_engine, split_pool_budget
 
 # Leemos la URL de conexión desde las variables de entorno que definimos en docker-compose.yml
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Creamos el "motor" de SQLAlchemy que se conectará a PostgreSQL
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+ASYNC_DB = async_mode_enabled()
+# En modo asíncrono los dos motores se reparten el presupuesto de conexiones del
+# proceso; el síncrono solo atiende tareas en segundo plano y el esquema
+sync_pool, async_pool = split_pool_budget(SQLALCHEMY_DATABASE_URL, sync_share=0.2) if ASYNC_DB else ({}, {})
+
+# Creamos el "motor" de SQLAlchemy que se conectará a PostgreSQL, con el pool
+# compartido y configurable de shared_models (DB_POOL_SIZE, DB_MAX_OVERFLOW, ...)
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, application_name="core_sga", **sync_pool)
 
 # Creamos una fábrica de sesiones de base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Modo asíncrono (DB_ASYNC=true): AsyncSession sobre asyncpg (o aiosqlite en pruebas).
+# El motor síncrono se mantiene para las tareas en segundo plano y el esquema.
+async_engine = None
+AsyncSessionLocal = None
+if ASYNC_DB:
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    async_engine = create_async_db_engine(SQLALCHEMY_DATABASE_URL, application_name="core_sga", **async_pool)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, autoflush=False)
+
 # Creamos una clase Base de la cual heredarán nuestros modelos de tabla (ORM models)
 Base = declarative_base()
 
@@ -27,4 +42,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    """Equivalente asíncrono de get_db: una AsyncSession por petición."""
+    async with AsyncSessionLocal() as db:
+        yield db
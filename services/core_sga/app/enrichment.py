@@ -0,0 +1,175 @@
+import asyncio
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+import requests
+from sqlalchemy import or_
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+
+from . import models
+from .db import SessionLocal
+from .http_client import CircuitOpenError, ai_client
+from shared_models.models.environmental_entities import AspectType, ClassificationStatus
+
+AI_SERVICE_URL = os.getenv("AI_SERVICE_URL", "http://ai-engine-api:8001/api/v1/analyze/aspect_type")
+# Número de clasificaciones que se procesan en paralelo
+ENRICHMENT_WORKERS = int(os.getenv("AI_ENRICHMENT_WORKERS", "2"))
+# Si está activo, cada clasificación se registra también en la tabla outbox y las
+# pendientes, fallidas o respondidas con el respaldo del Motor de IA (confianza 0)
+# se reintentan periódicamente, también tras un reinicio. Sin outbox no hay
+# reintentos: un error, el circuito abierto o una respuesta de respaldo dejan el
+# aspecto en FAILED con su tipo original.
+OUTBOX_ENABLED = os.getenv("AI_OUTBOX_ENABLED", "false").lower() == "true"
+# Cada cuántos segundos se buscan filas del outbox listas para reintentar
+OUTBOX_RETRY_INTERVAL = float(os.getenv("AI_OUTBOX_RETRY_INTERVAL", "30"))
+# Espera antes de reintentar: base * 2^intentos, hasta el máximo (segundos)
+OUTBOX_BACKOFF_BASE = float(os.getenv("AI_OUTBOX_BACKOFF_BASE", "30"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("AI_OUTBOX_BACKOFF_MAX", "1800"))
+# Tras estos intentos la fila queda en el outbox sin reintentarse más
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("AI_OUTBOX_MAX_ATTEMPTS", "10"))
+OUTBOX_RETRY_BATCH = int(os.getenv("AI_OUTBOX_RETRY_BATCH", "100"))
+
+def pending_outbox(db: Session, aspect_id: int):
+    """Filas del outbox sin procesar de un aspecto (índice parcial ix_aspect_classification_outbox_pending)."""
+    outbox = models.AspectClassificationOutbox
+    return db.query(outbox).filter(outbox.aspect_id == aspect_id, outbox.processed_at.is_(None))
+
+def next_attempt_at(attempts: int) -> datetime:
+    """Momento del próximo intento de una fila del outbox con `attempts` intentos fallidos."""
+    delay = min(OUTBOX_BACKOFF_BASE * 2 ** attempts, OUTBOX_BACKOFF_MAX)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+class EnrichmentWorker:
+    """
+    Clasifica los aspectos recién creados en segundo plano. La creación del aspecto
+    no espera al Motor de IA: solo encola (aspect_id, texto) y el worker actualiza
+    aspect_type y classification_status cuando llega la sugerencia.
+    """
+    def __init__(self, workers: int = ENRICHMENT_WORKERS, outbox_enabled: bool = OUTBOX_ENABLED):
+        self.workers = workers
+        self.outbox_enabled = outbox_enabled
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        if self.outbox_enabled:
+            self._tasks.append(asyncio.create_task(self._retry_outbox()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+
+    def enqueue(self, aspect_id: int, text: str) -> None:
+        """Encola una clasificación. Seguro de llamar desde los hilos de los endpoints síncronos."""
+        if self._loop is None:
+            # Sin worker activo el aspecto queda 'Pendiente' (y en el outbox, si está activo)
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, (aspect_id, text))
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def _run(self) -> None:
+        while True:
+            aspect_id, text = await self._queue.get()
+            try:
+                await self._loop.run_in_executor(None, self._process, aspect_id, text)
+            except Exception as e:
+                print(f"Error al clasificar el aspecto {aspect_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _retry_outbox(self) -> None:
+        """Reencola cada OUTBOX_RETRY_INTERVAL segundos las filas del outbox cuyo intento toca."""
+        while True:
+            # Con la cola ocupada se espera: esas filas ya tienen su intento en curso
+            if self.queue_depth() == 0:
+                try:
+                    for item in await self._loop.run_in_executor(None, self._claim_due_outbox):
+                        self._queue.put_nowait(item)
+                except Exception as e:
+                    print(f"Error al reintentar el outbox de clasificación: {e}")
+            await asyncio.sleep(OUTBOX_RETRY_INTERVAL)
+
+    def _process(self, aspect_id: int, text: str) -> None:
+        suggestion = None
+        status = ClassificationStatus.FAILED
+        try:
+            response = ai_client.post(AI_SERVICE_URL, json={"text": text})
+            if response.status_code == 200:
+                ai_data = response.json()
+                if ai_data.get("confidence_score", 0) > 0:
+                    suggested_type_str = ai_data.get("suggested_category")
+                    if suggested_type_str in [item.value for item in AspectType]:
+                        suggestion = AspectType(suggested_type_str)
+                    status = ClassificationStatus.COMPLETED
+                else:
+                    # Respuesta de respaldo por palabras clave (modelo aún cargando o modo
+                    # fallback): no es una clasificación, el aspecto espera a un reintento
+                    status = ClassificationStatus.PENDING
+        except CircuitOpenError:
+            # Motor de IA caído: no se espera el timeout, el aspecto conserva su tipo original
+            pass
+        except requests.exceptions.RequestException as e:
+            print(f"Advertencia: No se pudo conectar con el servicio de IA. Se usará el valor original. Error: {e}")
+
+        db = SessionLocal()
+        try:
+            retry_scheduled = False
+            if self.outbox_enabled:
+                for entry in pending_outbox(db, aspect_id):
+                    entry.attempts += 1
+                    # Las clasificaciones fallidas o de respaldo quedan pendientes hasta su próximo intento
+                    if status == ClassificationStatus.COMPLETED:
+                        entry.processed_at = func.now()
+                    else:
+                        entry.next_attempt_at = next_attempt_at(entry.attempts)
+                        retry_scheduled = retry_scheduled or entry.attempts < OUTBOX_MAX_ATTEMPTS
+            if status == ClassificationStatus.PENDING and not retry_scheduled:
+                # Sin outbox (o con los intentos agotados) nadie volverá a intentarlo
+                status = ClassificationStatus.FAILED
+            db_aspect = db.query(models.EnvironmentalAspect).filter(models.EnvironmentalAspect.id == aspect_id).first()
+            if db_aspect is not None:
+                if suggestion is not None:
+                    db_aspect.aspect_type = suggestion
+                db_aspect.classification_status = status
+            db.commit()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _claim_due_outbox() -> List[Tuple[int, str]]:
+        """
+        Toma las filas pendientes cuyo próximo intento ya venció y lo aplaza según su
+        backoff, para que otra réplica (o la siguiente pasada) no las tome mientras
+        están en curso. En PostgreSQL las filas bloqueadas por otra réplica se saltan.
+        """
+        outbox = models.AspectClassificationOutbox
+        now = datetime.now(timezone.utc)
+        db = SessionLocal()
+        try:
+            rows = db.query(outbox).filter(
+                outbox.processed_at.is_(None),
+                outbox.attempts < OUTBOX_MAX_ATTEMPTS,
+                or_(outbox.next_attempt_at.is_(None), outbox.next_attempt_at <= now),
+            ).order_by(outbox.id).limit(OUTBOX_RETRY_BATCH).with_for_update(skip_locked=True).all()
+            items = []
+            for row in rows:
+                row.next_attempt_at = next_attempt_at(row.attempts)
+                items.append((row.aspect_id, row.text))
+            db.commit()
+            return items
+        finally:
+            db.close()
+
+# Worker único para todo el proceso; se inicia y detiene con la aplicación (ver main.py)
+worker = EnrichmentWorker()
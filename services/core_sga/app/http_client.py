@@ -0,0 +1,167 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """El circuito está abierto: la llamada se descarta sin tocar la red."""
+
+class CircuitBreaker:
+    """
+    Disyuntor clásico de tres estados:
+    - 'closed': las llamadas pasan; tras `failure_threshold` fallos seguidos se abre.
+    - 'open': se rechaza todo de inmediato durante `reset_timeout` segundos.
+    - 'half_open': se deja pasar un número limitado de sondas; si una tiene éxito se
+      cierra, si falla vuelve a abrirse.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0, half_open_max_calls: int = 1):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def _maybe_half_open(self) -> None:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._half_open_calls = 0
+
+    def allow(self) -> bool:
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+                self._half_open_calls += 1
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._failures = 0
+
+class ServiceClient:
+    """
+    Cliente HTTP compartido para las llamadas entre servicios: una única
+    `requests.Session` con pool de conexiones keep-alive, protegida por un
+    disyuntor y con métricas de latencia por llamada.
+    """
+    def __init__(self, name: str, pool_size: int = 10, timeout: float = 5.0, connect_timeout: float = 1.0,
+                 breaker: Optional[CircuitBreaker] = None, latency_window: int = 1000):
+        self.name = name
+        self.timeout = (connect_timeout, timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._latencies: Deque[float] = deque(maxlen=latency_window)
+        self.calls = 0
+        self.errors = 0
+        self.short_circuited = 0
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        if not self.breaker.allow():
+            with self._lock:
+                self.short_circuited += 1
+            raise CircuitOpenError(f"Circuito abierto para '{self.name}'; llamada descartada.")
+
+        kwargs.setdefault("timeout", self.timeout)
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(time.perf_counter() - start, failed=True)
+            raise
+        # Los 5xx cuentan como fallo del servicio remoto; los 4xx son errores del cliente
+        self._record(time.perf_counter() - start, failed=response.status_code >= 500)
+        return response
+
+    def _record(self, elapsed: float, failed: bool) -> None:
+        if failed:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        with self._lock:
+            self.calls += 1
+            if failed:
+                self.errors += 1
+            self._latencies.append(elapsed * 1000)
+
+    @staticmethod
+    def _percentile(values, q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def metrics(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            calls, errors, short_circuited = self.calls, self.errors, self.short_circuited
+        return {
+            "service": self.name,
+            "circuit_state": self.breaker.state,
+            "circuit_times_opened": self.breaker.times_opened,
+            "calls": calls,
+            "errors": errors,
+            "short_circuited": short_circuited,
+            "latency_ms_p50": self._percentile(latencies, 0.50),
+            "latency_ms_p99": self._percentile(latencies, 0.99),
+            "latency_ms_max": max(latencies) if latencies else 0.0,
+        }
+
+def create_ai_client() -> ServiceClient:
+    return ServiceClient(
+        "ai-engine",
+        pool_size=int(os.getenv("AI_HTTP_POOL_SIZE", "10")),
+        # Debe cubrir la espera del Motor de IA mientras carga el modelo
+        # (AI_READY_TIMEOUT, 30 s) más la inferencia; si no, cada clasificación
+        # durante el arranque vence por timeout y abre el disyuntor
+        timeout=float(os.getenv("AI_HTTP_TIMEOUT", "35")),
+        connect_timeout=float(os.getenv("AI_HTTP_CONNECT_TIMEOUT", "1")),
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_CB_FAILURE_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("AI_CB_RESET_TIMEOUT", "30")),
+            half_open_max_calls=int(os.getenv("AI_CB_HALF_OPEN_CALLS", "1")),
+        ),
+    )
+
+# Cliente único del proceso hacia el Motor de IA (reutiliza conexiones entre llamadas)
+ai_client = create_ai_client()
@@ -1,12 +1,12 @@
 # CAMBIO: Se han añadido TODOS los tipos de datos y Enums que usamos en el archivo.
-from sqlalchemy import (Boolean, Column, Integer, String, DateTime, Date, Float, 
-                        Enum as SQLAlchemyEnum, ForeignKey, Table)
+from sqlalchemy import (BigInteger, Boolean, Column, Integer, String, DateTime, Date, Float, 
+                        Enum as SQLAlchemyEnum, ForeignKey, Index, Table)
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text as sql_text
 from .db import Base
 from shared_models.models.environmental_entities import (
     LifecycleStage, AspectType, RiskCategory, ObligationType, 
-    GHGScode, EmissionSourceType, FindingType
+    GHGScode, EmissionSourceType, FindingType, ClassificationStatus
 )
 
 # --- Tabla de Asociación ---
@@ -32,16 +32,43 @@ class EnvironmentalAspect(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     description = Column(String)
-    lifecycle_stage = Column(SQLAlchemyEnum(LifecycleStage))
-    aspect_type = Column(SQLAlchemyEnum(AspectType))
+    lifecycle_stage = Column(SQLAlchemyEnum(LifecycleStage), index=True)
+    aspect_type = Column(SQLAlchemyEnum(AspectType), index=True)
     is_significant = Column(Boolean, default=False)
+    # Estado de la clasificación asíncrona del tipo de aspecto por el Motor de IA
+    classification_status = Column(SQLAlchemyEnum(ClassificationStatus), default=ClassificationStatus.PENDING)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), index=True)
     
     # Relaciones existentes y nuevas
     obligations = relationship("ComplianceObligation", secondary=aspect_obligation_link, back_populates="aspects")
     risks = relationship("Risk")
 
+    # Índice parcial: solo los aspectos significativos, en orden de id, para el filtro
+    # de significancia con paginación por cursor (lo que consume el reporte)
+    __table_args__ = (
+        Index("ix_environmental_aspects_significant", "id",
+              postgresql_where=sql_text("is_significant"), sqlite_where=sql_text("is_significant = 1")),
+    )
+
+class AspectClassificationOutbox(Base):
+    # Outbox durable de clasificaciones pendientes: sobrevive a reinicios del servicio
+    __tablename__ = "aspect_classification_outbox"
+    id = Column(Integer, primary_key=True, index=True)
+    aspect_id = Column(Integer, ForeignKey("environmental_aspects.id"), nullable=False)
+    text = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
+    # Próximo intento del reintento periódico (backoff exponencial; ver enrichment.py)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Índice parcial: solo las filas pendientes, que son las que se consultan y actualizan
+    __table_args__ = (
+        Index("ix_aspect_classification_outbox_pending", "aspect_id",
+              postgresql_where=sql_text("processed_at IS NULL"), sqlite_where=sql_text("processed_at IS NULL")),
+    )
+
 class Risk(Base):
     __tablename__ = "risks"
     id = Column(Integer, primary_key=True, index=True)
@@ -49,7 +76,7 @@ class Risk(Base):
     category = Column(SQLAlchemyEnum(RiskCategory), nullable=False)
     probability = Column(Integer, nullable=False)
     impact = Column(Integer, nullable=False)
-    aspect_id = Column(Integer, ForeignKey("environmental_aspects.id"), nullable=True)
+    aspect_id = Column(Integer, ForeignKey("environmental_aspects.id"), nullable=True, index=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     @property
@@ -80,7 +107,7 @@ class Indicator(Base):
     name = Column(String, index=True, nullable=False)
     current_value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
-    objective_id = Column(Integer, ForeignKey("objectives.id"))
+    objective_id = Column(Integer, ForeignKey("objectives.id"), index=True)
     objective = relationship("Objective", back_populates="indicators")
 
 class EmissionFactor(Base):
@@ -107,9 +134,24 @@ class ActivityData(Base):
     value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
     activity_date = Column(Date, nullable=False)
-    source_id = Column(Integer, ForeignKey("emission_sources.id"))
+    source_id = Column(Integer, ForeignKey("emission_sources.id"), index=True)
     source = relationship("EmissionSource", back_populates="activity_data")
 
+    # Barrido por periodo del inventario: el rango de fechas recorre el índice y
+    # source_id sale de la misma entrada
+    __table_args__ = (
+        Index("ix_activity_data_date_source", "activity_date", "source_id"),
+    )
+
+class MonthlyEmission(Base):
+    # Rollup mensual mantenido por el Motor de GEI
+    __tablename__ = "monthly_emissions"
+    month = Column(Date, primary_key=True)
+    source_id = Column(Integer, ForeignKey("emission_sources.id"), primary_key=True)
+    scope = Column(SQLAlchemyEnum(GHGScode), nullable=False)
+    activity_total = Column(Float, nullable=False, default=0.0)
+    co2e = Column(Float, nullable=False, default=0.0)
+
 # --- NUEVAS TABLAS PARA AUDITORÍAS ---
 
 class Audit(Base):
@@ -131,7 +173,21 @@ class AuditFinding(Base):
     finding_type = Column(SQLAlchemyEnum(FindingType), nullable=False)
     
     # Clave foránea que vincula este hallazgo a una auditoría
-    audit_id = Column(Integer, ForeignKey("audits.id"))
+    audit_id = Column(Integer, ForeignKey("audits.id"), index=True)
     
     # Relación inversa: Un hallazgo pertenece a una auditoría
     audit = relationship("Audit", back_populates="findings")
+
+class DataVersion(Base):
+    # Contador de escrituras por tabla ya acumuladas desde data_changes; con las filas
+    # pendientes del registro alimenta los ETag de /version sin recorrer las tablas
+    __tablename__ = "data_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+class DataChange(Base):
+    # Registro de escrituras: los triggers (migración 0005) insertan una fila por
+    # sentencia en PostgreSQL y por fila en SQLite, sin bloquear a otros escritores
+    __tablename__ = "data_changes"
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    table_name = Column(String, nullable=False, index=True)
@@ -0,0 +1,141 @@
+"""
+Versión del esquema de la base compartida, gestionada con Alembic desde core_sga.
+
+Los servicios ya no crean tablas al arrancar: las migraciones se aplican una sola
+vez con `python -m app.schema` (servicio `core-sga-migrate` en docker-compose) y
+cada réplica solo comprueba, con una consulta, que la base está en la última revisión.
+
+Variables de entorno:
+    DB_SCHEMA_CHECK   comprobar la revisión al arrancar; "false" la omite (true)
+"""
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine, exc, inspect, pool, text
+from sqlalchemy.engine import Engine
+
+ALEMBIC_INI = Path(__file__).resolve().parent.parent / "alembic.ini"
+# Revisiones cuyo esquema pudo crear `create_all` antes de las migraciones: la base
+# original (0000) y la del modelo con outbox y rollup (0001). Una base sin versión
+# se marca con la que coincide con su forma; si no coincide ninguna no se toca.
+LEGACY_REVISIONS = ("0000", "0001")
+
+# tabla -> (columnas, índices); solo nombres, para comparar entre dialectos
+Shape = Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]]
+
+class SchemaVersionError(RuntimeError):
+    pass
+
+def alembic_config(database_url: Optional[str] = None) -> Config:
+    config = Config(str(ALEMBIC_INI))
+    if database_url:
+        config.set_main_option("sqlalchemy.url", database_url)
+    return config
+
+def head_revision() -> str:
+    """Última revisión disponible en migrations/versions (se lee del disco, sin tocar la base)."""
+    return ScriptDirectory.from_config(alembic_config()).get_current_head()
+
+def current_revision(engine: Engine) -> Optional[str]:
+    try:
+        with engine.connect() as connection:
+            return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+    except (exc.ProgrammingError, exc.OperationalError):
+        # La tabla alembic_version todavía no existe
+        return None
+
+def check_schema(engine: Engine) -> None:
+    """Falla el arranque si la base no está en la última revisión."""
+    if os.getenv("DB_SCHEMA_CHECK", "true").lower() not in ("1", "true", "yes"):
+        return
+    head, current = head_revision(), current_revision(engine)
+    if current != head:
+        raise SchemaVersionError(
+            f"El esquema de la base está en la revisión {current!r} y el servicio espera {head!r}. "
+            "Ejecute las migraciones con 'python -m app.schema' antes de arrancar el servicio."
+        )
+
+def _shape(engine: Engine) -> Shape:
+    inspector = inspect(engine)
+    return {
+        table: (
+            frozenset(column["name"] for column in inspector.get_columns(table)),
+            # En PostgreSQL las restricciones UNIQUE también aparecen como índices
+            frozenset(index["name"] for index in inspector.get_indexes(table)
+                      if not index.get("duplicates_constraint")),
+        )
+        for table in inspector.get_table_names() if table != "alembic_version"
+    }
+
+def _legacy_shapes() -> Tuple[Dict[str, Shape], Shape]:
+    """Forma de cada revisión de LEGACY_REVISIONS y de head, migrando una base SQLite temporal."""
+    with tempfile.TemporaryDirectory(prefix="sga_schema_") as directory:
+        url = f"sqlite:///{directory}/shape.db"
+        config, scratch = alembic_config(url), create_engine(url, poolclass=pool.NullPool)
+        shapes = {}
+        for revision in LEGACY_REVISIONS:
+            command.upgrade(config, revision)
+            shapes[revision] = _shape(scratch)
+        command.upgrade(config, "head")
+        head = _shape(scratch)
+        scratch.dispose()
+    return shapes, head
+
+def _differences(actual: Shape, expected: Shape, known_tables: FrozenSet[str]) -> List[str]:
+    # Las tablas ajenas al SGA no cuentan; las que solo crean revisiones posteriores sí
+    differences = []
+    for table in sorted((set(actual) & known_tables) | set(expected)):
+        if table not in actual:
+            differences.append(f"falta la tabla {table}")
+        elif table not in expected:
+            differences.append(f"sobra la tabla {table}")
+        else:
+            for kind, have, want in zip(("columnas", "índices"), actual[table], expected[table]):
+                if want - have:
+                    differences.append(f"{table}: faltan {kind} {', '.join(sorted(want - have))}")
+                if have - want:
+                    differences.append(f"{table}: sobran {kind} {', '.join(sorted(have - want))}")
+    return differences
+
+def legacy_revision(engine: Engine) -> str:
+    """
+    Revisión que corresponde a una base creada con `create_all`, comparando sus tablas,
+    columnas e índices con las de LEGACY_REVISIONS. Lanza SchemaVersionError si no
+    coincide con ninguna: marcarla con otra revisión haría fallar las migraciones.
+    """
+    actual = _shape(engine)
+    shapes, head = _legacy_shapes()
+    known_tables = frozenset(head).union(*shapes.values())
+    differences = {revision: _differences(actual, shape, known_tables) for revision, shape in shapes.items()}
+    for revision in LEGACY_REVISIONS:
+        if not differences[revision]:
+            return revision
+    closest = min(LEGACY_REVISIONS, key=lambda revision: len(differences[revision]))
+    raise SchemaVersionError(
+        f"La base no tiene tabla alembic_version y su esquema no coincide con ninguna revisión conocida "
+        f"({', '.join(LEGACY_REVISIONS)}). Diferencias con la más cercana, {closest}:\n  "
+        + "\n  ".join(differences[closest])
+        + "\nAjuste el esquema a mano y márquelo con 'alembic stamp <revisión>' antes de migrar."
+    )
+
+def upgrade(engine: Engine) -> None:
+    """
+    Aplica las migraciones pendientes. Una base creada con `create_all` (sin tabla
+    alembic_version pero con las tablas del SGA) se marca primero con la revisión
+    de LEGACY_REVISIONS cuyo esquema coincide con el suyo.
+    """
+    config = alembic_config(engine.url.render_as_string(hide_password=False))
+    if current_revision(engine) is None and inspect(engine).has_table("environmental_aspects"):
+        revision = legacy_revision(engine)
+        print(f"Base existente sin versión de esquema: coincide con la revisión {revision} y se marca como aplicada.")
+        command.stamp(config, revision)
+    command.upgrade(config, "head")
+
+if __name__ == "__main__":
+    from .db import engine
+    upgrade(engine)
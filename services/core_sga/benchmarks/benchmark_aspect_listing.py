@@ -0,0 +1,120 @@
+"""
+Compara el listado de aspectos con la carga anterior (joinedload de riesgos y
+obligaciones), con selectinload y con las proyecciones `fields=`/`expand=`:
+tiempo de consulta + serialización y tamaño de la respuesta, recorriendo todos
+los aspectos en páginas de 1000.
+
+Uso (desde services/core_sga, con shared_models en el PYTHONPATH):
+    python -m benchmarks.benchmark_aspect_listing [--aspects 10000] [--repeat 3]
+
+Sin DATABASE_URL usa una base SQLite temporal.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import tempfile
+import time
+
+PAGE_SIZE = 1000
+
+def seed(engine, models, n_aspects: int) -> None:
+    from shared_models.models.environmental_entities import AspectType, LifecycleStage, ObligationType, RiskCategory
+    rng = random.Random(14001)
+    n_obligations = max(n_aspects // 20, 1)
+    with engine.begin() as conn:
+        conn.execute(models.EnvironmentalAspect.__table__.insert(), [
+            {"id": i, "name": f"Aspecto {i}", "description": f"Descripción del aspecto ambiental número {i}",
+             "aspect_type": rng.choice(list(AspectType)), "lifecycle_stage": rng.choice(list(LifecycleStage)),
+             "is_significant": rng.random() < 0.1}
+            for i in range(1, n_aspects + 1)
+        ])
+        conn.execute(models.Risk.__table__.insert(), [
+            {"description": f"Riesgo {j} del aspecto {i}", "category": rng.choice(list(RiskCategory)),
+             "probability": rng.randint(1, 5), "impact": rng.randint(1, 5), "aspect_id": i}
+            for i in range(1, n_aspects + 1) for j in range(3)
+        ])
+        conn.execute(models.ComplianceObligation.__table__.insert(), [
+            {"id": i, "name": f"Obligación {i}", "description": "Requisito legal aplicable", "source": "Ley 99",
+             "obligation_type": rng.choice(list(ObligationType))}
+            for i in range(1, n_obligations + 1)
+        ])
+        conn.execute(models.aspect_obligation_link.insert(), [
+            {"aspect_id": i, "obligation_id": obligation_id}
+            for i in range(1, n_aspects + 1)
+            for obligation_id in rng.sample(range(1, n_obligations + 1), min(3, n_obligations))
+        ])
+
+def list_all(SessionLocal, load_page, serialize) -> int:
+    """Recorre todos los aspectos por cursor; devuelve los bytes de todas las respuestas."""
+    total_bytes, after_id = 0, 0
+    db = SessionLocal()
+    try:
+        while True:
+            aspects = load_page(db, after_id)
+            total_bytes += len(serialize(aspects))
+            if len(aspects) < PAGE_SIZE:
+                return total_bytes
+            after_id = aspects[-1].id
+            db.expunge_all()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--aspects", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    if not os.getenv("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='sga_listing_')}/listing.db"
+
+    # app.db crea el motor a partir de DATABASE_URL al importarse
+    from typing import List
+    from pydantic import TypeAdapter
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import joinedload
+    from app import crud, models, schema
+    from app.db import SessionLocal, engine
+    from shared_models.models import environmental_entities as schemas
+    from shared_models.models.projection import parse_projection
+
+    schema.upgrade(engine)
+    with engine.connect() as conn:
+        if conn.execute(select(func.count()).select_from(models.EnvironmentalAspect)).scalar() == 0:
+            print(f"Sembrando {args.aspects} aspectos (3 riesgos y 3 obligaciones cada uno) ...")
+            seed(engine, models, args.aspects)
+
+    full_adapter = TypeAdapter(List[schemas.EnvironmentalAspect])
+
+    def joined_page(db, after_id):
+        # Carga anterior: dos colecciones con joinedload y LIMIT sobre el producto
+        return db.query(models.EnvironmentalAspect).options(
+            joinedload(models.EnvironmentalAspect.risks), joinedload(models.EnvironmentalAspect.obligations)
+        ).filter(models.EnvironmentalAspect.id > after_id).order_by(models.EnvironmentalAspect.id).limit(PAGE_SIZE).all()
+
+    def projected(fields, expand):
+        projection = parse_projection(schemas.EnvironmentalAspect, fields=fields, expand=expand)
+        load = lambda db, after_id: crud.get_aspects(db, limit=PAGE_SIZE, after_id=after_id, expand=projection.expand)
+        dump = lambda aspects: json.dumps([projection.dump(a) for a in aspects]).encode()
+        return load, dump
+
+    variants = [
+        ("joinedload (anterior)", joined_page, full_adapter.dump_json),
+        ("selectinload", lambda db, after_id: crud.get_aspects(db, limit=PAGE_SIZE, after_id=after_id),
+         full_adapter.dump_json),
+        ("expand=risks", *projected(None, "risks")),
+        ("expand=", *projected(None, "")),
+        ("fields=name,aspect_type&expand=", *projected("name,aspect_type", "")),
+    ]
+    print(f"\n{'variante':<34}{'mediana ms':>12}{'respuesta KB':>15}")
+    for name, load_page, serialize in variants:
+        timings, size = [], 0
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            size = list_all(SessionLocal, load_page, serialize)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"{name:<34}{statistics.median(timings):>12.1f}{size / 1024:>15.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,33 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app import models
-from app.db import engine
-from app.api import router as api_router
+from app.db import ASYNC_DB, engine
+
+# DB_ASYNC=true sirve los mismos endpoints con AsyncSession
+if ASYNC_DB:
+    from app.api_async import router as api_router
+else:
+    from app.api import router as api_router
+
+from app.enrichment import worker as enrichment_worker
+from app.schema import check_schema
 
-# ESTA LÍNEA ES LA CLAVE: Le dice a SQLAlchemy que cree todas las tablas
-# definidas en 'models.py' en la base de datos al arrancar.
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Las tablas las crean las migraciones (python -m app.schema); aquí solo se
+    # comprueba que la base esté en la última revisión
+    check_schema(engine)
+    # Worker de clasificación asíncrona de aspectos con el Motor de IA
+    await enrichment_worker.start()
+    yield
+    await enrichment_worker.stop()
 
 app = FastAPI(
     title="Servicio Core del SGA - ISO 14001:2026",
     description="Gestiona las entidades centrales del Sistema de Gestión Ambiental.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # --- CONFIGURACIÓN DE CORS ---
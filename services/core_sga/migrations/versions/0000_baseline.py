@@ -0,0 +1,206 @@
+"""baseline schema
+
+Revision ID: 0000
+Revises: 
+Create Date: 2026-10-17 02:29:36.461411
+
+Esquema tal como lo creaba `create_all` en el arranque de core_sga antes de las
+migraciones (sin outbox de clasificación, sin rollup mensual y sin los índices de
+filtros de aspectos, que añade 0001). En bases existentes no se ejecuta:
+`python -m app.schema` comprueba que la base tiene esta forma y la marca como aplicada.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0000'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('audits',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.String(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audits_id'), 'audits', ['id'], unique=False)
+
+    op.create_table('compliance_obligations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.Column('obligation_type', sa.Enum('LEGAL', 'PERMIT', 'STANDARD', 'OTHER', name='obligationtype'), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_compliance_obligations_id'), 'compliance_obligations', ['id'], unique=False)
+    op.create_index(op.f('ix_compliance_obligations_name'), 'compliance_obligations', ['name'], unique=False)
+
+    op.create_table('emission_factors',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('source', sa.String(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index(op.f('ix_emission_factors_id'), 'emission_factors', ['id'], unique=False)
+
+    op.create_table('environmental_aspects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('lifecycle_stage', sa.Enum('RAW_MATERIAL_ACQUISITION', 'DESIGN_AND_DEVELOPMENT', 'MANUFACTURING', 'TRANSPORTATION_DISTRIBUTION', 'USE_AND_SERVICE', 'END_OF_LIFE', name='lifecyclestage'), nullable=True),
+    sa.Column('aspect_type', sa.Enum('EMISSION', 'CONSUMPTION', 'WASTE_GENERATION', 'RESOURCE_USE', name='aspecttype'), nullable=True),
+    sa.Column('is_significant', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_environmental_aspects_id'), 'environmental_aspects', ['id'], unique=False)
+    op.create_index(op.f('ix_environmental_aspects_name'), 'environmental_aspects', ['name'], unique=False)
+
+    op.create_table('environmental_policies',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.String(), nullable=True),
+    sa.Column('content', sa.String(), nullable=True),
+    sa.Column('approval_date', sa.DateTime(), nullable=True),
+    sa.Column('approved_by', sa.String(), nullable=True),
+    sa.Column('includes_climate_commitment', sa.Boolean(), nullable=True),
+    sa.Column('includes_circular_economy_commitment', sa.Boolean(), nullable=True),
+    sa.Column('includes_biodiversity_commitment', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_environmental_policies_id'), 'environmental_policies', ['id'], unique=False)
+    op.create_index(op.f('ix_environmental_policies_version'), 'environmental_policies', ['version'], unique=False)
+
+    op.create_table('objectives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('target_value', sa.Float(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_objectives_id'), 'objectives', ['id'], unique=False)
+
+    op.create_table('aspect_obligation_link',
+    sa.Column('aspect_id', sa.Integer(), nullable=False),
+    sa.Column('obligation_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['aspect_id'], ['environmental_aspects.id'], ),
+    sa.ForeignKeyConstraint(['obligation_id'], ['compliance_obligations.id'], ),
+    sa.PrimaryKeyConstraint('aspect_id', 'obligation_id')
+    )
+
+    op.create_table('audit_findings',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('evidence', sa.String(), nullable=False),
+    sa.Column('clause', sa.String(), nullable=False),
+    sa.Column('finding_type', sa.Enum('CONFORMITY', 'NONCONFORMITY_MINOR', 'NONCONFORMITY_MAJOR', 'OPPORTUNITY_FOR_IMPROVEMENT', name='findingtype'), nullable=False),
+    sa.Column('audit_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['audit_id'], ['audits.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_audit_findings_id'), 'audit_findings', ['id'], unique=False)
+
+    op.create_table('emission_sources',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('source_type', sa.Enum('STATIONARY_COMBUSTION', 'MOBILE_COMBUSTION', 'FUGITIVE_EMISSIONS', 'PROCESS_EMISSIONS', 'PURCHASED_ELECTRICITY', name='emissionsourcetype'), nullable=False),
+    sa.Column('scope', sa.Enum('SCOPE_1', 'SCOPE_2', 'SCOPE_3', name='ghgscode'), nullable=False),
+    sa.Column('factor_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['factor_id'], ['emission_factors.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_emission_sources_id'), 'emission_sources', ['id'], unique=False)
+
+    op.create_table('indicators',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('current_value', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('objective_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['objective_id'], ['objectives.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_indicators_id'), 'indicators', ['id'], unique=False)
+    op.create_index(op.f('ix_indicators_name'), 'indicators', ['name'], unique=False)
+
+    op.create_table('risks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.String(), nullable=False),
+    sa.Column('category', sa.Enum('OPERATIONAL', 'COMPLIANCE', 'CLIMATE_PHYSICAL', 'CLIMATE_TRANSITION', 'BIODIVERSITY', 'REPUTATIONAL', name='riskcategory'), nullable=False),
+    sa.Column('probability', sa.Integer(), nullable=False),
+    sa.Column('impact', sa.Integer(), nullable=False),
+    sa.Column('aspect_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['aspect_id'], ['environmental_aspects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_risks_id'), 'risks', ['id'], unique=False)
+
+    op.create_table('activity_data',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('value', sa.Float(), nullable=False),
+    sa.Column('unit', sa.String(), nullable=False),
+    sa.Column('activity_date', sa.Date(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['source_id'], ['emission_sources.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_activity_data_id'), 'activity_data', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_activity_data_id'), table_name='activity_data')
+    op.drop_table('activity_data')
+
+    op.drop_index(op.f('ix_risks_id'), table_name='risks')
+    op.drop_table('risks')
+
+    op.drop_index(op.f('ix_indicators_name'), table_name='indicators')
+    op.drop_index(op.f('ix_indicators_id'), table_name='indicators')
+    op.drop_table('indicators')
+
+    op.drop_index(op.f('ix_emission_sources_id'), table_name='emission_sources')
+    op.drop_table('emission_sources')
+
+    op.drop_index(op.f('ix_audit_findings_id'), table_name='audit_findings')
+    op.drop_table('audit_findings')
+    op.drop_table('aspect_obligation_link')
+
+    op.drop_index(op.f('ix_objectives_id'), table_name='objectives')
+    op.drop_table('objectives')
+
+    op.drop_index(op.f('ix_environmental_policies_version'), table_name='environmental_policies')
+    op.drop_index(op.f('ix_environmental_policies_id'), table_name='environmental_policies')
+    op.drop_table('environmental_policies')
+
+    op.drop_index(op.f('ix_environmental_aspects_name'), table_name='environmental_aspects')
+    op.drop_index(op.f('ix_environmental_aspects_id'), table_name='environmental_aspects')
+    op.drop_table('environmental_aspects')
+
+    op.drop_index(op.f('ix_emission_factors_id'), table_name='emission_factors')
+    op.drop_table('emission_factors')
+
+    op.drop_index(op.f('ix_compliance_obligations_name'), table_name='compliance_obligations')
+    op.drop_index(op.f('ix_compliance_obligations_id'), table_name='compliance_obligations')
+    op.drop_table('compliance_obligations')
+
+    op.drop_index(op.f('ix_audits_id'), table_name='audits')
+    op.drop_table('audits')
+    # En PostgreSQL los tipos ENUM sobreviven a las tablas que los usan
+    if op.get_context().dialect.name == "postgresql":
+        for enum_name in ("riskcategory", "ghgscode", "emissionsourcetype", "findingtype",
+                          "aspecttype", "lifecyclestage", "obligationtype"):
+            op.execute(f"DROP TYPE IF EXISTS {enum_name}")
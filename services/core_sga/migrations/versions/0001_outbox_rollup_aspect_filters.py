@@ -0,0 +1,77 @@
+"""outbox, rollup and aspect filters
+
+Revision ID: 0001
+Revises: 0000
+Create Date: 2026-10-17 02:29:36.461411
+
+Cambios del esquema posteriores a la base de `create_all` (0000): estado de la
+clasificación asíncrona de aspectos y su outbox durable, rollup mensual de
+emisiones del Motor de GEI e índices de los filtros del listado de aspectos.
+
+Los aspectos existentes se clasificaron de forma síncrona al crearse, así que se
+marcan como COMPLETED. El rollup se llena con la primera consulta del inventario
+(ver ghg_engine/app/rollup.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0001'
+down_revision: Union[str, None] = '0000'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+classification_status = sa.Enum('PENDING', 'COMPLETED', 'FAILED', name='classificationstatus')
+
+
+def upgrade() -> None:
+    # add_column no crea el tipo ENUM de PostgreSQL (create_table sí lo hace)
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("CREATE TYPE classificationstatus AS ENUM ('PENDING', 'COMPLETED', 'FAILED')")
+    with op.batch_alter_table('environmental_aspects') as batch_op:
+        batch_op.add_column(sa.Column('classification_status', classification_status, nullable=True))
+    op.execute("UPDATE environmental_aspects SET classification_status = 'COMPLETED'")
+    op.create_index(op.f('ix_environmental_aspects_aspect_type'), 'environmental_aspects', ['aspect_type'], unique=False)
+    op.create_index(op.f('ix_environmental_aspects_lifecycle_stage'), 'environmental_aspects', ['lifecycle_stage'], unique=False)
+    op.create_index('ix_environmental_aspects_significant_id', 'environmental_aspects', ['is_significant', 'id'], unique=False)
+    op.create_index(op.f('ix_environmental_aspects_updated_at'), 'environmental_aspects', ['updated_at'], unique=False)
+
+    op.create_table('aspect_classification_outbox',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('aspect_id', sa.Integer(), nullable=False),
+    sa.Column('text', sa.String(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('processed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['aspect_id'], ['environmental_aspects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_aspect_classification_outbox_id'), 'aspect_classification_outbox', ['id'], unique=False)
+
+    op.create_table('monthly_emissions',
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('source_id', sa.Integer(), nullable=False),
+    sa.Column('scope', sa.Enum('SCOPE_1', 'SCOPE_2', 'SCOPE_3', name='ghgscode', create_type=False), nullable=False),
+    sa.Column('activity_total', sa.Float(), nullable=False),
+    sa.Column('co2e', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['source_id'], ['emission_sources.id'], ),
+    sa.PrimaryKeyConstraint('month', 'source_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('monthly_emissions')
+
+    op.drop_index(op.f('ix_aspect_classification_outbox_id'), table_name='aspect_classification_outbox')
+    op.drop_table('aspect_classification_outbox')
+
+    op.drop_index(op.f('ix_environmental_aspects_updated_at'), table_name='environmental_aspects')
+    op.drop_index('ix_environmental_aspects_significant_id', table_name='environmental_aspects')
+    op.drop_index(op.f('ix_environmental_aspects_lifecycle_stage'), table_name='environmental_aspects')
+    op.drop_index(op.f('ix_environmental_aspects_aspect_type'), table_name='environmental_aspects')
+    with op.batch_alter_table('environmental_aspects') as batch_op:
+        batch_op.drop_column('classification_status')
+    if op.get_context().dialect.name == "postgresql":
+        op.execute("DROP TYPE IF EXISTS classificationstatus")
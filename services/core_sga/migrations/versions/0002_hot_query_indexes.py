@@ -0,0 +1,63 @@
+"""hot query indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 03:10:12.118406
+
+Índices secundarios para los filtros y joins más frecuentes: barrido por periodo
+del inventario GEI, claves foráneas que recorren las listas (riesgos por aspecto,
+indicadores por objetivo, hallazgos por auditoría) e índices parciales para los
+aspectos significativos y el outbox pendiente. Ver benchmarks/check_query_plans.py.
+
+En PostgreSQL los índices se crean con CONCURRENTLY, fuera de la transacción de la
+migración, para no bloquear las escrituras sobre tablas ya pobladas.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_activity_data_date_source', 'activity_data', ['activity_date', 'source_id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_activity_data_source_id'), 'activity_data', ['source_id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_risks_aspect_id'), 'risks', ['aspect_id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_indicators_objective_id'), 'indicators', ['objective_id'],
+                        unique=False, postgresql_concurrently=True)
+        op.create_index(op.f('ix_audit_findings_audit_id'), 'audit_findings', ['audit_id'],
+                        unique=False, postgresql_concurrently=True)
+        # Parciales: solo las filas que consultan el reporte y el worker de clasificación
+        op.create_index('ix_environmental_aspects_significant', 'environmental_aspects', ['id'],
+                        unique=False, postgresql_concurrently=True,
+                        postgresql_where=sa.text('is_significant'), sqlite_where=sa.text('is_significant = 1'))
+        op.create_index('ix_aspect_classification_outbox_pending', 'aspect_classification_outbox', ['aspect_id'],
+                        unique=False, postgresql_concurrently=True,
+                        postgresql_where=sa.text('processed_at IS NULL'), sqlite_where=sa.text('processed_at IS NULL'))
+        # El índice parcial cubre el filtro de significancia que servía este compuesto
+        op.drop_index('ix_environmental_aspects_significant_id', table_name='environmental_aspects',
+                      postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_environmental_aspects_significant_id', 'environmental_aspects', ['is_significant', 'id'],
+                        unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_aspect_classification_outbox_pending', table_name='aspect_classification_outbox',
+                      postgresql_concurrently=True)
+        op.drop_index('ix_environmental_aspects_significant', table_name='environmental_aspects',
+                      postgresql_concurrently=True)
+        op.drop_index(op.f('ix_audit_findings_audit_id'), table_name='audit_findings', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_indicators_objective_id'), table_name='indicators', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_risks_aspect_id'), table_name='risks', postgresql_concurrently=True)
+        op.drop_index(op.f('ix_activity_data_source_id'), table_name='activity_data', postgresql_concurrently=True)
+        op.drop_index('ix_activity_data_date_source', table_name='activity_data', postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""outbox retry schedule
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 05:12:40.305117
+
+Columna next_attempt_at del outbox de clasificación: el worker de core_sga
+reintenta periódicamente las filas pendientes o fallidas con backoff exponencial
+en lugar de esperar a un reinicio del servicio.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('aspect_classification_outbox') as batch_op:
+        batch_op.add_column(sa.Column('next_attempt_at', sa.DateTime(timezone=True), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('aspect_classification_outbox') as batch_op:
+        batch_op.drop_column('next_attempt_at')
@@ -0,0 +1,73 @@
+"""data versions
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 05:48:03.671920
+
+Tabla data_versions con un contador por tabla y triggers que lo incrementan en
+la misma transacción de cada escritura. Los endpoints /version de core_sga y
+ghg_engine leen estos contadores para sus ETag en lugar de contar filas.
+
+En PostgreSQL el trigger es por sentencia (una carga masiva o un COPY suma uno);
+SQLite solo admite triggers por fila.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tablas que alimentan el reporte de sostenibilidad
+TRACKED_TABLES = (
+    'environmental_policies', 'environmental_aspects', 'aspect_obligation_link', 'risks',
+    'objectives', 'indicators', 'emission_factors', 'emission_sources', 'activity_data',
+)
+SQLITE_OPERATIONS = ('insert', 'update', 'delete')
+
+
+def upgrade() -> None:
+    data_versions = op.create_table('data_versions',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.bulk_insert(data_versions, [{'table_name': name, 'version': 0} for name in TRACKED_TABLES])
+
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute("""
+            CREATE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE data_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for name in TRACKED_TABLES:
+            op.execute(
+                f"CREATE TRIGGER {name}_data_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {name} "
+                "FOR EACH STATEMENT EXECUTE PROCEDURE bump_data_version()"
+            )
+    else:
+        for name in TRACKED_TABLES:
+            for operation in SQLITE_OPERATIONS:
+                op.execute(
+                    f"CREATE TRIGGER {name}_data_version_{operation} AFTER {operation.upper()} ON {name} "
+                    f"BEGIN UPDATE data_versions SET version = version + 1 WHERE table_name = '{name}'; END"
+                )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for name in TRACKED_TABLES:
+            op.execute(f"DROP TRIGGER {name}_data_version ON {name}")
+        op.execute("DROP FUNCTION bump_data_version()")
+    else:
+        for name in TRACKED_TABLES:
+            for operation in SQLITE_OPERATIONS:
+                op.execute(f"DROP TRIGGER {name}_data_version_{operation}")
+    op.drop_table('data_versions')
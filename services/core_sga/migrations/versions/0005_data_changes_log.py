@@ -0,0 +1,75 @@
+"""data changes log
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 09:20:41.503217
+
+Los triggers de 0004 incrementaban la fila de data_versions de cada tabla dentro
+de la transacción del escritor: el bloqueo de esa fila duraba hasta el commit y
+serializaba todas las escrituras de la tabla (y dos transacciones que tocaban dos
+tablas en orden inverso podían bloquearse mutuamente).
+
+Ahora los triggers solo insertan una fila en data_changes, que no bloquea a otros
+escritores. La versión de una tabla es su contador de data_versions más sus filas
+pendientes en data_changes; la lectura acumula periódicamente el registro en el
+contador (ver shared_models/models/data_version.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TRACKED_TABLES = (
+    'environmental_policies', 'environmental_aspects', 'aspect_obligation_link', 'risks',
+    'objectives', 'indicators', 'emission_factors', 'emission_sources', 'activity_data',
+)
+SQLITE_OPERATIONS = ('insert', 'update', 'delete')
+
+
+def _replace_triggers(statement: str) -> None:
+    """Cambia lo que ejecutan los triggers de 0004: `statement` recibe el nombre de la tabla."""
+    if op.get_bind().dialect.name == 'postgresql':
+        # Los triggers siguen apuntando a la función; basta con reemplazarla
+        op.execute(f"""
+            CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+            BEGIN
+                {statement.format(table="TG_TABLE_NAME")};
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+    else:
+        for name in TRACKED_TABLES:
+            for operation in SQLITE_OPERATIONS:
+                op.execute(f"DROP TRIGGER {name}_data_version_{operation}")
+                op.execute(
+                    f"CREATE TRIGGER {name}_data_version_{operation} AFTER {operation.upper()} ON {name} "
+                    f"BEGIN {statement.format(table=repr(name))}; END"
+                )
+
+
+def upgrade() -> None:
+    op.create_table('data_changes',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_data_changes_table_name'), 'data_changes', ['table_name'], unique=False)
+    _replace_triggers("INSERT INTO data_changes (table_name) VALUES ({table})")
+
+
+def downgrade() -> None:
+    _replace_triggers("UPDATE data_versions SET version = version + 1 WHERE table_name = {table}")
+    # Lo pendiente en el registro se acumula en los contadores antes de borrarlo
+    op.execute(
+        "UPDATE data_versions SET version = version + "
+        "(SELECT count(*) FROM data_changes WHERE data_changes.table_name = data_versions.table_name)"
+    )
+    op.drop_index(op.f('ix_data_changes_table_name'), table_name='data_changes')
+    op.drop_table('data_changes')
@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import date
 
 from shared_models.models import environmental_entities as schemas
-from . import crud, calculator
-from .db import get_db
+from shared_models.models.database import pool_metrics
+from . import crud, calculator, ingest, rollup
+from .db import engine, get_db
+from .cache import factor_cache
+from .schemas import BulkIngestResult, InventorySeries, SeriesBucket
+from .series import series_index
 
 router = APIRouter()
 
@@ -14,6 +19,13 @@ router = APIRouter()
 def create_factor(factor: schemas.EmissionFactorCreate, db: Session = Depends(get_db)):
     return crud.create_emission_factor(db=db, factor=factor)
 
+@router.put("/factors/{factor_id}", response_model=schemas.EmissionFactor, tags=["Configuración GEI"])
+def update_factor(factor_id: int, factor: schemas.EmissionFactorCreate, db: Session = Depends(get_db)):
+    db_factor = crud.update_emission_factor(db=db, factor_id=factor_id, factor=factor)
+    if db_factor is None:
+        raise HTTPException(status_code=404, detail="Factor de emisión no encontrado")
+    return db_factor
+
 @router.post("/sources/", response_model=schemas.EmissionSource, tags=["Configuración GEI"])
 def create_source(source: schemas.EmissionSourceCreate, db: Session = Depends(get_db)):
     return crud.create_emission_source(db=db, source=source)
@@ -23,9 +35,76 @@ def create_source(source: schemas.EmissionSourceCreate, db: Session = Depends(ge
 def create_activity(activity: schemas.ActivityDataCreate, db: Session = Depends(get_db)):
     return crud.create_activity_data(db=db, activity=activity)
 
+@router.post("/activity-data/bulk", response_model=BulkIngestResult, tags=["Datos de Actividad"])
+async def bulk_create_activity(request: Request, format: Optional[str] = None, db: Session = Depends(get_db)):
+    """
+    Carga masiva de datos de actividad desde un cuerpo CSV (con encabezado) o NDJSON.
+    El cuerpo se lee en streaming y se valida y escribe por lotes; las filas
+    inválidas se reportan sin abortar la carga.
+    """
+    fmt = ingest.detect_format(format, request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Formato no soportado. Use CSV (text/csv) o NDJSON (application/x-ndjson).")
+
+    known_source_ids = await run_in_threadpool(crud.get_emission_source_ids, db)
+    ingestor = ingest.BulkIngestor(db, fmt, known_source_ids)
+    async for line_no, line in ingest.iter_lines(request.stream()):
+        if ingestor.add(line_no, line):
+            await run_in_threadpool(ingestor.flush)
+    await run_in_threadpool(ingestor.flush)
+    return ingestor.result
+
 # Endpoint principal de cálculo
 @router.get("/inventory/", tags=["Cálculo de Inventario GEI"])
-def get_ghg_inventory(start_date: date, end_date: date, db: Session = Depends(get_db)):
-    activity_data = crud.get_activity_data_for_period(db, start_date=start_date, end_date=end_date)
-    inventory = calculator.calculate_emissions(activity_data)
-    return inventory
\ No newline at end of file
+def get_ghg_inventory(start_date: date, end_date: date, breakdown: bool = False, db: Session = Depends(get_db)):
+    if breakdown:
+        # Desglose por alcance, fuente y mes con el calculador columnar; las fuentes
+        # y factores se resuelven desde la caché en proceso, sin joins.
+        rows = crud.get_activity_columns_for_period(db, start_date=start_date, end_date=end_date)
+        sources = factor_cache.get_many(db, {row[1] for row in rows})
+        columns = calculator.activity_columns(rows, sources)
+        return calculator.calculate_emissions_columnar(**columns)
+
+    # Los meses completos salen del rollup mensual y los bordes parciales se agregan
+    # en SQL: el costo depende del número de meses y alcances, no de las lecturas.
+    scope_totals = crud.get_inventory_scope_totals(db, start_date=start_date, end_date=end_date)
+    inventory = calculator.inventory_from_scope_totals(scope_totals)
+    return inventory
+
+@router.get("/inventory/series", response_model=InventorySeries, tags=["Cálculo de Inventario GEI"])
+def get_ghg_inventory_series(start_date: date, end_date: date, bucket: SeriesBucket = SeriesBucket.MONTH, db: Session = Depends(get_db)):
+    """
+    Serie temporal de emisiones por día, semana o mes en una sola llamada.
+    Cada periodo se suma en O(log n) sobre el índice diario por alcance.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=422, detail="start_date debe ser anterior o igual a end_date")
+    series = series_index.series(db, start_date=start_date, end_date=end_date, bucket=bucket)
+    return InventorySeries(bucket=bucket, start_date=start_date, end_date=end_date, series=series)
+
+@router.post("/inventory/rollup/rebuild", tags=["Cálculo de Inventario GEI"])
+def rebuild_inventory_rollup(db: Session = Depends(get_db)):
+    """Reconstruye el rollup mensual desde los datos crudos (p. ej. tras una carga inicial)."""
+    return {"rows": rollup.rebuild(db)}
+
+@router.get("/cache/factors/stats", tags=["Métricas"])
+def read_factor_cache_stats():
+    """Aciertos, fallos y tamaño de la caché de fuentes y factores de emisión."""
+    return factor_cache.stats()
+
+@router.get("/version", tags=["Métricas"])
+def read_data_version(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Versión actual de los datos del inventario. Responde 304 si coincide con
+    If-None-Match, para validar cachés de otros servicios con una consulta mínima.
+    """
+    etag = f'"{crud.get_data_version(db)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"version": etag.strip('"')}
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
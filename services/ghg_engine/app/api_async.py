@@ -0,0 +1,98 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from datetime import date
+
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from . import api, crud, calculator, rollup
+from .db import async_engine, get_async_db
+from .cache import factor_cache
+from .schemas import BulkIngestResult, InventorySeries
+
+# Mismos endpoints que api.py, con AsyncSession (se usa cuando DB_ASYNC=true).
+# Las escrituras del GHG mantienen el rollup, la caché de factores y el índice de
+# series en la misma transacción, así que se reutilizan las funciones síncronas de
+# crud con `run_sync`; la respuesta se valida dentro para no cargar relaciones
+# fuera del contexto de la sesión.
+#
+# Las rutas que pasan por el índice de series (alta de datos y /inventory/series)
+# esperan en primitivas de threading mientras otra petición reconstruye el índice.
+# Con `run_sync` esa espera bloquearía el event loop del que depende la propia
+# reconstrucción, así que esas rutas son las síncronas de api.py: se ejecutan en el
+# pool de hilos con una Session síncrona.
+router = APIRouter()
+
+async def _run(db: AsyncSession, fn, *args, response_model=None, **kwargs):
+    def call(session: Session):
+        result = fn(session, *args, **kwargs)
+        if response_model is not None and result is not None:
+            return response_model.model_validate(result)
+        return result
+    return await db.run_sync(call)
+
+# Endpoints de configuración
+@router.post("/factors/", response_model=schemas.EmissionFactor, tags=["Configuración GEI"])
+async def create_factor(factor: schemas.EmissionFactorCreate, db: AsyncSession = Depends(get_async_db)):
+    return await _run(db, crud.create_emission_factor, factor=factor, response_model=schemas.EmissionFactor)
+
+@router.put("/factors/{factor_id}", response_model=schemas.EmissionFactor, tags=["Configuración GEI"])
+async def update_factor(factor_id: int, factor: schemas.EmissionFactorCreate, db: AsyncSession = Depends(get_async_db)):
+    db_factor = await _run(db, crud.update_emission_factor, factor_id=factor_id, factor=factor,
+                           response_model=schemas.EmissionFactor)
+    if db_factor is None:
+        raise HTTPException(status_code=404, detail="Factor de emisión no encontrado")
+    return db_factor
+
+@router.post("/sources/", response_model=schemas.EmissionSource, tags=["Configuración GEI"])
+async def create_source(source: schemas.EmissionSourceCreate, db: AsyncSession = Depends(get_async_db)):
+    return await _run(db, crud.create_emission_source, source=source, response_model=schemas.EmissionSource)
+
+# Endpoint para registrar datos (síncrono: espera al índice de series)
+router.add_api_route("/activity-data/", api.create_activity, methods=["POST"],
+                     response_model=schemas.ActivityData, tags=["Datos de Actividad"])
+
+# La carga masiva ya trabaja por lotes en el pool de hilos con su propia sesión síncrona
+router.add_api_route("/activity-data/bulk", api.bulk_create_activity, methods=["POST"],
+                     response_model=BulkIngestResult, tags=["Datos de Actividad"])
+
+# Endpoint principal de cálculo
+@router.get("/inventory/", tags=["Cálculo de Inventario GEI"])
+async def get_ghg_inventory(start_date: date, end_date: date, breakdown: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if breakdown:
+        def load_columns(session: Session):
+            rows = crud.get_activity_columns_for_period(session, start_date=start_date, end_date=end_date)
+            sources = factor_cache.get_many(session, {row[1] for row in rows})
+            return calculator.activity_columns(rows, sources)
+        columns = await db.run_sync(load_columns)
+        # El cálculo columnar es CPU puro: fuera del event loop
+        return await run_in_threadpool(calculator.calculate_emissions_columnar, **columns)
+
+    scope_totals = await _run(db, crud.get_inventory_scope_totals, start_date=start_date, end_date=end_date)
+    return calculator.inventory_from_scope_totals(scope_totals)
+
+# Síncrono: puede reconstruir el índice de series o esperar a que otra petición lo haga
+router.add_api_route("/inventory/series", api.get_ghg_inventory_series, methods=["GET"],
+                     response_model=InventorySeries, tags=["Cálculo de Inventario GEI"])
+
+@router.post("/inventory/rollup/rebuild", tags=["Cálculo de Inventario GEI"])
+async def rebuild_inventory_rollup(db: AsyncSession = Depends(get_async_db)):
+    """Reconstruye el rollup mensual desde los datos crudos (p. ej. tras una carga inicial)."""
+    return {"rows": await _run(db, rollup.rebuild)}
+
+router.add_api_route("/cache/factors/stats", api.read_factor_cache_stats, methods=["GET"], tags=["Métricas"])
+
+@router.get("/version", tags=["Métricas"])
+async def read_data_version(request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """Versión actual de los datos del inventario; 304 si coincide con If-None-Match."""
+    etag = f'"{await _run(db, crud.get_data_version)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"version": etag.strip('"')}
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones asíncrono y tiempos de espera de checkout."""
+    return pool_metrics(async_engine)
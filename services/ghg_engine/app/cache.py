@@ -0,0 +1,120 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from . import models
+from shared_models.models.environmental_entities import GHGScode
+
+class SourceFactor(NamedTuple):
+    """Lo que el cálculo necesita de una fuente: su alcance y su factor de emisión."""
+    scope: GHGScode
+    factor_id: Optional[int]
+    factor_value: Optional[float]
+
+class SourceFactorCache:
+    """
+    Caché en proceso de fuentes de emisión y sus factores, indexada por source_id.
+
+    - LRU acotada a 'max_size' entradas.
+    - TTL ('ttl' segundos, 0 = sin expiración) para despliegues con varios workers,
+      donde la invalidación de un proceso no llega a los demás.
+    - Contador de versión: bump_version() invalida todas las entradas; se llama
+      cada vez que se crea o modifica un factor de emisión.
+
+    Solo sirve lecturas: lo que se persiste (rollup mensual, índice de series) usa
+    load_source_factors dentro de la transacción, para no escribir un CO2e calculado
+    con un factor que otro worker ya cambió.
+    """
+    def __init__(self, max_size: int = 10000, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump_version(self) -> int:
+        with self._lock:
+            self._version += 1
+            self._entries.clear()
+            return self._version
+
+    def get_many(self, db: Session, source_ids: Iterable[int]) -> Dict[int, SourceFactor]:
+        """
+        Resuelve varias fuentes a la vez. Las que no están en caché se cargan
+        con una sola consulta.
+        """
+        found: Dict[int, SourceFactor] = {}
+        missing = set()
+        now = time.monotonic()
+        with self._lock:
+            for source_id in set(source_ids):
+                entry = self._entries.get(source_id)
+                if entry is not None:
+                    value, version, stored_at = entry
+                    if version == self._version and (not self.ttl or now - stored_at < self.ttl):
+                        self._entries.move_to_end(source_id)
+                        found[source_id] = value
+                        self.hits += 1
+                        continue
+                    del self._entries[source_id]
+                missing.add(source_id)
+                self.misses += 1
+            version = self._version
+
+        if missing:
+            loaded = load_source_factors(db, missing)
+            found.update(loaded)
+            with self._lock:
+                # Si la versión cambió durante la carga, no guardamos valores posiblemente obsoletos
+                if version == self._version:
+                    for source_id, value in loaded.items():
+                        self._entries[source_id] = (value, version, now)
+                        self._entries.move_to_end(source_id)
+                    while len(self._entries) > self.max_size:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return found
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self._version,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+def load_source_factors(db: Session, source_ids: Iterable[int]) -> Dict[int, SourceFactor]:
+    """Lee de la base, en una sola consulta, el alcance y el factor vigente de varias fuentes."""
+    rows = db.query(
+        models.EmissionSource.id, models.EmissionSource.scope,
+        models.EmissionSource.factor_id, models.EmissionFactor.value,
+    ).outerjoin(
+        models.EmissionFactor, models.EmissionSource.factor_id == models.EmissionFactor.id
+    ).filter(models.EmissionSource.id.in_(set(source_ids))).all()
+    return {
+        source_id: SourceFactor(scope=scope, factor_id=factor_id, factor_value=factor_value)
+        for source_id, scope, factor_id, factor_value in rows
+    }
+
+# Instancia única de la caché para todo el proceso
+factor_cache = SourceFactorCache(
+    max_size=int(os.getenv("GHG_FACTOR_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("GHG_FACTOR_CACHE_TTL", "60")),
+)
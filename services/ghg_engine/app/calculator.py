@@ -1,11 +1,10 @@
-from typing import List
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
 from . import models
+from shared_models.models.environmental_entities import GHGScode
 
-def calculate_emissions(activity_data_list: List[models.ActivityData]) -> dict:
-    """
-    Calcula las emisiones totales de GEI a partir de una lista de datos de actividad.
-    """
-    inventory = {
+def _empty_inventory() -> dict:
+    return {
         "total_co2e": 0.0,
         "emissions_by_scope": {
             "Alcance 1": 0.0,
@@ -13,6 +12,12 @@ def calculate_emissions(activity_data_list: List[models.ActivityData]) -> dict:
             "Alcance 3": 0.0,
         }
     }
+
+def calculate_emissions(activity_data_list: List[models.ActivityData]) -> dict:
+    """
+    Calcula las emisiones totales de GEI a partir de una lista de datos de actividad.
+    """
+    inventory = _empty_inventory()
     
     for activity in activity_data_list:
         if activity.source and activity.source.factor:
@@ -27,4 +32,125 @@ def calculate_emissions(activity_data_list: List[models.ActivityData]) -> dict:
             if scope in inventory["emissions_by_scope"]:
                 inventory["emissions_by_scope"][scope] += co2e
                 
-    return inventory
\ No newline at end of file
+    return inventory
+
+def inventory_from_scope_totals(scope_totals: Iterable[Tuple[GHGScode, float]]) -> dict:
+    """
+    Construye el inventario a partir de totales ya agregados por alcance
+    (por ejemplo, el resultado de un SUM ... GROUP BY scope en SQL).
+    El resultado tiene la misma forma que calculate_emissions.
+    """
+    inventory = _empty_inventory()
+
+    for scope, co2e in scope_totals:
+        if scope is None or co2e is None:
+            continue
+        scope_value = scope.value if isinstance(scope, GHGScode) else str(scope)
+        inventory["total_co2e"] += co2e
+        if scope_value in inventory["emissions_by_scope"]:
+            inventory["emissions_by_scope"][scope_value] += co2e
+
+    return inventory
+
+# --- Cálculo columnar (vectorizado con NumPy) ---
+
+# Código entero de cada alcance: la posición en GHGScode
+SCOPES = list(GHGScode)
+SCOPE_CODES = {scope: code for code, scope in enumerate(SCOPES)}
+
+def _factor_lookup(factor_table: Dict[int, float]) -> np.ndarray:
+    """
+    Convierte {factor_id: valor} en un arreglo denso indexado por id.
+    Los ids sin factor quedan en NaN para poder descartarlos después.
+    """
+    size = (max(factor_table) + 1) if factor_table else 1
+    lookup = np.full(size, np.nan, dtype=np.float64)
+    if factor_table:
+        ids = np.fromiter(factor_table.keys(), dtype=np.int64, count=len(factor_table))
+        vals = np.fromiter(factor_table.values(), dtype=np.float64, count=len(factor_table))
+        lookup[ids] = vals
+    return lookup
+
+def _group_sum(keys: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Suma 'weights' agrupando por 'keys' (equivalente a un GROUP BY)."""
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    return unique_keys, np.bincount(inverse, weights=weights, minlength=len(unique_keys))
+
+def calculate_emissions_columnar(
+    values,
+    factor_ids,
+    scope_codes,
+    factor_table: Dict[int, float],
+    source_ids=None,
+    activity_dates=None,
+) -> dict:
+    """
+    Calcula el inventario de GEI a partir de columnas en lugar de objetos ORM.
+
+    - values: valor de cada dato de actividad.
+    - factor_ids: id del factor de emisión de la fuente de cada dato (-1 si no tiene).
+    - scope_codes: código de alcance de cada dato (ver SCOPE_CODES).
+    - factor_table: {factor_id: valor del factor}.
+    - source_ids / activity_dates: opcionales; si se entregan se añaden los
+      desgloses por fuente y por mes.
+
+    Da el mismo resultado que calculate_emissions (salvo tolerancia de punto flotante).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    factor_ids = np.asarray(factor_ids, dtype=np.int64)
+    scope_codes = np.asarray(scope_codes, dtype=np.int64)
+
+    # Búsqueda de factores mediante un arreglo de índices
+    lookup = _factor_lookup(factor_table)
+    in_range = (factor_ids >= 0) & (factor_ids < len(lookup))
+    factors = np.full(len(values), np.nan, dtype=np.float64)
+    factors[in_range] = lookup[factor_ids[in_range]]
+
+    # Emisiones = Dato de Actividad * Factor de Emisión; se descartan los datos sin factor
+    co2e = values * factors
+    valid = ~np.isnan(co2e)
+    co2e_valid = co2e[valid]
+
+    by_scope = np.bincount(scope_codes[valid], weights=co2e_valid, minlength=len(SCOPES))
+
+    inventory = _empty_inventory()
+    inventory["total_co2e"] = float(co2e_valid.sum())
+    for code, scope in enumerate(SCOPES):
+        inventory["emissions_by_scope"][scope.value] = float(by_scope[code])
+
+    if source_ids is not None:
+        source_ids = np.asarray(source_ids, dtype=np.int64)[valid]
+        keys, sums = _group_sum(source_ids, co2e_valid)
+        inventory["emissions_by_source"] = {str(k): float(v) for k, v in zip(keys.tolist(), sums.tolist())}
+
+    if activity_dates is not None:
+        # Meses desde 1970-01 como clave entera de agrupación
+        months = np.asarray(activity_dates, dtype="datetime64[D]")[valid].astype("datetime64[M]")
+        keys, sums = _group_sum(months.astype(np.int64), co2e_valid)
+        inventory["emissions_by_month"] = {
+            str(np.datetime64(int(k), "M")): float(v) for k, v in zip(keys.tolist(), sums.tolist())
+        }
+
+    return inventory
+
+def activity_columns(rows, sources: dict) -> dict:
+    """
+    Convierte filas (value, source_id, activity_date) en columnas listas para
+    calculate_emissions_columnar, resolviendo alcance y factor de cada fuente con
+    'sources' ({source_id: SourceFactor}, normalmente desde la caché de factores).
+    """
+    rows = [r for r in rows if r[1] in sources]
+    count = len(rows)
+    factor_ids = {source_id: (-1 if sf.factor_id is None else sf.factor_id) for source_id, sf in sources.items()}
+    scope_codes = {source_id: SCOPE_CODES[sf.scope] for source_id, sf in sources.items()}
+    return {
+        "values": np.fromiter((r[0] for r in rows), dtype=np.float64, count=count),
+        "factor_ids": np.fromiter((factor_ids[r[1]] for r in rows), dtype=np.int64, count=count),
+        "scope_codes": np.fromiter((scope_codes[r[1]] for r in rows), dtype=np.int64, count=count),
+        "source_ids": np.fromiter((r[1] for r in rows), dtype=np.int64, count=count),
+        "activity_dates": np.array([r[2] for r in rows], dtype="datetime64[D]"),
+        "factor_table": {
+            sf.factor_id: sf.factor_value for sf in sources.values()
+            if sf.factor_id is not None and sf.factor_value is not None
+        },
+    }
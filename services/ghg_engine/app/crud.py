@@ -1,9 +1,25 @@
+from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 from datetime import date
-from . import models
+from . import models, rollup
+from .cache import factor_cache
+from .series import series_index
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.data_version import read_data_version
+
+# --- Versión de los datos (para ETag) ---
+# Tablas que alimentan el inventario (sus versiones viven en data_versions y data_changes)
+DATA_VERSION_TABLES = ("emission_factors", "emission_sources", "activity_data")
+
+def get_data_version(db: Session) -> str:
+    """
+    Versión de los datos del inventario: las versiones de factores, fuentes y datos de
+    actividad, que los triggers de la base registran con cada escritura. Se lee con una
+    consulta sobre data_versions y el registro pendiente de data_changes.
+    """
+    return read_data_version(db, DATA_VERSION_TABLES)
 
 # --- CRUD para Factores de Emisión ---
 def create_emission_factor(db: Session, factor: schemas.EmissionFactorCreate):
@@ -11,12 +27,32 @@ def create_emission_factor(db: Session, factor: schemas.EmissionFactorCreate):
     try:
         db.add(db_factor)
         db.commit()
+        factor_cache.bump_version()
         db.refresh(db_factor)
         return db_factor
     except IntegrityError:
         db.rollback()
         raise HTTPException(status_code=409, detail=f"Emission factor with name '{factor.name}' already exists.")
 
+def update_emission_factor(db: Session, factor_id: int, factor: schemas.EmissionFactorCreate):
+    db_factor = db.query(models.EmissionFactor).filter(models.EmissionFactor.id == factor_id).first()
+    if db_factor is None:
+        return None
+    value_changed = db_factor.value != factor.value
+    for key, value in factor.dict().items():
+        setattr(db_factor, key, value)
+    if value_changed:
+        # El rollup mensual guarda CO2e ya multiplicado: se recalcula en la misma transacción
+        rollup.refresh_factor(db, factor_id=factor_id, factor_value=factor.value)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=f"Emission factor with name '{factor.name}' already exists.")
+    factor_cache.bump_version()
+    db.refresh(db_factor)
+    return db_factor
+
 # --- CRUD para Fuentes de Emisión ---
 def create_emission_source(db: Session, source: schemas.EmissionSourceCreate):
     db_source = models.EmissionSource(**source.dict())
@@ -29,12 +65,61 @@ def create_emission_source(db: Session, source: schemas.EmissionSourceCreate):
 def create_activity_data(db: Session, activity: schemas.ActivityDataCreate):
     db_activity = models.ActivityData(**activity.dict())
     db.add(db_activity)
-    db.commit()
+    rollup.apply_activity(db, [activity.dict()])
+    with series_index.writer(db, [activity.dict()]):
+        db.commit()
     db.refresh(db_activity)
     return db_activity
     
+def get_emission_source_ids(db: Session) -> set:
+    return {source_id for (source_id,) in db.query(models.EmissionSource.id).all()}
+
 def get_activity_data_for_period(db: Session, start_date: date, end_date: date):
     # Usamos joinedload para cargar eficientemente los datos relacionados
     return db.query(models.ActivityData).options(
         joinedload(models.ActivityData.source).joinedload(models.EmissionSource.factor)
-    ).filter(models.ActivityData.activity_date.between(start_date, end_date)).all()
\ No newline at end of file
+    ).filter(models.ActivityData.activity_date.between(start_date, end_date)).all()
+
+def get_emissions_by_scope_for_period(db: Session, start_date: date, end_date: date):
+    """
+    Agrega las emisiones del periodo directamente en la base de datos.
+    Devuelve una fila (scope, co2e) por alcance en lugar de hidratar cada ActivityData.
+    SQLite ejecuta la misma agregación, así que no hay una variante en Python para él.
+    """
+    co2e = func.sum(models.ActivityData.value * models.EmissionFactor.value)
+    return db.query(models.EmissionSource.scope, co2e).select_from(models.ActivityData).join(
+        models.EmissionSource, models.ActivityData.source_id == models.EmissionSource.id
+    ).join(
+        models.EmissionFactor, models.EmissionSource.factor_id == models.EmissionFactor.id
+    ).filter(
+        models.ActivityData.activity_date.between(start_date, end_date)
+    ).group_by(models.EmissionSource.scope).all()
+
+
+def get_inventory_scope_totals(db: Session, start_date: date, end_date: date):
+    """
+    Totales (scope, co2e) del periodo: los meses completos se leen del rollup mensual
+    (reconstruido en el primer uso si está vacío) y solo los meses parciales de los
+    bordes se agregan desde los datos crudos.
+    """
+    months, edges = rollup.split_period(start_date, end_date)
+    scope_totals = []
+    if months:
+        rollup.ensure_populated(db)
+        scope_totals.extend(rollup.get_scope_totals(db, *months))
+    for edge_start, edge_end in edges:
+        scope_totals.extend(get_emissions_by_scope_for_period(db, start_date=edge_start, end_date=edge_end))
+    return scope_totals
+
+def get_activity_columns_for_period(db: Session, start_date: date, end_date: date):
+    """
+    Devuelve solo las columnas (value, source_id, activity_date) de los datos del periodo,
+    sin hidratar objetos ORM ni unir fuentes y factores: estos se resuelven con la caché.
+    """
+    return db.query(
+        models.ActivityData.value,
+        models.ActivityData.source_id,
+        models.ActivityData.activity_date,
+    ).filter(
+        models.ActivityData.activity_date.between(start_date, end_date)
+    ).all()
@@ -0,0 +1,149 @@
+import csv
+import json
+import os
+from typing import AsyncIterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from . import models, rollup
+from .series import series_index
+from .schemas import BulkIngestError, BulkIngestResult
+from shared_models.models import environmental_entities as schemas
+
+# Filas que se validan y escriben juntas en cada lote
+CHUNK_SIZE = int(os.getenv("GHG_INGEST_CHUNK_SIZE", "5000"))
+# Máximo de errores detallados en la respuesta (el contador 'failed' siempre es exacto)
+MAX_REPORTED_ERRORS = int(os.getenv("GHG_INGEST_MAX_ERRORS", "1000"))
+
+CSV_FIELDS = ("value", "unit", "activity_date", "source_id")
+FORMATS = ("csv", "ndjson")
+
+def detect_format(explicit: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """Determina el formato del cuerpo: parámetro explícito o Content-Type."""
+    if explicit:
+        return explicit.lower() if explicit.lower() in FORMATS else None
+    content_type = (content_type or "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return None
+
+async def iter_lines(byte_chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Convierte el cuerpo recibido en streaming en líneas numeradas (desde 1),
+    sin cargar el archivo completo en memoria.
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in byte_chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            yield line_no, raw.decode("utf-8").rstrip("\r")
+    if buffer:
+        yield line_no + 1, buffer.decode("utf-8").rstrip("\r")
+
+class BulkIngestor:
+    """
+    Acumula líneas de un cuerpo CSV o NDJSON, las valida por lotes y las escribe
+    con inserciones multi-fila (o COPY en PostgreSQL con psycopg 3).
+    Una fila inválida se reporta como error sin abortar el resto de la carga.
+    """
+    def __init__(self, db: Session, fmt: str, known_source_ids: Set[int], chunk_size: int = CHUNK_SIZE):
+        self.db = db
+        self.fmt = fmt
+        self.known_source_ids = known_source_ids
+        self.chunk_size = chunk_size
+        self.header: Optional[List[str]] = None
+        self.pending: List[Tuple[int, str]] = []
+        self.result = BulkIngestResult()
+
+    def add(self, line_no: int, line: str) -> bool:
+        """Añade una línea al lote pendiente. Devuelve True cuando el lote está lleno."""
+        if not line.strip():
+            return False
+        if self.fmt == "csv" and self.header is None:
+            self.header = [name.strip() for name in next(csv.reader([line]))]
+            return False
+        self.pending.append((line_no, line))
+        return len(self.pending) >= self.chunk_size
+
+    def flush(self) -> None:
+        """Valida y escribe el lote pendiente."""
+        if not self.pending:
+            return
+        lines, self.pending = self.pending, []
+        self.result.received += len(lines)
+
+        rows, row_lines = [], []
+        for line_no, line in lines:
+            try:
+                activity = schemas.ActivityDataCreate.model_validate(self._parse(line))
+            except (ValidationError, ValueError) as e:
+                self._error(line_no, str(e))
+                continue
+            if activity.source_id not in self.known_source_ids:
+                self._error(line_no, f"Emission source {activity.source_id} does not exist.")
+                continue
+            rows.append(activity.model_dump())
+            row_lines.append(line_no)
+
+        if rows:
+            try:
+                write_activity_rows(self.db, rows)
+            except Exception as e:
+                self.db.rollback()
+                # Solo las filas del lote fallido: las inválidas ya se contaron arriba
+                for line_no in row_lines:
+                    self._error(line_no, f"Error al escribir el lote: {e}")
+            else:
+                self.result.inserted += len(rows)
+
+    def _parse(self, line: str) -> dict:
+        if self.fmt == "ndjson":
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Cada línea NDJSON debe ser un objeto JSON.")
+            return record
+        values = next(csv.reader([line]))
+        header = self.header or list(CSV_FIELDS)
+        if len(values) != len(header):
+            raise ValueError(f"Se esperaban {len(header)} columnas y se recibieron {len(values)}.")
+        return dict(zip(header, values))
+
+    def _error(self, line_no: int, message: str) -> None:
+        self.result.failed += 1
+        if len(self.result.errors) < MAX_REPORTED_ERRORS:
+            self.result.errors.append(BulkIngestError(line=line_no, error=message))
+
+def write_activity_rows(db: Session, rows: List[dict]) -> None:
+    """
+    Escribe un lote de filas ya validadas en una sola sentencia y un solo commit. Si
+    lanza, el lote no se confirmó: el rollup va en la misma transacción y el índice de
+    series, que se actualiza después del commit, no propaga sus errores (se marca
+    para reconstruir), así que un cliente que reintenta no duplica datos.
+    """
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg":
+        _copy_activity_rows(db, rows)
+    else:
+        # Inserción multi-fila con la tabla de Core (executemany), sin pasar por la
+        # unidad de trabajo del ORM
+        db.execute(models.ActivityData.__table__.insert(), rows)
+    rollup.apply_activity(db, rows)
+    with series_index.writer(db, rows):
+        db.commit()
+
+def _copy_activity_rows(db: Session, rows: List[dict]) -> None:
+    """Usa COPY ... FROM STDIN de PostgreSQL, la vía más rápida de carga."""
+    cursor = db.connection().connection.cursor()
+    try:
+        # psycopg 3 adapta cada valor (fecha, número) al formato de COPY
+        with cursor.copy(f"COPY {models.ActivityData.__tablename__} ({', '.join(CSV_FIELDS)}) FROM STDIN") as copy:
+            for row in rows:
+                copy.write_row([row[field] for field in CSV_FIELDS])
+    finally:
+        cursor.close()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, Enum as SQLAlchemyEnum, ForeignKey
+from sqlalchemy import Column, Integer, String, Date, Float, Enum as SQLAlchemyEnum, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 from shared_models.models.environmental_entities import GHGScode, EmissionSourceType
 
@@ -29,5 +29,22 @@ class ActivityData(Base):
     value = Column(Float, nullable=False)
     unit = Column(String, nullable=False)
     activity_date = Column(Date, nullable=False)
-    source_id = Column(Integer, ForeignKey("emission_sources.id"))
+    source_id = Column(Integer, ForeignKey("emission_sources.id"), index=True)
     source = relationship("EmissionSource", back_populates="activity_data")
+
+    # Barrido por periodo (ver migración 0002 de core_sga)
+    __table_args__ = (
+        Index("ix_activity_data_date_source", "activity_date", "source_id"),
+    )
+
+class MonthlyEmission(Base):
+    """
+    Rollup materializado de emisiones por (mes, fuente, alcance).
+    Se mantiene incrementalmente al insertar datos de actividad y al cambiar un factor.
+    """
+    __tablename__ = "monthly_emissions"
+    month = Column(Date, primary_key=True)  # Primer día del mes
+    source_id = Column(Integer, ForeignKey("emission_sources.id"), primary_key=True)
+    scope = Column(SQLAlchemyEnum(GHGScode), nullable=False)
+    activity_total = Column(Float, nullable=False, default=0.0)
+    co2e = Column(Float, nullable=False, default=0.0)
@@ -0,0 +1,179 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+from sqlalchemy import extract, func, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import models
+from .cache import load_source_factors
+
+# --- Utilidades de fechas ---
+def month_start(d: date) -> date:
+    return d.replace(day=1)
+
+def next_month(d: date) -> date:
+    return (d.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+def split_period(start_date: date, end_date: date) -> Tuple[Optional[Tuple[date, date]], List[Tuple[date, date]]]:
+    """
+    Divide [start_date, end_date] en meses completos (respondidos desde el rollup)
+    y tramos parciales en los bordes (leídos desde los datos crudos).
+    Devuelve ((primer_mes, último_mes) o None, [(inicio, fin), ...]).
+    """
+    if start_date > end_date:
+        return None, []
+    first_full = start_date if start_date.day == 1 else next_month(start_date)
+    end_exclusive = end_date + timedelta(days=1)
+    last_full_end = end_date if end_exclusive.day == 1 else month_start(end_date) - timedelta(days=1)
+    if first_full > last_full_end:
+        return None, [(start_date, end_date)]
+
+    edges = []
+    if start_date < first_full:
+        edges.append((start_date, first_full - timedelta(days=1)))
+    if end_date > last_full_end:
+        edges.append((last_full_end + timedelta(days=1), end_date))
+    return (first_full, month_start(last_full_end)), edges
+
+# --- Mantenimiento incremental ---
+def _upsert(db: Session, rows: List[dict]) -> None:
+    """Suma los incrementos a las filas existentes del rollup (o las crea)."""
+    table = models.MonthlyEmission.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.month, table.c.source_id],
+            set_={
+                "activity_total": table.c.activity_total + stmt.excluded.activity_total,
+                "co2e": table.c.co2e + stmt.excluded.co2e,
+            },
+        )
+        db.execute(stmt, rows)
+        return
+
+    # Otros motores: lectura y actualización fila a fila
+    for row in rows:
+        existing = db.get(models.MonthlyEmission, (row["month"], row["source_id"]))
+        if existing is None:
+            db.add(models.MonthlyEmission(**row))
+        else:
+            existing.activity_total += row["activity_total"]
+            existing.co2e += row["co2e"]
+    db.flush()
+
+def apply_activity(db: Session, activities: Iterable[dict]) -> None:
+    """
+    Incorpora nuevos datos de actividad (dicts con value, activity_date y source_id)
+    al rollup. Debe llamarse en la misma transacción que la inserción.
+    """
+    deltas = defaultdict(float)
+    for activity in activities:
+        deltas[(month_start(activity["activity_date"]), activity["source_id"])] += activity["value"]
+    if not deltas:
+        return
+
+    # Factores leídos en la transacción: la caché de otro worker puede no haber visto un cambio
+    sources = load_source_factors(db, {source_id for _, source_id in deltas})
+
+    rows = []
+    for (month, source_id), activity_total in deltas.items():
+        if source_id not in sources:
+            continue
+        source = sources[source_id]
+        rows.append({
+            "month": month,
+            "source_id": source_id,
+            "scope": source.scope,
+            "activity_total": activity_total,
+            "co2e": activity_total * (source.factor_value or 0.0),
+        })
+    if rows:
+        _upsert(db, rows)
+
+def refresh_factor(db: Session, factor_id: int, factor_value: float) -> None:
+    """Recalcula el CO2e del rollup de las fuentes que usan un factor que cambió."""
+    source_ids = db.query(models.EmissionSource.id).filter(models.EmissionSource.factor_id == factor_id)
+    db.query(models.MonthlyEmission).filter(
+        models.MonthlyEmission.source_id.in_(source_ids.scalar_subquery())
+    ).update(
+        {models.MonthlyEmission.co2e: models.MonthlyEmission.activity_total * factor_value},
+        synchronize_session=False,
+    )
+
+def _lock_for_rebuild(db: Session) -> None:
+    """
+    En PostgreSQL bloquea las escrituras del rollup hasta el commit de la reconstrucción:
+    los upserts concurrentes esperan y suman su incremento sobre el resultado, en lugar
+    de perderse con el DELETE o de chocar con las filas nuevas.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text(f"LOCK TABLE {models.MonthlyEmission.__tablename__} IN EXCLUSIVE MODE"))
+
+def rebuild(db: Session) -> int:
+    """Reconstruye el rollup completo desde los datos crudos. Devuelve las filas generadas."""
+    _lock_for_rebuild(db)
+    year = extract("year", models.ActivityData.activity_date)
+    month = extract("month", models.ActivityData.activity_date)
+    grouped = db.query(
+        year, month, models.ActivityData.source_id, models.EmissionSource.scope,
+        func.sum(models.ActivityData.value), models.EmissionFactor.value,
+    ).join(
+        models.EmissionSource, models.ActivityData.source_id == models.EmissionSource.id
+    ).outerjoin(
+        models.EmissionFactor, models.EmissionSource.factor_id == models.EmissionFactor.id
+    ).group_by(
+        year, month, models.ActivityData.source_id, models.EmissionSource.scope, models.EmissionFactor.value
+    ).all()
+
+    db.query(models.MonthlyEmission).delete(synchronize_session=False)
+    rows = [
+        {
+            "month": date(int(y), int(m), 1),
+            "source_id": source_id,
+            "scope": scope,
+            "activity_total": activity_total,
+            "co2e": activity_total * (factor_value or 0.0),
+        }
+        for y, m, source_id, scope, activity_total, factor_value in grouped
+    ]
+    if rows:
+        db.execute(models.MonthlyEmission.__table__.insert(), rows)
+    db.commit()
+    return len(rows)
+
+def _is_empty(db: Session) -> bool:
+    return db.query(models.MonthlyEmission.month).limit(1).first() is None
+
+# El rollup se comprueba una vez por proceso
+_populated = False
+
+def ensure_populated(db: Session) -> None:
+    """
+    Reconstruye el rollup si está vacío pero ya hay datos de actividad: p. ej. el primer
+    despliegue sobre una base con histórico, que el mantenimiento incremental no cubre.
+    """
+    global _populated
+    if _populated:
+        return
+    if _is_empty(db) and db.query(models.ActivityData.id).limit(1).first() is not None:
+        _lock_for_rebuild(db)
+        # Otra réplica pudo reconstruirlo mientras esperábamos el bloqueo
+        if _is_empty(db):
+            print("Rollup mensual vacío con datos de actividad existentes: se reconstruye.")
+            rebuild(db)
+    db.commit()
+    _populated = True
+
+# --- Consultas ---
+def get_scope_totals(db: Session, first_month: date, last_month: date):
+    """Totales (scope, co2e) de los meses completos entre first_month y last_month."""
+    return db.query(
+        models.MonthlyEmission.scope, func.sum(models.MonthlyEmission.co2e)
+    ).filter(
+        models.MonthlyEmission.month.between(first_month, last_month)
+    ).group_by(models.MonthlyEmission.scope).all()
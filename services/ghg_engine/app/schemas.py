@@ -0,0 +1,34 @@
+from pydantic import BaseModel
+from typing import Dict, List
+from datetime import date
+from enum import Enum
+
+class BulkIngestError(BaseModel):
+    """Error de validación o escritura de una fila de la carga masiva."""
+    line: int
+    error: str
+
+class BulkIngestResult(BaseModel):
+    """Resumen de una carga masiva de datos de actividad."""
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[BulkIngestError] = []
+
+class SeriesBucket(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+class SeriesPoint(BaseModel):
+    """Emisiones de un periodo de la serie temporal."""
+    period_start: date
+    period_end: date
+    total_co2e: float
+    emissions_by_scope: Dict[str, float]
+
+class InventorySeries(BaseModel):
+    bucket: SeriesBucket
+    start_date: date
+    end_date: date
+    series: List[SeriesPoint] = []
@@ -0,0 +1,221 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from . import models
+from .cache import SourceFactor, factor_cache, load_source_factors
+from .rollup import month_start, next_month
+from .schemas import SeriesBucket
+from shared_models.models.environmental_entities import GHGScode
+
+# Días libres al final del índice para absorber datos nuevos sin reconstruirlo
+PADDING_DAYS = 366
+
+class FenwickTree:
+    """
+    Árbol de Fenwick (Binary Indexed Tree) sobre valores diarios.
+    Permite sumar cualquier rango y actualizar un día en O(log n).
+    """
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0.0] * (size + 1)
+
+    @classmethod
+    def from_values(cls, values: List[float]) -> "FenwickTree":
+        """Construcción en O(n) a partir de los valores diarios."""
+        tree = cls(len(values))
+        data = tree._tree
+        for i, value in enumerate(values, start=1):
+            data[i] += value
+            parent = i + (i & -i)
+            if parent <= tree.size:
+                data[parent] += data[i]
+        return tree
+
+    def add(self, index: int, delta: float) -> None:
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> float:
+        """Suma de las posiciones [0, index)."""
+        total = 0.0
+        i = index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+    def range_sum(self, lo: int, hi: int) -> float:
+        """Suma de las posiciones [lo, hi] (inclusive)."""
+        if hi < lo:
+            return 0.0
+        return self.prefix_sum(hi + 1) - self.prefix_sum(lo)
+
+class EmissionSeriesIndex:
+    """
+    Índice en memoria de las emisiones diarias por alcance, con un árbol de Fenwick
+    por alcance. Se construye con una sola consulta agregada por día y se actualiza
+    incrementalmente al registrar nuevos datos de actividad.
+
+    Se reconstruye cuando cambia la versión de la caché de factores (un factor
+    modificado altera todo el histórico), cuando llega un dato fuera del rango
+    cubierto, o tras 'ttl' segundos para ver datos cargados por otros workers.
+    """
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self._origin: Optional[date] = None
+        self._trees: Dict[GHGScode, FenwickTree] = {}
+        self._built_at = 0.0
+        self._factor_version = -1
+        self._stale = True
+        self._lock = threading.Lock()
+        # Coordinación escritores/reconstrucción: un dato confirmado mientras se
+        # reconstruye el índice no debe contarse dos veces.
+        self._gate = threading.Condition()
+        self._writers = 0
+        self._building = False
+
+    @contextmanager
+    def writer(self, db: Session, activities: Iterable[dict]):
+        """
+        Envuelve el commit de nuevos datos de actividad (dicts con value, activity_date,
+        source_id) y los incorpora al índice cuando el bloque termina sin error.
+
+        Los factores de sus fuentes se cargan antes de entrar, con la conexión de la
+        transacción todavía abierta: tras el commit el escritor ya no la tiene y, si las
+        reconstrucciones en espera agotaron el pool, pedir otra lo bloquearía aquí dentro
+        con sus filas ya confirmadas.
+        """
+        activities = list(activities)
+        sources = load_source_factors(db, {a["source_id"] for a in activities}) if activities else {}
+        with self._gate:
+            while self._building:
+                self._gate.wait()
+            self._writers += 1
+        try:
+            yield
+            try:
+                self._add_activities(activities, sources)
+            except Exception as e:
+                # Las filas ya están confirmadas: no se reporta como fallo de la escritura,
+                # el índice se reconstruye en la próxima consulta
+                print(f"Advertencia: no se pudo actualizar el índice de series; se reconstruirá. Error: {e!r}")
+                self._stale = True
+        finally:
+            with self._gate:
+                self._writers -= 1
+                self._gate.notify_all()
+
+    def _add_activities(self, activities: List[dict], sources: Dict[int, SourceFactor]) -> None:
+        """Incorpora datos de actividad ya confirmados, con los factores de sus fuentes ya cargados."""
+        with self._lock:
+            if self._stale:
+                return
+            for activity in activities:
+                source = sources.get(activity["source_id"])
+                if source is None or source.factor_value is None:
+                    continue
+                index = (activity["activity_date"] - self._origin).days
+                tree = self._trees[source.scope]
+                if not 0 <= index < tree.size:
+                    # Fuera del rango cubierto: se reconstruye en la próxima consulta
+                    self._stale = True
+                    return
+                tree.add(index, activity["value"] * source.factor_value)
+
+    def _needs_rebuild(self) -> bool:
+        expired = self.ttl and time.monotonic() - self._built_at > self.ttl
+        return self._stale or expired or self._factor_version != factor_cache.version
+
+    def ensure_fresh(self, db: Session) -> None:
+        if self._needs_rebuild():
+            self._rebuild(db)
+
+    def _rebuild(self, db: Session) -> None:
+        # La conexión se toma antes de esperar: los escritores que aguardan la
+        # reconstrucción retienen la suya, y con el pool agotado nunca terminaría
+        db.connection()
+        with self._gate:
+            while self._building or self._writers:
+                self._gate.wait()
+            # Otro lector pudo reconstruirlo mientras se esperaba: no se repite
+            if not self._needs_rebuild():
+                return
+            self._building = True
+        try:
+            factor_version = factor_cache.version
+            rows = get_daily_emissions_by_scope(db)
+            origin = min((row[0] for row in rows), default=date.today())
+            last = max((row[0] for row in rows), default=origin)
+            size = (last - origin).days + 1 + PADDING_DAYS
+            daily = {scope: [0.0] * size for scope in GHGScode}
+            for activity_date, scope, co2e in rows:
+                daily[scope][(activity_date - origin).days] += co2e or 0.0
+            with self._lock:
+                self._origin = origin
+                self._trees = {scope: FenwickTree.from_values(values) for scope, values in daily.items()}
+                self._factor_version = factor_version
+                self._built_at = time.monotonic()
+                self._stale = False
+        finally:
+            with self._gate:
+                self._building = False
+                self._gate.notify_all()
+
+    def range_totals(self, start_date: date, end_date: date) -> Dict[str, float]:
+        """Emisiones por alcance entre dos fechas (inclusive), en O(log n)."""
+        with self._lock:
+            lo = max((start_date - self._origin).days, 0)
+            totals = {}
+            for scope, tree in self._trees.items():
+                hi = min((end_date - self._origin).days, tree.size - 1)
+                totals[scope.value] = tree.range_sum(lo, hi)
+            return totals
+
+    def series(self, db: Session, start_date: date, end_date: date, bucket: SeriesBucket) -> List[dict]:
+        self.ensure_fresh(db)
+        series = []
+        for period_start, period_end in iter_buckets(start_date, end_date, bucket):
+            by_scope = self.range_totals(period_start, period_end)
+            series.append({
+                "period_start": period_start,
+                "period_end": period_end,
+                "total_co2e": sum(by_scope.values()),
+                "emissions_by_scope": by_scope,
+            })
+        return series
+
+def get_daily_emissions_by_scope(db: Session):
+    """Emisiones (activity_date, scope, co2e) agregadas por día y alcance en SQL."""
+    co2e = func.sum(models.ActivityData.value * models.EmissionFactor.value)
+    return db.query(models.ActivityData.activity_date, models.EmissionSource.scope, co2e).join(
+        models.EmissionSource, models.ActivityData.source_id == models.EmissionSource.id
+    ).join(
+        models.EmissionFactor, models.EmissionSource.factor_id == models.EmissionFactor.id
+    ).group_by(models.ActivityData.activity_date, models.EmissionSource.scope).all()
+
+def iter_buckets(start_date: date, end_date: date, bucket: SeriesBucket):
+    """Genera los tramos (inicio, fin) de cada periodo, recortados a [start_date, end_date]."""
+    current = start_date
+    while current <= end_date:
+        if bucket == SeriesBucket.DAY:
+            following = current + timedelta(days=1)
+        elif bucket == SeriesBucket.WEEK:
+            # Semanas ISO: de lunes a domingo
+            following = current - timedelta(days=current.weekday()) + timedelta(days=7)
+        else:
+            following = next_month(month_start(current))
+        period_end = min(following - timedelta(days=1), end_date)
+        yield current, period_end
+        current = following
+
+# Instancia única del índice para todo el proceso
+series_index = EmissionSeriesIndex(ttl=float(os.getenv("GHG_SERIES_TTL", "300")))
@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from shared_models.models.projection import ProjectionError, parse_projection
 from . import crud
-from .db import get_db
+from .db import engine, get_db
 
 router = APIRouter()
 
@@ -13,8 +16,20 @@ def create_objective(objective: schemas.ObjectiveCreate, db: Session = Depends(g
     return crud.create_objective(db=db, objective=objective)
 
 @router.get("/objectives/", response_model=List[schemas.Objective], tags=["Objetivos e Indicadores"])
-def read_objectives(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    objectives = crud.get_objectives(db, skip=skip, limit=limit)
+def read_objectives(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (id siempre se incluye)"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir (indicators); vacío para ninguna"),
+    db: Session = Depends(get_db)
+):
+    try:
+        projection = parse_projection(schemas.Objective, fields=fields, expand=expand)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    objectives = crud.get_objectives(db, skip=skip, limit=limit, expand=projection.expand)
+    if not projection.is_full:
+        return JSONResponse([projection.dump(objective) for objective in objectives])
     return objectives
 
 @router.post("/objectives/{objective_id}/indicators/", response_model=schemas.Indicator, tags=["Objetivos e Indicadores"])
@@ -23,4 +38,9 @@ def create_indicator_for_objective(objective_id: int, indicator: schemas.Indicat
     db_objective = crud.get_objective(db, objective_id=objective_id)
     if db_objective is None:
         raise HTTPException(status_code=404, detail="Objetivo no encontrado")
-    return crud.create_indicator_for_objective(db=db, indicator=indicator, objective_id=objective_id)
\ No newline at end of file
+    return crud.create_indicator_for_objective(db=db, indicator=indicator, objective_id=objective_id)
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
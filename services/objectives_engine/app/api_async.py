@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from shared_models.models.projection import ProjectionError, parse_projection
+from . import crud_async
+from .db import async_engine, get_async_db
+
+# Mismos endpoints que api.py, con AsyncSession (se usa cuando DB_ASYNC=true)
+router = APIRouter()
+
+@router.post("/objectives/", response_model=schemas.Objective, tags=["Objetivos e Indicadores"])
+async def create_objective(objective: schemas.ObjectiveCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_objective(db=db, objective=objective)
+
+@router.get("/objectives/", response_model=List[schemas.Objective], tags=["Objetivos e Indicadores"])
+async def read_objectives(
+    skip: int = 0,
+    limit: int = 100,
+    fields: Optional[str] = Query(None, description="Campos a devolver, separados por comas (id siempre se incluye)"),
+    expand: Optional[str] = Query(None, description="Relaciones a incluir (indicators); vacío para ninguna"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    try:
+        projection = parse_projection(schemas.Objective, fields=fields, expand=expand)
+    except ProjectionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    objectives = await crud_async.get_objectives(db, skip=skip, limit=limit, expand=projection.expand)
+    if not projection.is_full:
+        return JSONResponse([projection.dump(objective) for objective in objectives])
+    return objectives
+
+@router.post("/objectives/{objective_id}/indicators/", response_model=schemas.Indicator, tags=["Objetivos e Indicadores"])
+async def create_indicator_for_objective(objective_id: int, indicator: schemas.IndicatorCreate, db: AsyncSession = Depends(get_async_db)):
+    db_objective = await crud_async.get_objective(db, objective_id=objective_id)
+    if db_objective is None:
+        raise HTTPException(status_code=404, detail="Objetivo no encontrado")
+    return await crud_async.create_indicator_for_objective(db=db, indicator=indicator, objective_id=objective_id)
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones asíncrono y tiempos de espera de checkout."""
+    return pool_metrics(async_engine)
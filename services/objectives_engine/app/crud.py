@@ -1,13 +1,20 @@
-from sqlalchemy.orm import Session, joinedload
+from typing import Iterable, Optional
+
+from sqlalchemy.orm import Session, selectinload
 from . import models
 from shared_models.models import environmental_entities as schemas
 
+def objective_load_options(expand: Optional[Iterable[str]] = None) -> list:
+    # selectinload: los indicadores de toda la página en una consulta IN, sin que el
+    # LIMIT/OFFSET se aplique sobre filas duplicadas por el join
+    names = ("indicators",) if expand is None else expand
+    return [selectinload(getattr(models.Objective, name)) for name in names]
+
 def get_objective(db: Session, objective_id: int):
-    # Usamos joinedload para cargar siempre los indicadores junto con el objetivo
-    return db.query(models.Objective).options(joinedload(models.Objective.indicators)).filter(models.Objective.id == objective_id).first()
+    return db.query(models.Objective).options(*objective_load_options()).filter(models.Objective.id == objective_id).first()
 
-def get_objectives(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(models.Objective).options(joinedload(models.Objective.indicators)).offset(skip).limit(limit).all()
+def get_objectives(db: Session, skip: int = 0, limit: int = 100, expand: Optional[Iterable[str]] = None):
+    return db.query(models.Objective).options(*objective_load_options(expand)).order_by(models.Objective.id).offset(skip).limit(limit).all()
 
 def create_objective(db: Session, objective: schemas.ObjectiveCreate):
     db_objective = models.Objective(**objective.dict())
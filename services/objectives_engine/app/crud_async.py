@@ -0,0 +1,42 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from . import models
+from shared_models.models import environmental_entities as schemas
+
+# Versión asíncrona de crud.py (modo DB_ASYNC). En una AsyncSession no hay carga
+# perezosa implícita: todo lo que serializa la respuesta se carga por adelantado.
+
+def _objective_options(expand: Optional[Iterable[str]] = None) -> list:
+    names = ("indicators",) if expand is None else expand
+    # La relación inversa (Indicator.objective) también se serializa: se carga en la misma pasada
+    return [selectinload(getattr(models.Objective, name)).selectinload(models.Indicator.objective) for name in names]
+
+async def get_objective(db: AsyncSession, objective_id: int):
+    result = await db.execute(
+        select(models.Objective).options(*_objective_options()).where(models.Objective.id == objective_id)
+    )
+    return result.scalars().first()
+
+async def get_objectives(db: AsyncSession, skip: int = 0, limit: int = 100, expand: Optional[Iterable[str]] = None):
+    result = await db.execute(
+        select(models.Objective).options(*_objective_options(expand)).order_by(models.Objective.id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_objective(db: AsyncSession, objective: schemas.ObjectiveCreate):
+    db_objective = models.Objective(**objective.dict())
+    db.add(db_objective)
+    await db.commit()
+    return await get_objective(db, db_objective.id)
+
+async def create_indicator_for_objective(db: AsyncSession, indicator: schemas.IndicatorCreate, objective_id: int):
+    db_indicator = models.Indicator(**indicator.dict(), objective_id=objective_id)
+    db.add(db_indicator)
+    await db.commit()
+    result = await db.execute(
+        select(models.Indicator).options(selectinload(models.Indicator.objective)).where(models.Indicator.id == db_indicator.id)
+    )
+    return result.scalars().one()
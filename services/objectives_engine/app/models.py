@@ -19,5 +19,5 @@ class Indicator(Base):
     name = Column(String)
     current_value = Column(Float)
     unit = Column(String)
-    objective_id = Column(Integer, ForeignKey("objectives.id"))
+    objective_id = Column(Integer, ForeignKey("objectives.id"), index=True)
     objective = relationship("Objective", back_populates="indicators")
\ No newline at end of file
@@ -1,7 +1,13 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import router as api_router
+from app.db import ASYNC_DB
+
+# DB_ASYNC=true sirve los mismos endpoints con AsyncSession
+if ASYNC_DB:
+    from app.api_async import router as api_router
+else:
+    from app.api import router as api_router
 
 app = FastAPI(
     title="Motor de Objetivos del SGA - ISO 14001:2026",
@@ -1,41 +1,66 @@
-from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse
-from jinja2 import Environment, FileSystemLoader
-from . import services, schemas
-from datetime import date # <--- ¡AÑADIR ESTA LÍNEA!
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from . import renderers, reports, schemas, streaming
+from .jobs import job_queue
+from .report_cache import report_cache
+from .schemas import ReportFormat, ReportJob, ReportJobCreated, ReportRequest
 
 router = APIRouter()
 
-# Configura Jinja2 para que encuentre nuestras plantillas
-env = Environment(loader=FileSystemLoader("app/templates"))
-
-class ReportRequest(schemas.BaseModel):
-    company_name: str
-    reporting_period: str
-    start_date: date # <-- Ahora Python sabe qué es 'date'
-    end_date: date   # <-- Ahora Python sabe qué es 'date'
-
 @router.post("/reports/sustainability", tags=["Generación de Reportes"])
-def generate_sustainability_report(request_data: ReportRequest):
+async def generate_sustainability_report(request_data: ReportRequest, format: ReportFormat = ReportFormat.MARKDOWN):
     """
     Genera un reporte de sostenibilidad agregando datos de todos los microservicios.
+    Si los datos de origen no cambiaron (según sus ETag), se sirve desde la caché.
+    `format` elige la salida: Markdown (dentro de JSON, como siempre), HTML o CSV.
+    """
+    rendered, cache_status = await reports.generate_report(request_data, format)
+    return _report_response(rendered, format, cache_status=cache_status)
+
+def _report_response(rendered: str, report_format: ReportFormat, cache_status: str) -> Response:
+    headers = {"X-Report-Cache": cache_status}
+    if report_format == ReportFormat.MARKDOWN:
+        return JSONResponse(content={"report_markdown": rendered}, headers=headers)
+    return Response(content=rendered, media_type=renderers.RENDERERS[report_format].media_type, headers=headers)
+
+@router.post("/reports/jobs", response_model=ReportJobCreated, status_code=202, tags=["Generación de Reportes"])
+async def create_report_job(request_data: ReportRequest, format: ReportFormat = ReportFormat.MARKDOWN):
+    """
+    Encola la generación del reporte y responde de inmediato con el id del trabajo.
+    Pensado para reportes grandes que superarían el timeout de una petición HTTP.
     """
-    # 1. Recolectar datos de todos los servicios
-    policy_data = services.get_policy()
-    aspects_data = services.get_significant_aspects()
-    ghg_data = services.get_ghg_inventory(request_data.start_date, request_data.end_date)
-    
-    # 2. Ensamblar el objeto del reporte
-    report_data = schemas.SustainabilityReport(
-        company_name=request_data.company_name,
-        reporting_period=request_data.reporting_period,
-        policy=policy_data,
-        significant_aspects=aspects_data,
-        ghg_inventory=ghg_data
+    job_id = await job_queue.submit(request_data, format)
+    return ReportJobCreated(job_id=job_id, status=schemas.ReportJobStatus.QUEUED)
+
+@router.get("/reports/jobs/{job_id}", response_model=ReportJob, tags=["Generación de Reportes"])
+def read_report_job(job_id: str):
+    """Estado, progreso y (cuando termina) resultado de un trabajo de reporte."""
+    job = job_queue.store.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Trabajo de reporte no encontrado o caducado")
+    return job
+
+@router.post("/reports/sustainability/stream", tags=["Generación de Reportes"])
+async def stream_sustainability_report(request_data: ReportRequest):
+    """
+    Variante en streaming: devuelve el Markdown por bloques a medida que se renderiza,
+    consumiendo los aspectos y objetivos página a página. El uso de memoria no crece
+    con el tamaño del reporte.
+    """
+    return StreamingResponse(
+        streaming.render_report_stream(
+            request_data.company_name, request_data.reporting_period,
+            request_data.start_date, request_data.end_date
+        ),
+        media_type="text/markdown; charset=utf-8",
     )
-    
-    # 3. Renderizar la plantilla con los datos
-    template = env.get_template("report.md.j2")
-    report_markdown = template.render(report=report_data)
-    
-    return JSONResponse(content={"report_markdown": report_markdown})
\ No newline at end of file
+
+@router.get("/metrics/report-cache", tags=["Métricas"])
+def read_report_cache_metrics():
+    """Aciertos, fallos, desalojos y peticiones sin caché de los reportes renderizados."""
+    return report_cache.stats()
+
+@router.get("/metrics/report-jobs", tags=["Métricas"])
+def read_report_job_metrics():
+    """Trabajadores, profundidad de la cola y trabajos por estado."""
+    return job_queue.metrics()
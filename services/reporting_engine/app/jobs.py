@@ -0,0 +1,206 @@
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import reports
+from .schemas import ReportFormat, ReportJob, ReportJobStatus, ReportRequest
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, tz=timezone.utc)
+
+class JobStore:
+    """
+    Estado y resultado de los trabajos de reportes en SQLite local. Cada trabajo
+    caduca `ttl` segundos después de su última actualización y se borra en la
+    siguiente limpieza.
+
+    Varios procesos (workers de uvicorn) pueden compartir el archivo: cada trabajo
+    guarda el proceso que lo ejecuta (`owner`, único por arranque) y cada proceso
+    renueva su latido en report_job_owners. Solo se dan por perdidos los trabajos
+    de procesos sin latido reciente.
+    """
+    def __init__(self, path: str, ttl: float = 3600):
+        self.ttl = ttl
+        self.owner = f"{os.getpid()}-{uuid.uuid4().hex[:12]}"
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS report_jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, stage TEXT, progress REAL NOT NULL, "
+            "format TEXT NOT NULL, request TEXT NOT NULL, result TEXT, error TEXT, "
+            "created_at REAL NOT NULL, updated_at REAL NOT NULL, expires_at REAL NOT NULL)"
+        )
+        # Archivos creados antes de que los trabajos tuvieran dueño
+        if "owner" not in {row[1] for row in self._db.execute("PRAGMA table_info(report_jobs)")}:
+            self._db.execute("ALTER TABLE report_jobs ADD COLUMN owner TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_report_jobs_expires_at ON report_jobs (expires_at)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS report_job_owners (owner TEXT PRIMARY KEY, heartbeat REAL NOT NULL)"
+        )
+        self._db.commit()
+
+    def create(self, request_data: ReportRequest, report_format: ReportFormat) -> str:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO report_jobs (id, status, stage, progress, format, request, owner, created_at, updated_at, expires_at) "
+                "VALUES (?, ?, NULL, 0, ?, ?, ?, ?, ?, ?)",
+                (job_id, ReportJobStatus.QUEUED.value, report_format.value, request_data.model_dump_json(),
+                 self.owner, now, now, now + self.ttl),
+            )
+            self._db.commit()
+        return job_id
+
+    def update(self, job_id: str, status: Optional[ReportJobStatus] = None, stage: Optional[str] = None,
+               progress: Optional[float] = None, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE report_jobs SET status = COALESCE(?, status), stage = COALESCE(?, stage), "
+                "progress = COALESCE(?, progress), result = COALESCE(?, result), error = COALESCE(?, error), "
+                "updated_at = ?, expires_at = ? WHERE id = ?",
+                (status.value if status else None, stage, progress, result, error, now, now + self.ttl, job_id),
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[ReportJob]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, status, stage, progress, format, request, result, error, created_at, updated_at, expires_at "
+                "FROM report_jobs WHERE id = ? AND expires_at > ?",
+                (job_id, time.time()),
+            ).fetchone()
+        if row is None:
+            return None
+        return ReportJob(
+            job_id=row[0], status=ReportJobStatus(row[1]), stage=row[2], progress=row[3],
+            format=ReportFormat(row[4]), request=ReportRequest.model_validate_json(row[5]),
+            result=row[6], error=row[7], created_at=_to_datetime(row[8]),
+            updated_at=_to_datetime(row[9]), expires_at=_to_datetime(row[10]),
+        )
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM report_jobs WHERE expires_at <= ?", (time.time(),)).rowcount
+            self._db.commit()
+        return deleted
+
+    def heartbeat(self) -> None:
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO report_job_owners (owner, heartbeat) VALUES (?, ?)",
+                             (self.owner, time.time()))
+            self._db.commit()
+
+    def fail_orphaned(self, reason: str, stale_after: float) -> int:
+        """
+        Los trabajos pendientes de procesos sin latido en `stale_after` segundos (que
+        se reiniciaron o murieron) ya no avanzarán. Los de otros procesos vivos no se tocan.
+        """
+        alive_since = time.time() - stale_after
+        with self._lock:
+            changed = self._db.execute(
+                "UPDATE report_jobs SET status = ?, error = ?, updated_at = ? WHERE status IN (?, ?) "
+                "AND (owner IS NULL OR owner NOT IN (SELECT owner FROM report_job_owners WHERE heartbeat > ?))",
+                (ReportJobStatus.FAILED.value, reason, time.time(),
+                 ReportJobStatus.QUEUED.value, ReportJobStatus.RUNNING.value, alive_since),
+            ).rowcount
+            self._db.execute("DELETE FROM report_job_owners WHERE heartbeat <= ?", (alive_since,))
+            self._db.commit()
+        return changed
+
+    def count_by_status(self) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM report_jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+class ReportJobQueue:
+    """
+    Cola de trabajos de reportes con `workers` tareas en paralelo. La recolección es
+    asíncrona y el renderizado corre en el pool de hilos, así que los trabajos no
+    bloquean a los endpoints de la API.
+    """
+    def __init__(self, store: JobStore, workers: int = 2, cleanup_interval: float = 60):
+        self.store = store
+        self.workers = workers
+        self.cleanup_interval = cleanup_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        await run_in_threadpool(self._check_owners)
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._cleanup()))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request_data: ReportRequest, report_format: ReportFormat) -> str:
+        # asyncio.Queue no es seguro entre hilos: se encola desde el bucle de eventos
+        job_id = await run_in_threadpool(self.store.create, request_data, report_format)
+        self._queue.put_nowait((job_id, request_data, report_format))
+        return job_id
+
+    async def _run(self) -> None:
+        # Las escrituras en SQLite van al pool de hilos: no frenan al bucle de eventos
+        update = self.store.update
+        while True:
+            job_id, request_data, report_format = await self._queue.get()
+            try:
+                await run_in_threadpool(update, job_id, status=ReportJobStatus.RUNNING, stage="iniciando", progress=0.0)
+
+                async def progress(stage: str, fraction: float) -> None:
+                    await run_in_threadpool(update, job_id, stage=stage, progress=fraction)
+
+                rendered, _ = await reports.generate_report(request_data, report_format, progress=progress)
+                await run_in_threadpool(update, job_id, status=ReportJobStatus.COMPLETED, stage="terminado",
+                                        progress=1.0, result=rendered)
+            except Exception as e:
+                print(f"Error al generar el reporte del trabajo {job_id}: {e!r}")
+                await run_in_threadpool(update, job_id, status=ReportJobStatus.FAILED, error=str(e) or repr(e))
+            finally:
+                self._queue.task_done()
+
+    def _check_owners(self) -> None:
+        # Un proceso se da por caído tras tres limpiezas sin latido
+        self.store.heartbeat()
+        self.store.fail_orphaned("Trabajo interrumpido por un reinicio del servicio",
+                                 stale_after=3 * self.cleanup_interval)
+
+    async def _cleanup(self) -> None:
+        while True:
+            await run_in_threadpool(self._check_owners)
+            await run_in_threadpool(self.store.purge_expired)
+            await asyncio.sleep(self.cleanup_interval)
+
+    def metrics(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "jobs_by_status": self.store.count_by_status(),
+        }
+
+def create_job_queue() -> ReportJobQueue:
+    store = JobStore(
+        os.getenv("REPORT_JOBS_DB_PATH", "/tmp/reporting_jobs.sqlite3"),
+        ttl=float(os.getenv("REPORT_JOB_TTL", "3600")),
+    )
+    return ReportJobQueue(
+        store,
+        workers=int(os.getenv("REPORT_JOB_WORKERS", "2")),
+        cleanup_interval=float(os.getenv("REPORT_JOB_CLEANUP_INTERVAL", "60")),
+    )
+
+job_queue = create_job_queue()
@@ -0,0 +1,108 @@
+import csv
+import io
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from .schemas import ReportFormat, SustainabilityReport
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+# Directorio del bytecode compilado de las plantillas: sobrevive a reinicios y evita
+# volver a compilar el código Python de cada plantilla en cada arranque
+BYTECODE_CACHE_DIR = os.getenv("REPORT_TEMPLATE_CACHE_DIR", "/tmp/reporting_templates")
+
+def create_environment(enable_async: bool = False) -> Environment:
+    """
+    Entorno Jinja2 con caché de bytecode en disco. Las plantillas asíncronas se
+    compilan a un código distinto, así que guardan su bytecode en otro subdirectorio.
+    """
+    cache_dir = Path(BYTECODE_CACHE_DIR) / ("async" if enable_async else "sync")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        bytecode_cache=FileSystemBytecodeCache(str(cache_dir)),
+        autoescape=select_autoescape(enabled_extensions=("html.j2",), default_for_string=False),
+        enable_async=enable_async,
+        auto_reload=False,
+    )
+
+class Renderer(ABC):
+    """Convierte un SustainabilityReport ya recolectado en un formato de salida."""
+    media_type = "text/plain; charset=utf-8"
+
+    def precompile(self) -> None:
+        """Prepara lo que se pueda antes de la primera petición (por defecto, nada)."""
+
+    @abstractmethod
+    def render(self, report: SustainabilityReport) -> str:
+        """Devuelve el reporte serializado en el formato del renderer."""
+
+class TemplateRenderer(Renderer):
+    def __init__(self, env: Environment, template_name: str, media_type: str):
+        self.env = env
+        self.template_name = template_name
+        self.media_type = media_type
+
+    def precompile(self) -> None:
+        # Carga (y compila o lee del bytecode) la plantilla; queda en la caché del entorno
+        self.env.get_template(self.template_name)
+
+    def render(self, report: SustainabilityReport) -> str:
+        return self.env.get_template(self.template_name).render(report=report)
+
+class CsvRenderer(Renderer):
+    """
+    CSV plano (una fila por dato) con las mismas secciones que el reporte Markdown,
+    para importarlo en hojas de cálculo.
+    """
+    media_type = "text/csv; charset=utf-8"
+    header = ["seccion", "id", "nombre", "categoria", "valor", "detalle"]
+
+    def render(self, report: SustainabilityReport) -> str:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(self.header)
+        writer.writerow(["reporte", "", report.company_name, "", report.reporting_period, ""])
+        if report.policy:
+            writer.writerow(["politica", report.policy.id, report.policy.version, "", report.policy.approved_by, report.policy.content])
+        if report.ghg_inventory:
+            writer.writerow(["gei", "", "Total", "", report.ghg_inventory.total_co2e, "kg CO2e"])
+            for scope, value in report.ghg_inventory.emissions_by_scope.items():
+                writer.writerow(["gei", "", scope, "", value, "kg CO2e"])
+        writer.writerows(
+            ["aspecto", aspect.id, aspect.name, aspect.aspect_type.value, "", aspect.description]
+            for aspect in report.significant_aspects
+        )
+        writer.writerows(
+            ["riesgo", risk.id, "", risk.category.value, risk.risk_level, risk.description]
+            for risk in report.top_risks
+        )
+        for objective in report.objectives_summary:
+            writer.writerow(["objetivo", objective.id, objective.description, "", objective.target_value,
+                             f"{objective.start_date} a {objective.end_date}"])
+            writer.writerows(
+                ["indicador", indicator.id, indicator.name, "", indicator.current_value, indicator.unit]
+                for indicator in objective.indicators
+            )
+        for source in report.unavailable_sources:
+            writer.writerow(["no_disponible", "", source, "", "", ""])
+        return buffer.getvalue()
+
+env = create_environment()
+
+RENDERERS: Dict[ReportFormat, Renderer] = {
+    ReportFormat.MARKDOWN: TemplateRenderer(env, "report.md.j2", "text/markdown; charset=utf-8"),
+    ReportFormat.HTML: TemplateRenderer(env, "report.html.j2", "text/html; charset=utf-8"),
+    ReportFormat.CSV: CsvRenderer(),
+}
+
+def precompile_templates() -> None:
+    """Compila todas las plantillas al arrancar para que la primera petición no pague la compilación."""
+    for renderer in RENDERERS.values():
+        renderer.precompile()
+
+def render(report: SustainabilityReport, report_format: ReportFormat = ReportFormat.MARKDOWN) -> str:
+    return RENDERERS[report_format].render(report)
@@ -0,0 +1,60 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+class ReportCache:
+    """
+    Caché LRU de reportes renderizados. La clave incluye los parámetros de la
+    petición y las versiones (ETag) de los servicios de origen, de modo que un
+    cambio en los datos produce una clave nueva y las entradas viejas simplemente
+    dejan de usarse hasta que el LRU las desaloja.
+    """
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bypassed = 0
+
+    def get(self, key: Hashable) -> Optional[str]:
+        with self._lock:
+            report = self._entries.get(key)
+            if report is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return report
+
+    def put(self, key: Hashable, report: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = report
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def record_bypass(self) -> None:
+        """Peticiones que no usaron la caché (p. ej. sin versión de algún servicio)."""
+        with self._lock:
+            self.bypassed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "bypassed": self.bypassed,
+                "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+            }
+
+report_cache = ReportCache(max_entries=int(os.getenv("REPORT_CACHE_SIZE", "128")))
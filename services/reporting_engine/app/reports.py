@@ -0,0 +1,59 @@
+from typing import Awaitable, Callable, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from . import renderers, services, schemas
+from .report_cache import report_cache
+from .schemas import ReportFormat, ReportRequest
+
+# progress(etapa, fracción entre 0 y 1); es asíncrono para que quien lo guarda
+# (los trabajos en segundo plano) no escriba desde el bucle de eventos
+ProgressCallback = Callable[[str, float], Awaitable[None]]
+
+async def generate_report(request_data: ReportRequest, report_format: ReportFormat,
+                          progress: Optional[ProgressCallback] = None) -> Tuple[str, str]:
+    """
+    Recolecta, ensambla y renderiza un reporte. Devuelve (contenido, estado de caché),
+    con estado 'hit' o 'miss'. Lo usan tanto el endpoint síncrono como los trabajos
+    en segundo plano.
+    """
+    async def report_progress(stage: str, fraction: float) -> None:
+        if progress is not None:
+            await progress(stage, fraction)
+
+    # 0. Validar la caché con las versiones de los servicios de origen
+    await report_progress("validando caché", 0.05)
+    versions = await services.get_upstream_versions()
+    cache_key = None
+    if versions is None:
+        report_cache.record_bypass()
+    else:
+        cache_key = (
+            request_data.company_name, request_data.reporting_period,
+            request_data.start_date, request_data.end_date, report_format, versions
+        )
+        cached_report = report_cache.get(cache_key)
+        if cached_report is not None:
+            return cached_report, "hit"
+
+    # 1. Recolectar datos de todos los servicios (en paralelo)
+    await report_progress("recolectando datos", 0.1)
+    collected = await services.collect_report_data(request_data.start_date, request_data.end_date)
+    
+    # 2. Ensamblar el objeto del reporte
+    await report_progress("ensamblando", 0.6)
+    report_data = schemas.SustainabilityReport(
+        company_name=request_data.company_name,
+        reporting_period=request_data.reporting_period,
+        **collected
+    )
+    
+    # 3. Renderizar en el formato pedido (plantillas precompiladas al arrancar), fuera
+    # del bucle de eventos para no frenar otras peticiones con reportes grandes
+    await report_progress("renderizando", 0.7)
+    rendered = await run_in_threadpool(renderers.render, report_data, report_format)
+
+    # Los reportes incompletos no se guardan: la próxima petición reintenta los servicios
+    if cache_key is not None and not report_data.unavailable_sources:
+        report_cache.put(cache_key, rendered)
+    return rendered, "miss"
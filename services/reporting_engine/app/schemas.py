@@ -1,3 +1,5 @@
+from datetime import date, datetime
+from enum import Enum
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 # Importamos los modelos que vamos a recibir de los otros servicios
@@ -6,6 +8,41 @@ from shared_models.models.environmental_entities import (
     ComplianceObligation, Objective
 )
 
+class ReportFormat(str, Enum):
+    MARKDOWN = "markdown"
+    HTML = "html"
+    CSV = "csv"
+
+class ReportRequest(BaseModel):
+    company_name: str
+    reporting_period: str
+    start_date: date
+    end_date: date
+
+class ReportJobStatus(str, Enum):
+    QUEUED = "En cola"
+    RUNNING = "En proceso"
+    COMPLETED = "Completado"
+    FAILED = "Fallido"
+
+class ReportJobCreated(BaseModel):
+    job_id: str
+    status: ReportJobStatus
+
+class ReportJob(BaseModel):
+    job_id: str
+    status: ReportJobStatus
+    stage: Optional[str] = None
+    progress: float = 0.0
+    format: ReportFormat
+    request: ReportRequest
+    created_at: datetime
+    updated_at: datetime
+    expires_at: datetime
+    error: Optional[str] = None
+    # Solo presente cuando el trabajo terminó
+    result: Optional[str] = None
+
 class GHGInventory(BaseModel):
     total_co2e: float
     emissions_by_scope: Dict[str, float]
@@ -17,4 +54,6 @@ class SustainabilityReport(BaseModel):
     significant_aspects: List[EnvironmentalAspect] = []
     top_risks: List[Risk] = []
     objectives_summary: List[Objective] = []
-    ghg_inventory: Optional[GHGInventory] = None
\ No newline at end of file
+    ghg_inventory: Optional[GHGInventory] = None
+    # Servicios que no respondieron a tiempo; sus secciones se muestran vacías
+    unavailable_sources: List[str] = []
\ No newline at end of file
@@ -1,6 +1,9 @@
-import requests
+import asyncio
+import os
 from datetime import date
-from typing import List, Optional, Dict
+from typing import Any, AsyncIterator, List, Optional, Dict
+
+import httpx
 
 # URLs base de nuestros microservicios. Usamos los nombres de servicio de Docker.
 URL_CORE_SGA = "http://core-sga-api:8000/api/v1"
@@ -8,41 +11,155 @@ URL_RISK_ENGINE = "http://risk-engine-api:8002/api/v1"
 URL_OBJECTIVES_ENGINE = "http://objectives-engine-api:8004/api/v1"
 URL_GHG_ENGINE = "http://ghg-engine-api:8005/api/v1"
 
-def get_policy() -> Optional[dict]:
-    """Obtiene la política ambiental del Servicio Core."""
-    try:
-        response = requests.get(f"{URL_CORE_SGA}/policy", timeout=5)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error al contactar el Servicio Core para la política: {e}")
-        return None
+# Tiempo máximo por llamada (segundos); el inventario de GEI tiene más margen
+UPSTREAM_TIMEOUT = float(os.getenv("REPORT_UPSTREAM_TIMEOUT", "5"))
+GHG_TIMEOUT = float(os.getenv("REPORT_GHG_TIMEOUT", "10"))
+# Conexiones keep-alive compartidas por todas las peticiones de reportes
+MAX_CONNECTIONS = int(os.getenv("REPORT_HTTP_MAX_CONNECTIONS", "20"))
+TOP_RISKS_LIMIT = int(os.getenv("REPORT_TOP_RISKS", "5"))
+ASPECTS_PAGE_SIZE = int(os.getenv("REPORT_ASPECTS_PAGE_SIZE", "200"))
+OBJECTIVES_PAGE_SIZE = int(os.getenv("REPORT_OBJECTIVES_PAGE_SIZE", "100"))
+
+_client: Optional[httpx.AsyncClient] = None
 
-def get_significant_aspects() -> List[dict]:
-    """Obtiene todos los aspectos y los filtra por significancia."""
+async def open_client() -> httpx.AsyncClient:
+    """Crea el cliente HTTP compartido (se llama al arrancar la aplicación)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=UPSTREAM_TIMEOUT,
+            limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        )
+    return _client
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+async def _get(name: str, url: str, params: Optional[dict] = None, timeout: float = UPSTREAM_TIMEOUT,
+               allow_not_found: bool = False) -> Optional[httpx.Response]:
+    """GET con timeout propio. Lanza la excepción para que el llamador decida el valor por defecto."""
+    client = await open_client()
     try:
-        response = requests.get(f"{URL_CORE_SGA}/aspects", params={"limit": 500}, timeout=5)
+        response = await asyncio.wait_for(client.get(url, params=params, timeout=timeout), timeout)
+        if allow_not_found and response.status_code == 404:
+            return None
         response.raise_for_status()
-        all_aspects = response.json()
-        # Filtramos en Python los que son significativos
-        return [aspect for aspect in all_aspects if aspect.get("is_significant")]
-    except requests.exceptions.RequestException as e:
-        print(f"Error al contactar el Servicio Core para los aspectos: {e}")
-        return []
-
-def get_ghg_inventory(start_date: date, end_date: date) -> Optional[dict]:
+        return response
+    except (httpx.HTTPError, asyncio.TimeoutError) as e:
+        print(f"Error al contactar {name}: {e!r}")
+        raise
+
+async def _get_json(name: str, url: str, params: Optional[dict] = None, timeout: float = UPSTREAM_TIMEOUT,
+                    allow_not_found: bool = False) -> Any:
+    response = await _get(name, url, params=params, timeout=timeout, allow_not_found=allow_not_found)
+    return response.json() if response is not None else None
+
+async def get_policy() -> Optional[dict]:
+    """Obtiene la política ambiental del Servicio Core."""
+    return await _get_json("el Servicio Core para la política", f"{URL_CORE_SGA}/policy", allow_not_found=True)
+
+async def iter_significant_aspects(page_size: int = ASPECTS_PAGE_SIZE) -> AsyncIterator[dict]:
+    """
+    Recorre los aspectos significativos página a página siguiendo el cursor del Servicio Core.
+    El reporte no usa los riesgos ni las obligaciones de cada aspecto: `expand=` vacío evita cargarlos.
+    """
+    params = {"is_significant": "true", "limit": page_size, "expand": ""}
+    while True:
+        response = await _get("el Servicio Core para los aspectos", f"{URL_CORE_SGA}/aspects", params=params)
+        for aspect in response.json():
+            yield aspect
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            return
+        params = {**params, "after_id": next_cursor}
+
+async def get_significant_aspects() -> List[dict]:
+    """Obtiene los aspectos significativos, filtrados en el Servicio Core y paginados por cursor."""
+    return [aspect async for aspect in iter_significant_aspects()]
+
+async def get_ghg_inventory(start_date: date, end_date: date) -> Optional[dict]:
     """Obtiene el inventario de GEI del Motor de Huella de Carbono."""
-    try:
-        response = requests.get(
-            f"{URL_GHG_ENGINE}/inventory/",
-            params={"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
-            timeout=10 # Damos más tiempo a este cálculo
+    return await _get_json(
+        "el Motor de GEI",
+        f"{URL_GHG_ENGINE}/inventory/",
+        params={"start_date": start_date.isoformat(), "end_date": end_date.isoformat()},
+        timeout=GHG_TIMEOUT,
+    )
+
+async def get_top_risks(limit: int = TOP_RISKS_LIMIT) -> List[dict]:
+    """
+    Obtiene los `limit` riesgos de mayor nivel. El Motor de Riesgos ordena todos los
+    riesgos en la base, así que el resultado no depende de cuántos haya.
+    """
+    return await _get_json(
+        "el Motor de Riesgos", f"{URL_RISK_ENGINE}/risks/", params={"order_by": "risk_level", "limit": limit}
+    )
+
+async def iter_objectives(page_size: int = OBJECTIVES_PAGE_SIZE) -> AsyncIterator[dict]:
+    """Recorre los objetivos ambientales por páginas (el Motor de Objetivos solo admite skip/limit)."""
+    skip = 0
+    while True:
+        page = await _get_json(
+            "el Motor de Objetivos", f"{URL_OBJECTIVES_ENGINE}/objectives/", params={"skip": skip, "limit": page_size}
         )
+        for objective in page:
+            yield objective
+        if len(page) < page_size:
+            return
+        skip += page_size
+
+async def get_objectives() -> List[dict]:
+    """Obtiene los objetivos ambientales y sus indicadores."""
+    return [objective async for objective in iter_objectives()]
+
+# Último ETag conocido de cada servicio; se envía en If-None-Match para que la
+# validación sea una respuesta 304 sin cuerpo cuando nada ha cambiado
+_known_etags: Dict[str, str] = {}
+VERSION_URLS = {"core_sga": f"{URL_CORE_SGA}/version", "ghg_engine": f"{URL_GHG_ENGINE}/version"}
+
+async def _get_version(service: str, url: str) -> str:
+    client = await open_client()
+    headers = {"If-None-Match": _known_etags[service]} if service in _known_etags else {}
+    response = await asyncio.wait_for(client.get(url, headers=headers, timeout=UPSTREAM_TIMEOUT), UPSTREAM_TIMEOUT)
+    if response.status_code != 304:
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        print(f"Error al contactar el Motor de GEI: {e}")
-        return None
+        _known_etags[service] = response.headers["ETag"]
+    return _known_etags[service]
+
+async def get_upstream_versions() -> Optional[tuple]:
+    """Versiones actuales de los servicios de origen, o None si alguna no se pudo validar."""
+    results = await asyncio.gather(
+        *(_get_version(service, url) for service, url in VERSION_URLS.items()), return_exceptions=True
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            print(f"No se pudo validar la versión de los datos de origen: {result!r}")
+            return None
+    return tuple(results)
+
+async def collect_report_data(start_date: date, end_date: date) -> Dict[str, Any]:
+    """
+    Consulta todos los servicios a la vez: la latencia total queda acotada por el
+    servicio más lento. Si alguno falla, su sección queda vacía y su nombre se
+    añade a 'unavailable_sources' en lugar de abortar el reporte.
+    """
+    calls = {
+        "policy": (get_policy(), None),
+        "significant_aspects": (get_significant_aspects(), []),
+        "ghg_inventory": (get_ghg_inventory(start_date, end_date), None),
+        "top_risks": (get_top_risks(), []),
+        "objectives_summary": (get_objectives(), []),
+    }
+    results = await asyncio.gather(*(call for call, _ in calls.values()), return_exceptions=True)
 
-# Podríamos añadir funciones similares para get_top_risks, get_objectives, etc.
-# Por simplicidad, nos centraremos en estos para el reporte inicial.
\ No newline at end of file
+    data: Dict[str, Any] = {"unavailable_sources": []}
+    for (section, (_, default)), result in zip(calls.items(), results):
+        if isinstance(result, Exception):
+            data[section] = default
+            data["unavailable_sources"].append(section)
+        else:
+            data[section] = result
+    return data
@@ -0,0 +1,80 @@
+import asyncio
+import os
+from datetime import date
+from types import SimpleNamespace
+from typing import AsyncIterator, List, Type
+
+import httpx
+from pydantic import BaseModel
+
+from . import renderers, services, schemas
+
+# Tamaño mínimo (caracteres) de cada bloque enviado al cliente: Jinja produce
+# fragmentos muy pequeños y agruparlos evita miles de escrituras diminutas
+STREAM_CHUNK_SIZE = int(os.getenv("REPORT_STREAM_CHUNK_SIZE", "8192"))
+
+# Entorno asíncrono: los bucles {% for %} de la plantilla consumen iteradores asíncronos
+async_env = renderers.create_environment(enable_async=True)
+
+async def _validated(section: str, items: AsyncIterator[dict], model: Type[BaseModel],
+                     unavailable: List[str]) -> AsyncIterator[BaseModel]:
+    """
+    Valida cada elemento a medida que llega. Si el servicio falla a mitad de camino,
+    la sección queda truncada y se anota en 'unavailable' (la nota va al final del reporte).
+    """
+    try:
+        async for item in items:
+            yield model.model_validate(item)
+    except (httpx.HTTPError, asyncio.TimeoutError):
+        unavailable.append(section)
+
+async def build_streaming_context(company_name: str, reporting_period: str,
+                                  start_date: date, end_date: date) -> SimpleNamespace:
+    """
+    Las secciones pequeñas (política, inventario, riesgos principales) se piden en
+    paralelo antes de empezar; las listas grandes se entregan como iteradores que
+    se consumen página a página mientras se renderiza.
+    """
+    unavailable: List[str] = []
+    policy, ghg_inventory, top_risks = await asyncio.gather(
+        services.get_policy(),
+        services.get_ghg_inventory(start_date, end_date),
+        services.get_top_risks(),
+        return_exceptions=True,
+    )
+    sections = {"policy": policy, "ghg_inventory": ghg_inventory, "top_risks": top_risks}
+    for section, result in sections.items():
+        if isinstance(result, Exception):
+            unavailable.append(section)
+            sections[section] = [] if section == "top_risks" else None
+
+    return SimpleNamespace(
+        company_name=company_name,
+        reporting_period=reporting_period,
+        policy=schemas.EnvironmentalPolicy.model_validate(sections["policy"]) if sections["policy"] else None,
+        ghg_inventory=schemas.GHGInventory.model_validate(sections["ghg_inventory"]) if sections["ghg_inventory"] else None,
+        top_risks=[schemas.Risk.model_validate(risk) for risk in sections["top_risks"]],
+        significant_aspects=_validated(
+            "significant_aspects", services.iter_significant_aspects(), schemas.EnvironmentalAspect, unavailable
+        ),
+        objectives_summary=_validated(
+            "objectives_summary", services.iter_objectives(), schemas.Objective, unavailable
+        ),
+        unavailable_sources=unavailable,
+    )
+
+async def render_report_stream(company_name: str, reporting_period: str,
+                               start_date: date, end_date: date) -> AsyncIterator[str]:
+    """Renderiza 'report.md.j2' de forma incremental, agrupando la salida en bloques."""
+    report = await build_streaming_context(company_name, reporting_period, start_date, end_date)
+    template = async_env.get_template("report.md.j2")
+    buffer: List[str] = []
+    size = 0
+    async for fragment in template.generate_async(report=report):
+        buffer.append(fragment)
+        size += len(fragment)
+        if size >= STREAM_CHUNK_SIZE:
+            yield "".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer)
@@ -0,0 +1,116 @@
+"""
+Mide el rendimiento de los renderizadores de reportes (Markdown, HTML y CSV) sobre
+reportes sintéticos grandes, y el coste de cargar las plantillas con y sin la caché
+de bytecode.
+
+Uso (desde services/reporting_engine, con shared_models en el PYTHONPATH):
+    python -m benchmarks.benchmark_renderers [--aspects 5000] [--risks 500] [--objectives 500] [--repeat 5]
+"""
+import argparse
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+
+from app import renderers
+from app.schemas import ReportFormat, SustainabilityReport
+
+def synthetic_report(n_aspects, n_risks, n_objectives):
+    now = datetime(2024, 1, 1)
+    return SustainabilityReport.model_validate({
+        "company_name": "Empresa Sintética S.A.",
+        "reporting_period": "2024",
+        "policy": {
+            "id": 1, "version": "3.0", "content": "Compromiso con la mejora continua. " * 20,
+            "approval_date": now, "approved_by": "Dirección General",
+            "includes_climate_commitment": True, "includes_circular_economy_commitment": True,
+            "includes_biodiversity_commitment": True, "created_at": now,
+        },
+        "ghg_inventory": {
+            "total_co2e": 123456.78,
+            "emissions_by_scope": {"Alcance 1": 60000.0, "Alcance 2": 40000.0, "Alcance 3": 23456.78},
+        },
+        "significant_aspects": [
+            {
+                "id": i, "name": f"Aspecto {i}", "description": f"Descripción del aspecto ambiental número {i}",
+                "lifecycle_stage": "Fabricación", "aspect_type": "Emisión", "is_significant": True,
+                "created_at": now, "obligations": [], "risks": [],
+            }
+            for i in range(n_aspects)
+        ],
+        "top_risks": [
+            {
+                "id": i, "description": f"Riesgo {i}", "category": "Operacional", "probability": 3,
+                "impact": 4, "risk_level": 12, "created_at": now,
+            }
+            for i in range(n_risks)
+        ],
+        "objectives_summary": [synthetic_objective(i) for i in range(n_objectives)],
+    })
+
+def synthetic_objective(i):
+    objective = {
+        "id": i, "description": f"Objetivo {i}", "target_value": 10.0,
+        "start_date": date(2024, 1, 1), "end_date": date(2024, 12, 31),
+    }
+    indicators = [
+        {"id": i * 3 + j, "name": f"Indicador {j}", "current_value": 5.0, "unit": "%", "objective": objective}
+        for j in range(3)
+    ]
+    return {**objective, "indicators": indicators}
+
+def bench_format(report, report_format, repeat):
+    renderers.render(report, report_format)  # calentamiento
+    times, size = [], 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        output = renderers.render(report, report_format)
+        times.append(time.perf_counter() - t0)
+        size = len(output.encode("utf-8"))
+    median = statistics.median(times)
+    return {
+        "format": report_format.value,
+        "median_ms": median * 1000,
+        "reports_per_s": 1 / median,
+        "mb_per_s": size / median / 1e6,
+        "size_kb": size / 1024,
+    }
+
+def bench_template_load(cache_dir):
+    """Tiempo de cargar todas las plantillas con un entorno nuevo: en frío (compilando) y desde bytecode."""
+    renderers.BYTECODE_CACHE_DIR = cache_dir
+    results = {}
+    for label in ("compilacion", "bytecode"):
+        env = renderers.create_environment()
+        t0 = time.perf_counter()
+        for renderer in renderers.RENDERERS.values():
+            if isinstance(renderer, renderers.TemplateRenderer):
+                env.get_template(renderer.template_name)
+        results[label] = (time.perf_counter() - t0) * 1000
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--aspects", type=int, default=5000)
+    parser.add_argument("--risks", type=int, default=500)
+    parser.add_argument("--objectives", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    report = synthetic_report(args.aspects, args.risks, args.objectives)
+    print(f"Reporte sintético: {args.aspects} aspectos, {args.risks} riesgos, {args.objectives} objetivos\n")
+    print(f"{'formato':<10}{'mediana ms':>12}{'reportes/s':>12}{'MB/s':>10}{'tamaño KB':>12}")
+    for report_format in ReportFormat:
+        r = bench_format(report, report_format, args.repeat)
+        print(f"{r['format']:<10}{r['median_ms']:>12.1f}{r['reports_per_s']:>12.2f}{r['mb_per_s']:>10.1f}{r['size_kb']:>12.0f}")
+
+    cache_dir = tempfile.mkdtemp(prefix="reporting_bench_")
+    try:
+        load = bench_template_load(cache_dir)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    print(f"\nCarga de plantillas: compilando {load['compilacion']:.1f} ms, desde bytecode {load['bytecode']:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,29 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import renderers, services, streaming
+from app.jobs import job_queue
 from app.api import router as api_router
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pool de conexiones HTTP compartido hacia el resto de microservicios
+    await services.open_client()
+    # Compila las plantillas (o carga su bytecode) antes de atender peticiones
+    renderers.precompile_templates()
+    streaming.async_env.get_template("report.md.j2")
+    # Trabajadores de los trabajos de reportes en segundo plano
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await services.close_client()
+
 app = FastAPI(
     title="Motor de Reportes del SGA - ISO 14001:2026",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = ["http://localhost:5173", "http://localhost:5174"]
@@ -1,18 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional
 
 from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
 from . import crud
-from .db import get_db
+from .db import engine, get_db
 
 router = APIRouter()
 
 # --- NUEVO ENDPOINT ---
 @router.get("/risks/", response_model=List[schemas.Risk], tags=["Riesgos y Oportunidades"])
-def read_risks(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def read_risks(
+    skip: int = 0,
+    limit: int = 100,
+    order_by: Optional[Literal["risk_level"]] = Query(None, description="risk_level: de mayor a menor nivel de riesgo"),
+    db: Session = Depends(get_db),
+):
     """Lee una lista de todos los riesgos en el sistema."""
-    risks = crud.get_risks(db, skip=skip, limit=limit)
+    risks = crud.get_risks(db, skip=skip, limit=limit, order_by=order_by)
     return risks
 
 @router.post("/aspects/{aspect_id}/risks/", response_model=schemas.Risk, tags=["Riesgos y Oportunidades"])
@@ -23,4 +29,9 @@ def create_risk_for_aspect(aspect_id: int, risk: schemas.RiskCreate, db: Session
 @router.get("/aspects/{aspect_id}/risks/", response_model=List[schemas.Risk], tags=["Riesgos y Oportunidades"])
 def read_risks_for_aspect(aspect_id: int, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     risks = crud.get_risks_by_aspect(db, aspect_id=aspect_id, skip=skip, limit=limit)
-    return risks
\ No newline at end of file
+    return risks
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones a la base de datos y tiempos de espera de checkout."""
+    return pool_metrics(engine)
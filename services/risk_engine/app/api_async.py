@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal, Optional
+
+from shared_models.models import environmental_entities as schemas
+from shared_models.models.database import pool_metrics
+from . import crud_async
+from .db import async_engine, get_async_db
+
+# Mismos endpoints que api.py, con AsyncSession (se usa cuando DB_ASYNC=true)
+router = APIRouter()
+
+@router.get("/risks/", response_model=List[schemas.Risk], tags=["Riesgos y Oportunidades"])
+async def read_risks(
+    skip: int = 0,
+    limit: int = 100,
+    order_by: Optional[Literal["risk_level"]] = Query(None, description="risk_level: de mayor a menor nivel de riesgo"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Lee una lista de todos los riesgos en el sistema."""
+    return await crud_async.get_risks(db, skip=skip, limit=limit, order_by=order_by)
+
+@router.post("/aspects/{aspect_id}/risks/", response_model=schemas.Risk, tags=["Riesgos y Oportunidades"])
+async def create_risk_for_aspect(aspect_id: int, risk: schemas.RiskCreate, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.create_risk_for_aspect(db=db, risk=risk, aspect_id=aspect_id)
+
+@router.get("/aspects/{aspect_id}/risks/", response_model=List[schemas.Risk], tags=["Riesgos y Oportunidades"])
+async def read_risks_for_aspect(aspect_id: int, skip: int = 0, limit: int = 100, db: AsyncSession = Depends(get_async_db)):
+    return await crud_async.get_risks_by_aspect(db, aspect_id=aspect_id, skip=skip, limit=limit)
+
+@router.get("/metrics/db", tags=["Métricas"])
+def read_db_pool_metrics():
+    """Ocupación del pool de conexiones asíncrono y tiempos de espera de checkout."""
+    return pool_metrics(async_engine)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from sqlalchemy.orm import Session
 from . import models
 from shared_models.models import environmental_entities as schemas
@@ -5,16 +7,22 @@ from shared_models.models import environmental_entities as schemas
 def get_risk(db: Session, risk_id: int):
     return db.query(models.Risk).filter(models.Risk.id == risk_id).first()
 
+def risk_order(order_by: Optional[str] = None) -> list:
+    """Con `risk_level`, de mayor a menor nivel (probabilidad × impacto) y por id en los empates."""
+    if order_by == "risk_level":
+        return [(models.Risk.probability * models.Risk.impact).desc(), models.Risk.id]
+    return []
+
 # --- NUEVA FUNCIÓN ---
-def get_risks(db: Session, skip: int = 0, limit: int = 100):
+def get_risks(db: Session, skip: int = 0, limit: int = 100, order_by: Optional[str] = None):
     """Obtiene una lista de todos los riesgos."""
-    return db.query(models.Risk).offset(skip).limit(limit).all()
+    return db.query(models.Risk).order_by(*risk_order(order_by)).offset(skip).limit(limit).all()
 
 def get_risks_by_aspect(db: Session, aspect_id: int, skip: int = 0, limit: int = 100):
     return db.query(models.Risk).filter(models.Risk.aspect_id == aspect_id).offset(skip).limit(limit).all()
 
 def create_risk_for_aspect(db: Session, risk: schemas.RiskCreate, aspect_id: int):
-    db_risk = models.Risk(**risk.dict(), aspect_id=aspect_id)
+    db_risk = models.Risk(**risk.dict(exclude={"aspect_id"}), aspect_id=aspect_id)
     db.add(db_risk)
     db.commit()
     db.refresh(db_risk)
@@ -0,0 +1,30 @@
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .crud import risk_order
+from shared_models.models import environmental_entities as schemas
+
+# Versión asíncrona de crud.py (modo DB_ASYNC)
+
+async def get_risk(db: AsyncSession, risk_id: int):
+    return await db.get(models.Risk, risk_id)
+
+async def get_risks(db: AsyncSession, skip: int = 0, limit: int = 100, order_by: Optional[str] = None):
+    """Obtiene una lista de todos los riesgos."""
+    result = await db.execute(select(models.Risk).order_by(*risk_order(order_by)).offset(skip).limit(limit))
+    return result.scalars().all()
+
+async def get_risks_by_aspect(db: AsyncSession, aspect_id: int, skip: int = 0, limit: int = 100):
+    result = await db.execute(
+        select(models.Risk).where(models.Risk.aspect_id == aspect_id).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
+
+async def create_risk_for_aspect(db: AsyncSession, risk: schemas.RiskCreate, aspect_id: int):
+    db_risk = models.Risk(**risk.dict(exclude={"aspect_id"}), aspect_id=aspect_id)
+    db.add(db_risk)
+    await db.commit()
+    await db.refresh(db_risk)
+    return db_risk
@@ -12,7 +12,7 @@ class Risk(Base):
     category = Column(SQLAlchemyEnum(RiskCategory))
     probability = Column(Integer)
     impact = Column(Integer)
-    aspect_id = Column(Integer, ForeignKey("environmental_aspects.id"))
+    aspect_id = Column(Integer, ForeignKey("environmental_aspects.id"), index=True)
     
     # --- CAMBIO: AÑADIMOS LA LÓGICA DE AUTO-GENERACIÓN DE FECHAS ---
     created_at = Column(DateTime(timezone=True), server_default=func.now())
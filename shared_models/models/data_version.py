@@ -0,0 +1,74 @@
+"""
+Versión de los datos por tabla, para los ETag de los endpoints /version.
+
+Cada INSERT, UPDATE o DELETE sobre una tabla seguida (también las cargas masivas y
+COPY que no pasan por el ORM) inserta, desde un trigger y en la misma transacción,
+una fila en `data_changes` (migraciones 0004 y 0005 de core_sga). Los escritores solo
+insertan, así que no se bloquean entre sí, y la fila se ve a la vez que los datos.
+
+La versión de una tabla es su contador en `data_versions` más sus filas pendientes
+en `data_changes`. Cuando el registro crece, la lectura lo acumula en el contador en
+una transacción que mantiene la suma, así que la versión no cambia al acumularlo.
+
+Variables de entorno:
+    DATA_CHANGES_COMPACT_THRESHOLD   filas pendientes a partir de las cuales se acumulan (10000)
+"""
+import hashlib
+import os
+from typing import Iterable, List
+
+from sqlalchemy import column, delete, func, select, table, update
+from sqlalchemy.orm import Session
+
+COMPACT_THRESHOLD = int(os.getenv("DATA_CHANGES_COMPACT_THRESHOLD", "10000"))
+
+data_versions = table("data_versions", column("table_name"), column("version"))
+data_changes = table("data_changes", column("id"), column("table_name"))
+
+def _pending(table_name_column):
+    return (
+        select(func.count())
+        .select_from(data_changes)
+        .where(data_changes.c.table_name == table_name_column)
+        .scalar_subquery()
+    )
+
+def compact_data_changes(db: Session, table_names: List[str]) -> None:
+    """
+    Acumula en data_versions las filas de data_changes de las tablas indicadas y las
+    borra, en una transacción propia de la sesión. Solo cuenta lo que realmente borra:
+    dos compactaciones a la vez no suman dos veces las mismas filas.
+    """
+    for name in table_names:
+        last_id = db.execute(
+            select(func.max(data_changes.c.id)).where(data_changes.c.table_name == name)
+        ).scalar()
+        if last_id is None:
+            continue
+        moved = db.execute(
+            delete(data_changes).where(data_changes.c.table_name == name, data_changes.c.id <= last_id)
+        ).rowcount
+        db.execute(
+            update(data_versions).where(data_versions.c.table_name == name)
+            .values(version=data_versions.c.version + moved)
+        )
+    db.commit()
+
+def read_data_version(db: Session, table_names: Iterable[str]) -> str:
+    """
+    Huella de las versiones de las tablas indicadas; cambia con cualquier escritura
+    confirmada en ellas. Si el registro pendiente supera COMPACT_THRESHOLD lo acumula
+    (y confirma la transacción de la sesión).
+    """
+    names = sorted(set(table_names))
+    pending = _pending(data_versions.c.table_name)
+    # Una sola sentencia: contador y registro se leen en la misma instantánea
+    rows = db.execute(
+        select(data_versions.c.table_name, data_versions.c.version + pending, pending)
+        .where(data_versions.c.table_name.in_(names))
+        .order_by(data_versions.c.table_name)
+    ).all()
+    if sum(row[2] for row in rows) > COMPACT_THRESHOLD:
+        compact_data_changes(db, names)
+    versions = [(name, version) for name, version, _ in rows]
+    return hashlib.sha1(repr(versions).encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,228 @@
+"""
+Fábrica compartida de motores SQLAlchemy para todos los microservicios.
+
+Todos los servicios apuntan a la misma base PostgreSQL, así que el tamaño de los
+pools se fija aquí de forma explícita (y configurable por variables de entorno)
+para que la suma de conexiones de todas las réplicas no supere `max_connections`.
+
+Variables de entorno (todas opcionales):
+    DB_POOL_SIZE              conexiones permanentes por proceso (5)
+    DB_MAX_OVERFLOW           conexiones extra en picos (5)
+    DB_POOL_TIMEOUT           segundos de espera por una conexión libre (30)
+    DB_POOL_RECYCLE           segundos antes de reciclar una conexión (1800)
+    DB_POOL_PRE_PING          comprobar la conexión antes de usarla (true)
+    DB_STATEMENT_TIMEOUT_MS   statement_timeout de PostgreSQL; 0 lo desactiva (0)
+    DB_PREPARE_THRESHOLD      usos tras los que psycopg 3 prepara la sentencia en el
+                              servidor; vacío deja el valor del driver (5) y 0 prepara
+                              desde el primer uso ("")
+    DB_ASYNC                  activa el modo asíncrono (asyncpg / aiosqlite) en los
+                              servicios CRUD (false)
+
+Los servicios usan psycopg 3 (URLs `postgresql+psycopg://`). DB_POOL_SIZE +
+DB_MAX_OVERFLOW es el presupuesto de conexiones de cada proceso: en modo asíncrono
+se reparte entre el motor síncrono y el asíncrono con `split_pool_budget`.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import TYPE_CHECKING, Deque, Optional, Tuple
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Driver asíncrono equivalente para cada backend soportado
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes")
+
+class PoolMetrics:
+    """Tiempo de espera al pedir una conexión al pool y nivel de ocupación."""
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._waits: Deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.max_wait_ms = 0.0
+        self.peak_checked_out = 0
+
+    def record_wait(self, seconds: float, checked_out: int, timed_out: bool = False) -> None:
+        wait_ms = seconds * 1000
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self._waits.append(wait_ms)
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self.peak_checked_out = max(self.peak_checked_out, checked_out)
+
+    @staticmethod
+    def _percentile(values, q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = list(self._waits)
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_wait_ms_p50": self._percentile(waits, 0.50),
+                "checkout_wait_ms_p99": self._percentile(waits, 0.99),
+                "checkout_wait_ms_max": self.max_wait_ms,
+                "peak_checked_out": self.peak_checked_out,
+            }
+
+class _CheckoutTimingMixin:
+    """
+    Mide cuánto espera cada checkout. Las métricas viven en un atributo de clase
+    porque SQLAlchemy recrea el pool (p. ej. tras `engine.dispose()`) instanciando
+    de nuevo la misma clase; ver `_pool_class_with_metrics`.
+    """
+    metrics: PoolMetrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_wait(time.perf_counter() - start, self.checkedout(), timed_out=True)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start, self.checkedout())
+        return connection
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+def _pool_class_with_metrics(base, metrics: PoolMetrics):
+    return type(base.__name__, (base,), {"metrics": metrics})
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+def _pool_kwargs(url: URL, base) -> dict:
+    # SQLite en memoria necesita su pool de una sola conexión; el resto usa el pool medido
+    if _is_memory_sqlite(url):
+        return {}
+    return {
+        "poolclass": _pool_class_with_metrics(base, PoolMetrics()),
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "5")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+
+def split_pool_budget(database_url: Optional[str], sync_share: float) -> Tuple[dict, dict]:
+    """
+    Reparte DB_POOL_SIZE y DB_MAX_OVERFLOW entre el motor síncrono (`sync_share`) y el
+    asíncrono (el resto), para que en modo asíncrono el proceso no abra el doble de
+    conexiones. Devuelve los overrides de pool de cada motor.
+    """
+    if _is_memory_sqlite(make_url(database_url or os.getenv("DATABASE_URL"))):
+        return {}, {}
+    pool_size = int(os.getenv("DB_POOL_SIZE", "5"))
+    max_overflow = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+    if pool_size < 2:
+        # pool_size=0 en SQLAlchemy significa "sin límite": cada motor necesita al menos una
+        raise ValueError("DB_POOL_SIZE debe ser al menos 2 en modo asíncrono (un motor síncrono y uno asíncrono).")
+    sync_size = min(max(round(pool_size * sync_share), 1), pool_size - 1)
+    sync_overflow = min(round(max_overflow * sync_share), max_overflow)
+    return (
+        {"pool_size": sync_size, "max_overflow": sync_overflow},
+        {"pool_size": pool_size - sync_size, "max_overflow": max_overflow - sync_overflow},
+    )
+
+def _connect_args(url, statement_timeout_ms: int, prepare_threshold: Optional[str], application_name: Optional[str]) -> dict:
+    if url.get_backend_name() != "postgresql":
+        return {}
+    connect_args = {}
+    if statement_timeout_ms > 0:
+        connect_args["options"] = f"-c statement_timeout={statement_timeout_ms}"
+    if application_name:
+        connect_args["application_name"] = application_name
+    if prepare_threshold:
+        if url.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = int(prepare_threshold)
+        else:
+            print(f"Advertencia: DB_PREPARE_THRESHOLD solo aplica al driver psycopg 3; se ignora con '{url.get_driver_name()}'.")
+    return connect_args
+
+def create_db_engine(database_url: Optional[str] = None, application_name: Optional[str] = None, **overrides) -> Engine:
+    """
+    Crea el motor de un servicio con el pool configurado por entorno. `overrides`
+    permite fijar cualquier argumento de `create_engine` desde el propio servicio.
+    """
+    url = make_url(database_url or os.getenv("DATABASE_URL"))
+    kwargs = {
+        "pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true"),
+        "connect_args": _connect_args(
+            url,
+            statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0")),
+            prepare_threshold=os.getenv("DB_PREPARE_THRESHOLD", ""),
+            application_name=application_name,
+        ),
+    }
+    kwargs.update(_pool_kwargs(url, InstrumentedQueuePool))
+    kwargs.update(overrides)
+    return create_engine(url, **kwargs)
+
+def async_mode_enabled() -> bool:
+    return _env_bool("DB_ASYNC", "false")
+
+def to_async_url(database_url: str) -> URL:
+    """Convierte la URL síncrona (psycopg, pysqlite) en la de su driver asíncrono."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No hay driver asíncrono configurado para '{backend}'")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def create_async_db_engine(database_url: Optional[str] = None, application_name: Optional[str] = None,
+                           **overrides) -> "AsyncEngine":
+    """Equivalente asíncrono de `create_db_engine`, con la misma configuración de pool."""
+    # Import diferido: sqlalchemy.ext.asyncio exige greenlet, que el modo síncrono no necesita
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    url = to_async_url(database_url or os.getenv("DATABASE_URL"))
+    kwargs = {"pool_pre_ping": _env_bool("DB_POOL_PRE_PING", "true")}
+    if url.get_backend_name() == "postgresql":
+        # asyncpg recibe los parámetros de sesión como server_settings
+        server_settings = {}
+        statement_timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+        if statement_timeout_ms > 0:
+            server_settings["statement_timeout"] = str(statement_timeout_ms)
+        if application_name:
+            server_settings["application_name"] = application_name
+        kwargs["connect_args"] = {"server_settings": server_settings}
+    kwargs.update(_pool_kwargs(url, InstrumentedAsyncQueuePool))
+    kwargs.update(overrides)
+    return create_async_engine(url, **kwargs)
+
+def pool_metrics(engine) -> dict:
+    """Estado del pool del motor (síncrono o asíncrono): ocupación, saturación y esperas de checkout."""
+    pool = engine.pool
+    if not isinstance(pool, _CheckoutTimingMixin):
+        return {"pool_class": type(pool).__name__}
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    checked_out = pool.checkedout()
+    return {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "saturation": (checked_out / capacity) if capacity > 0 else 0.0,
+        **pool.metrics.snapshot(),
+    }
@@ -50,6 +50,11 @@ class FindingType(str, Enum):
     NONCONFORMITY_MAJOR = "No Conformidad Mayor"
     OPPORTUNITY_FOR_IMPROVEMENT = "Oportunidad de Mejora"
 
+class ClassificationStatus(str, Enum):
+    PENDING = "Pendiente"
+    COMPLETED = "Completada"
+    FAILED = "Fallida"
+
 # --- MODELOS BASE Y DE CREACIÓN ---
 class EnvironmentalPolicyBase(BaseModel):
     version: str
@@ -181,6 +186,7 @@ class EnvironmentalAspect(EnvironmentalAspectBase):
     id: int
     created_at: datetime
     updated_at: Optional[datetime] = None
+    classification_status: Optional[ClassificationStatus] = None
     obligations: List[ComplianceObligationSimple] = []
     risks: List[RiskSimple] = []
     model_config = ConfigDict(from_attributes=True)
@@ -210,6 +216,12 @@ class Audit(AuditBase):
     findings: List[AuditFinding] = []
     model_config = ConfigDict(from_attributes=True)
 
+class AspectClassification(BaseModel):
+    aspect_id: int
+    aspect_type: AspectType
+    classification_status: Optional[ClassificationStatus] = None
+    model_config = ConfigDict(from_attributes=True)
+
 # Modelos completos que no tienen relaciones complejas
 class EnvironmentalPolicy(EnvironmentalPolicyBase):
     id: int
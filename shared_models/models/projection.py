@@ -0,0 +1,82 @@
+"""
+Proyecciones de respuesta para los endpoints de listas (`fields=` / `expand=`).
+
+    fields   campos escalares a devolver, separados por comas; `id` siempre se
+             incluye. Sin el parámetro se devuelven todos.
+    expand   relaciones anidadas a incluir, separadas por comas. Sin el parámetro
+             se incluyen todas (como hasta ahora); `expand=` vacío no incluye ninguna.
+
+Los servicios cargan con selectinload solo las relaciones de `Projection.expand`,
+así que una relación que no se pide tampoco se consulta.
+"""
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, Optional, Tuple, Type, Union, get_args, get_origin
+
+from pydantic import BaseModel, ConfigDict, create_model
+
+class ProjectionError(ValueError):
+    pass
+
+def _is_relation(annotation) -> bool:
+    """Un campo es una relación si su tipo es un modelo, o una lista / opcional de modelos."""
+    if get_origin(annotation) in (list, Union):
+        return any(_is_relation(arg) for arg in get_args(annotation))
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+@lru_cache(maxsize=None)
+def relations_of(schema: Type[BaseModel]) -> FrozenSet[str]:
+    return frozenset(name for name, field in schema.model_fields.items() if _is_relation(field.annotation))
+
+@lru_cache(maxsize=256)
+def _projected_model(schema: Type[BaseModel], names: Tuple[str, ...]) -> Type[BaseModel]:
+    """Modelo con solo los campos pedidos: al validar desde el ORM no se leen los demás atributos."""
+    return create_model(
+        f"{schema.__name__}Projection",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
+
+class Projection:
+    def __init__(self, schema: Type[BaseModel], fields: Optional[FrozenSet[str]], expand: FrozenSet[str]):
+        self.schema = schema
+        self.fields = fields
+        self.expand = expand
+
+    @property
+    def is_full(self) -> bool:
+        """Sin recortes: la respuesta completa de siempre."""
+        return self.fields is None and self.expand == relations_of(self.schema)
+
+    def dump(self, obj: Any) -> Dict[str, Any]:
+        scalars = [name for name in self.schema.model_fields
+                   if name not in relations_of(self.schema) and (self.fields is None or name in self.fields)]
+        names = tuple(scalars + sorted(self.expand))
+        return _projected_model(self.schema, names).model_validate(obj).model_dump(mode="json")
+
+def _split(value: str) -> FrozenSet[str]:
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+def parse_projection(schema: Type[BaseModel], fields: Optional[str] = None,
+                     expand: Optional[str] = None) -> Projection:
+    """Valida los parámetros contra el esquema de respuesta. Lanza ProjectionError si no coinciden."""
+    relations = relations_of(schema)
+    scalars = frozenset(schema.model_fields) - relations
+
+    requested_fields = None
+    if fields is not None:
+        requested_fields = _split(fields)
+        unknown = requested_fields - scalars
+        if unknown:
+            hint = " (las relaciones se piden con expand)" if unknown & relations else ""
+            raise ProjectionError(f"Campos desconocidos en fields: {', '.join(sorted(unknown))}{hint}")
+        if "id" in scalars:
+            requested_fields |= {"id"}
+
+    requested_expand = relations if expand is None else _split(expand)
+    unknown = requested_expand - relations
+    if unknown:
+        raise ProjectionError(
+            f"Relaciones desconocidas en expand: {', '.join(sorted(unknown))}. "
+            f"Disponibles: {', '.join(sorted(relations)) or 'ninguna'}"
+        )
+    return Projection(schema, requested_fields, requested_expand)
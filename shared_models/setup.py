@@ -4,5 +4,7 @@ setup(
     name="shared_models",
     version="0.1.0",
     packages=find_packages(),
+    # models/database.py y data_version.py usan SQLAlchemy 2; los esquemas, Pydantic 2
+    install_requires=["sqlalchemy>=2.0", "pydantic>=2"],
     description="Modelos de datos Pydantic compartidos para el SGA ISO 14001:2026."
 )
\ No newline at end of file